@@ -0,0 +1,8 @@
+-- Index pour les requêtes fenêtrées du panel (guild_id + created_at, type, active)
+-- created_at en dernière colonne : recherche par intervalle + tri sans B-tree temporaire
+
+CREATE INDEX IF NOT EXISTS idx_warnings_guild_created ON warnings(guild_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_sanctions_guild_created ON sanctions(guild_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_sanctions_guild_type_created ON sanctions(guild_id, type, created_at);
+CREATE INDEX IF NOT EXISTS idx_sanctions_guild_active_created ON sanctions(guild_id, active, created_at);
+CREATE INDEX IF NOT EXISTS idx_users_guild_active ON users(guild_id, is_active);
@@ -0,0 +1,111 @@
+-- Rollup journalier par guild pour les graphiques de tendance
+-- kind : warning | sanction | automod ; type : type de sanction / trigger_type ('' pour les warnings)
+-- day = '' si created_at est NULL ou illisible (exclu des fenêtres, comme les requêtes brutes)
+
+CREATE TABLE IF NOT EXISTS daily_guild_stats (
+  guild_id TEXT NOT NULL,
+  kind TEXT NOT NULL,
+  day TEXT NOT NULL,
+  type TEXT NOT NULL DEFAULT '',
+  count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (guild_id, kind, day, type)
+) WITHOUT ROWID;
+
+-- Backfill depuis les tables brutes
+DELETE FROM daily_guild_stats;
+
+INSERT INTO daily_guild_stats (guild_id, kind, day, type, count)
+SELECT guild_id, 'warning', COALESCE(DATE(created_at), ''), '', COUNT(*)
+FROM warnings GROUP BY 1, 3;
+
+INSERT INTO daily_guild_stats (guild_id, kind, day, type, count)
+SELECT guild_id, 'sanction', COALESCE(DATE(created_at), ''), type, COUNT(*)
+FROM sanctions GROUP BY 1, 3, 4;
+
+INSERT INTO daily_guild_stats (guild_id, kind, day, type, count)
+SELECT guild_id, 'automod', COALESCE(DATE(created_at), ''), COALESCE(trigger_type, ''), COUNT(*)
+FROM automod_logs GROUP BY 1, 3, 4;
+
+-- Warnings
+CREATE TRIGGER IF NOT EXISTS daily_stats_warnings_insert
+AFTER INSERT ON warnings
+BEGIN
+  INSERT INTO daily_guild_stats (guild_id, kind, day, type, count)
+  VALUES (NEW.guild_id, 'warning', COALESCE(DATE(NEW.created_at), ''), '', 1)
+  ON CONFLICT (guild_id, kind, day, type) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS daily_stats_warnings_delete
+AFTER DELETE ON warnings
+BEGIN
+  UPDATE daily_guild_stats SET count = count - 1
+  WHERE guild_id = OLD.guild_id AND kind = 'warning'
+    AND day = COALESCE(DATE(OLD.created_at), '') AND type = '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS daily_stats_warnings_update
+AFTER UPDATE OF guild_id, created_at ON warnings
+BEGIN
+  UPDATE daily_guild_stats SET count = count - 1
+  WHERE guild_id = OLD.guild_id AND kind = 'warning'
+    AND day = COALESCE(DATE(OLD.created_at), '') AND type = '';
+  INSERT INTO daily_guild_stats (guild_id, kind, day, type, count)
+  VALUES (NEW.guild_id, 'warning', COALESCE(DATE(NEW.created_at), ''), '', 1)
+  ON CONFLICT (guild_id, kind, day, type) DO UPDATE SET count = count + 1;
+END;
+
+-- Sanctions
+CREATE TRIGGER IF NOT EXISTS daily_stats_sanctions_insert
+AFTER INSERT ON sanctions
+BEGIN
+  INSERT INTO daily_guild_stats (guild_id, kind, day, type, count)
+  VALUES (NEW.guild_id, 'sanction', COALESCE(DATE(NEW.created_at), ''), NEW.type, 1)
+  ON CONFLICT (guild_id, kind, day, type) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS daily_stats_sanctions_delete
+AFTER DELETE ON sanctions
+BEGIN
+  UPDATE daily_guild_stats SET count = count - 1
+  WHERE guild_id = OLD.guild_id AND kind = 'sanction'
+    AND day = COALESCE(DATE(OLD.created_at), '') AND type = OLD.type;
+END;
+
+CREATE TRIGGER IF NOT EXISTS daily_stats_sanctions_update
+AFTER UPDATE OF guild_id, created_at, type ON sanctions
+BEGIN
+  UPDATE daily_guild_stats SET count = count - 1
+  WHERE guild_id = OLD.guild_id AND kind = 'sanction'
+    AND day = COALESCE(DATE(OLD.created_at), '') AND type = OLD.type;
+  INSERT INTO daily_guild_stats (guild_id, kind, day, type, count)
+  VALUES (NEW.guild_id, 'sanction', COALESCE(DATE(NEW.created_at), ''), NEW.type, 1)
+  ON CONFLICT (guild_id, kind, day, type) DO UPDATE SET count = count + 1;
+END;
+
+-- AutoMod
+CREATE TRIGGER IF NOT EXISTS daily_stats_automod_insert
+AFTER INSERT ON automod_logs
+BEGIN
+  INSERT INTO daily_guild_stats (guild_id, kind, day, type, count)
+  VALUES (NEW.guild_id, 'automod', COALESCE(DATE(NEW.created_at), ''), COALESCE(NEW.trigger_type, ''), 1)
+  ON CONFLICT (guild_id, kind, day, type) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS daily_stats_automod_delete
+AFTER DELETE ON automod_logs
+BEGIN
+  UPDATE daily_guild_stats SET count = count - 1
+  WHERE guild_id = OLD.guild_id AND kind = 'automod'
+    AND day = COALESCE(DATE(OLD.created_at), '') AND type = COALESCE(OLD.trigger_type, '');
+END;
+
+CREATE TRIGGER IF NOT EXISTS daily_stats_automod_update
+AFTER UPDATE OF guild_id, created_at, trigger_type ON automod_logs
+BEGIN
+  UPDATE daily_guild_stats SET count = count - 1
+  WHERE guild_id = OLD.guild_id AND kind = 'automod'
+    AND day = COALESCE(DATE(OLD.created_at), '') AND type = COALESCE(OLD.trigger_type, '');
+  INSERT INTO daily_guild_stats (guild_id, kind, day, type, count)
+  VALUES (NEW.guild_id, 'automod', COALESCE(DATE(NEW.created_at), ''), COALESCE(NEW.trigger_type, ''), 1)
+  ON CONFLICT (guild_id, kind, day, type) DO UPDATE SET count = count + 1;
+END;
@@ -0,0 +1,159 @@
+-- Versions par (table, guild) pour invalider le cache de requêtes du panel
+-- Chaque écriture incrémente la version de la table pour la guild concernée.
+
+CREATE TABLE IF NOT EXISTS table_versions (
+  table_name TEXT NOT NULL,
+  guild_id TEXT NOT NULL,
+  version INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (table_name, guild_id)
+) WITHOUT ROWID;
+
+-- warnings
+CREATE TRIGGER IF NOT EXISTS table_versions_warnings_insert
+AFTER INSERT ON warnings
+BEGIN
+  INSERT INTO table_versions (table_name, guild_id, version) VALUES ('warnings', NEW.guild_id, 1)
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS table_versions_warnings_update
+AFTER UPDATE ON warnings
+BEGIN
+  INSERT INTO table_versions (table_name, guild_id, version) VALUES ('warnings', OLD.guild_id, 1)
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+  INSERT INTO table_versions (table_name, guild_id, version)
+  SELECT 'warnings', NEW.guild_id, 1 WHERE NEW.guild_id IS NOT OLD.guild_id
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS table_versions_warnings_delete
+AFTER DELETE ON warnings
+BEGIN
+  INSERT INTO table_versions (table_name, guild_id, version) VALUES ('warnings', OLD.guild_id, 1)
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+END;
+
+-- sanctions
+CREATE TRIGGER IF NOT EXISTS table_versions_sanctions_insert
+AFTER INSERT ON sanctions
+BEGIN
+  INSERT INTO table_versions (table_name, guild_id, version) VALUES ('sanctions', NEW.guild_id, 1)
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS table_versions_sanctions_update
+AFTER UPDATE ON sanctions
+BEGIN
+  INSERT INTO table_versions (table_name, guild_id, version) VALUES ('sanctions', OLD.guild_id, 1)
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+  INSERT INTO table_versions (table_name, guild_id, version)
+  SELECT 'sanctions', NEW.guild_id, 1 WHERE NEW.guild_id IS NOT OLD.guild_id
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS table_versions_sanctions_delete
+AFTER DELETE ON sanctions
+BEGIN
+  INSERT INTO table_versions (table_name, guild_id, version) VALUES ('sanctions', OLD.guild_id, 1)
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+END;
+
+-- users
+CREATE TRIGGER IF NOT EXISTS table_versions_users_insert
+AFTER INSERT ON users
+BEGIN
+  INSERT INTO table_versions (table_name, guild_id, version) VALUES ('users', NEW.guild_id, 1)
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS table_versions_users_update
+AFTER UPDATE ON users
+BEGIN
+  INSERT INTO table_versions (table_name, guild_id, version) VALUES ('users', OLD.guild_id, 1)
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+  INSERT INTO table_versions (table_name, guild_id, version)
+  SELECT 'users', NEW.guild_id, 1 WHERE NEW.guild_id IS NOT OLD.guild_id
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS table_versions_users_delete
+AFTER DELETE ON users
+BEGIN
+  INSERT INTO table_versions (table_name, guild_id, version) VALUES ('users', OLD.guild_id, 1)
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+END;
+
+-- automod_logs
+CREATE TRIGGER IF NOT EXISTS table_versions_automod_logs_insert
+AFTER INSERT ON automod_logs
+BEGIN
+  INSERT INTO table_versions (table_name, guild_id, version) VALUES ('automod_logs', NEW.guild_id, 1)
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS table_versions_automod_logs_update
+AFTER UPDATE ON automod_logs
+BEGIN
+  INSERT INTO table_versions (table_name, guild_id, version) VALUES ('automod_logs', OLD.guild_id, 1)
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+  INSERT INTO table_versions (table_name, guild_id, version)
+  SELECT 'automod_logs', NEW.guild_id, 1 WHERE NEW.guild_id IS NOT OLD.guild_id
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS table_versions_automod_logs_delete
+AFTER DELETE ON automod_logs
+BEGIN
+  INSERT INTO table_versions (table_name, guild_id, version) VALUES ('automod_logs', OLD.guild_id, 1)
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+END;
+
+-- mod_logs
+CREATE TRIGGER IF NOT EXISTS table_versions_mod_logs_insert
+AFTER INSERT ON mod_logs
+BEGIN
+  INSERT INTO table_versions (table_name, guild_id, version) VALUES ('mod_logs', NEW.guild_id, 1)
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS table_versions_mod_logs_update
+AFTER UPDATE ON mod_logs
+BEGIN
+  INSERT INTO table_versions (table_name, guild_id, version) VALUES ('mod_logs', OLD.guild_id, 1)
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+  INSERT INTO table_versions (table_name, guild_id, version)
+  SELECT 'mod_logs', NEW.guild_id, 1 WHERE NEW.guild_id IS NOT OLD.guild_id
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS table_versions_mod_logs_delete
+AFTER DELETE ON mod_logs
+BEGIN
+  INSERT INTO table_versions (table_name, guild_id, version) VALUES ('mod_logs', OLD.guild_id, 1)
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+END;
+
+-- guilds
+CREATE TRIGGER IF NOT EXISTS table_versions_guilds_insert
+AFTER INSERT ON guilds
+BEGIN
+  INSERT INTO table_versions (table_name, guild_id, version) VALUES ('guilds', NEW.id, 1)
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS table_versions_guilds_update
+AFTER UPDATE ON guilds
+BEGIN
+  INSERT INTO table_versions (table_name, guild_id, version) VALUES ('guilds', OLD.id, 1)
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+  INSERT INTO table_versions (table_name, guild_id, version)
+  SELECT 'guilds', NEW.id, 1 WHERE NEW.id IS NOT OLD.id
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS table_versions_guilds_delete
+AFTER DELETE ON guilds
+BEGIN
+  INSERT INTO table_versions (table_name, guild_id, version) VALUES ('guilds', OLD.id, 1)
+  ON CONFLICT (table_name, guild_id) DO UPDATE SET version = version + 1;
+END;
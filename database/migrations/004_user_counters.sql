@@ -0,0 +1,88 @@
+-- Compteurs dénormalisés users.total_warnings / total_sanctions / risk_score
+-- Ne comptent que les warnings / sanctions actifs (active = 1), rattachés par (discord_id, guild_id).
+-- Le schéma gère déjà l'INSERT (warnings, sanctions) et le DELETE (warnings) ;
+-- on complète : DELETE de sanction, changement de active / user_id / guild_id, user créé après ses warnings.
+-- risk_score = total_warnings * 10 + total_sanctions * 25 (cf. userRepo.js)
+-- `+active` : empêche l'usage de idx_warnings_active, la recherche passe par (guild_id, user_id)
+
+-- Sanctions supprimées
+CREATE TRIGGER IF NOT EXISTS user_counters_sanctions_delete
+AFTER DELETE ON sanctions
+WHEN OLD.active = 1
+BEGIN
+  UPDATE users SET
+    total_sanctions = total_sanctions - 1,
+    risk_score = total_warnings * 10 + (total_sanctions - 1) * 25,
+    updated_at = CURRENT_TIMESTAMP
+  WHERE discord_id = OLD.user_id AND guild_id = OLD.guild_id;
+END;
+
+-- Warnings désactivés / réactivés / réaffectés
+CREATE TRIGGER IF NOT EXISTS user_counters_warnings_update
+AFTER UPDATE OF active, user_id, guild_id ON warnings
+WHEN OLD.active IS NOT NEW.active OR OLD.user_id IS NOT NEW.user_id OR OLD.guild_id IS NOT NEW.guild_id
+BEGIN
+  UPDATE users SET
+    total_warnings = total_warnings - 1,
+    risk_score = (total_warnings - 1) * 10 + total_sanctions * 25,
+    updated_at = CURRENT_TIMESTAMP
+  WHERE OLD.active = 1 AND discord_id = OLD.user_id AND guild_id = OLD.guild_id;
+  UPDATE users SET
+    total_warnings = total_warnings + 1,
+    risk_score = (total_warnings + 1) * 10 + total_sanctions * 25,
+    updated_at = CURRENT_TIMESTAMP
+  WHERE NEW.active = 1 AND discord_id = NEW.user_id AND guild_id = NEW.guild_id;
+END;
+
+-- Sanctions levées / réactivées / réaffectées
+CREATE TRIGGER IF NOT EXISTS user_counters_sanctions_update
+AFTER UPDATE OF active, user_id, guild_id ON sanctions
+WHEN OLD.active IS NOT NEW.active OR OLD.user_id IS NOT NEW.user_id OR OLD.guild_id IS NOT NEW.guild_id
+BEGIN
+  UPDATE users SET
+    total_sanctions = total_sanctions - 1,
+    risk_score = total_warnings * 10 + (total_sanctions - 1) * 25,
+    updated_at = CURRENT_TIMESTAMP
+  WHERE OLD.active = 1 AND discord_id = OLD.user_id AND guild_id = OLD.guild_id;
+  UPDATE users SET
+    total_sanctions = total_sanctions + 1,
+    risk_score = total_warnings * 10 + (total_sanctions + 1) * 25,
+    updated_at = CURRENT_TIMESTAMP
+  WHERE NEW.active = 1 AND discord_id = NEW.user_id AND guild_id = NEW.guild_id;
+END;
+
+-- User créé (ou ré-identifié) après ses premiers warnings / sanctions : recalcul depuis les tables
+CREATE TRIGGER IF NOT EXISTS user_counters_users_insert
+AFTER INSERT ON users
+BEGIN
+  UPDATE users SET
+    total_warnings = (SELECT COUNT(*) FROM warnings
+                      WHERE guild_id = NEW.guild_id AND user_id = NEW.discord_id AND +active = 1),
+    total_sanctions = (SELECT COUNT(*) FROM sanctions
+                       WHERE guild_id = NEW.guild_id AND user_id = NEW.discord_id AND +active = 1)
+  WHERE id = NEW.id;
+  UPDATE users SET risk_score = total_warnings * 10 + total_sanctions * 25 WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_counters_users_rekey
+AFTER UPDATE OF discord_id, guild_id ON users
+BEGIN
+  UPDATE users SET
+    total_warnings = (SELECT COUNT(*) FROM warnings
+                      WHERE guild_id = NEW.guild_id AND user_id = NEW.discord_id AND +active = 1),
+    total_sanctions = (SELECT COUNT(*) FROM sanctions
+                       WHERE guild_id = NEW.guild_id AND user_id = NEW.discord_id AND +active = 1)
+  WHERE id = NEW.id;
+  UPDATE users SET risk_score = total_warnings * 10 + total_sanctions * 25 WHERE id = NEW.id;
+END;
+
+-- Liste des users triée / filtrée sur les compteurs, sans agrégation
+CREATE INDEX IF NOT EXISTS idx_users_guild_active_warnings ON users(guild_id, is_active, total_warnings);
+
+-- Remise à niveau des compteurs existants
+UPDATE users SET
+  total_warnings = (SELECT COUNT(*) FROM warnings w
+                    WHERE w.guild_id = users.guild_id AND w.user_id = users.discord_id AND +w.active = 1),
+  total_sanctions = (SELECT COUNT(*) FROM sanctions s
+                     WHERE s.guild_id = users.guild_id AND s.user_id = users.discord_id AND +s.active = 1);
+UPDATE users SET risk_score = total_warnings * 10 + total_sanctions * 25;
@@ -0,0 +1,125 @@
+-- Index plein texte (FTS5) : raisons des warnings / sanctions, pseudos des users, contenu automod
+-- rowid = id source * 8 + code du kind (1 warning, 2 sanction, 3 automod, 4 user) :
+-- les triggers suppriment par rowid, sans parcourir l'index.
+-- body : texte recherché ; user_id : ID Discord ciblé ; guild_id / kind : portée (filtres de colonne,
+-- l'intersection des listes se fait dans l'index)
+
+CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+  body,
+  user_id,
+  guild_id,
+  kind,
+  created_at UNINDEXED,
+  tokenize = 'unicode61 remove_diacritics 2',
+  prefix = '2 3'
+);
+
+-- Classement : le texte pèse plus que l'ID, guild et kind ne comptent pas
+INSERT INTO search_index (search_index, rank) VALUES ('rank', 'bm25(10.0, 5.0, 0.0, 0.0)');
+
+-- Backfill
+DELETE FROM search_index;
+
+INSERT INTO search_index (rowid, body, user_id, guild_id, kind, created_at)
+SELECT id * 8 + 1, COALESCE(reason, ''), user_id, guild_id, 'warning', created_at FROM warnings;
+
+INSERT INTO search_index (rowid, body, user_id, guild_id, kind, created_at)
+SELECT id * 8 + 2, COALESCE(reason, ''), user_id, guild_id, 'sanction', created_at FROM sanctions;
+
+INSERT INTO search_index (rowid, body, user_id, guild_id, kind, created_at)
+SELECT id * 8 + 3, COALESCE(trigger_content, ''), user_id, guild_id, 'automod', created_at FROM automod_logs;
+
+INSERT INTO search_index (rowid, body, user_id, guild_id, kind, created_at)
+SELECT id * 8 + 4, TRIM(COALESCE(username, '') || ' ' || COALESCE(server_username, '')),
+       discord_id, guild_id, 'user', joined_at
+FROM users;
+
+-- Warnings
+CREATE TRIGGER IF NOT EXISTS search_index_warnings_insert
+AFTER INSERT ON warnings
+BEGIN
+  INSERT INTO search_index (rowid, body, user_id, guild_id, kind, created_at)
+  VALUES (NEW.id * 8 + 1, COALESCE(NEW.reason, ''), NEW.user_id, NEW.guild_id, 'warning', NEW.created_at);
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_warnings_delete
+AFTER DELETE ON warnings
+BEGIN
+  DELETE FROM search_index WHERE rowid = OLD.id * 8 + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_warnings_update
+AFTER UPDATE OF reason, user_id, guild_id, created_at ON warnings
+BEGIN
+  DELETE FROM search_index WHERE rowid = OLD.id * 8 + 1;
+  INSERT INTO search_index (rowid, body, user_id, guild_id, kind, created_at)
+  VALUES (NEW.id * 8 + 1, COALESCE(NEW.reason, ''), NEW.user_id, NEW.guild_id, 'warning', NEW.created_at);
+END;
+
+-- Sanctions
+CREATE TRIGGER IF NOT EXISTS search_index_sanctions_insert
+AFTER INSERT ON sanctions
+BEGIN
+  INSERT INTO search_index (rowid, body, user_id, guild_id, kind, created_at)
+  VALUES (NEW.id * 8 + 2, COALESCE(NEW.reason, ''), NEW.user_id, NEW.guild_id, 'sanction', NEW.created_at);
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_sanctions_delete
+AFTER DELETE ON sanctions
+BEGIN
+  DELETE FROM search_index WHERE rowid = OLD.id * 8 + 2;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_sanctions_update
+AFTER UPDATE OF reason, user_id, guild_id, created_at ON sanctions
+BEGIN
+  DELETE FROM search_index WHERE rowid = OLD.id * 8 + 2;
+  INSERT INTO search_index (rowid, body, user_id, guild_id, kind, created_at)
+  VALUES (NEW.id * 8 + 2, COALESCE(NEW.reason, ''), NEW.user_id, NEW.guild_id, 'sanction', NEW.created_at);
+END;
+
+-- Automod
+CREATE TRIGGER IF NOT EXISTS search_index_automod_insert
+AFTER INSERT ON automod_logs
+BEGIN
+  INSERT INTO search_index (rowid, body, user_id, guild_id, kind, created_at)
+  VALUES (NEW.id * 8 + 3, COALESCE(NEW.trigger_content, ''), NEW.user_id, NEW.guild_id, 'automod', NEW.created_at);
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_automod_delete
+AFTER DELETE ON automod_logs
+BEGIN
+  DELETE FROM search_index WHERE rowid = OLD.id * 8 + 3;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_automod_update
+AFTER UPDATE OF trigger_content, user_id, guild_id, created_at ON automod_logs
+BEGIN
+  DELETE FROM search_index WHERE rowid = OLD.id * 8 + 3;
+  INSERT INTO search_index (rowid, body, user_id, guild_id, kind, created_at)
+  VALUES (NEW.id * 8 + 3, COALESCE(NEW.trigger_content, ''), NEW.user_id, NEW.guild_id, 'automod', NEW.created_at);
+END;
+
+-- Users
+CREATE TRIGGER IF NOT EXISTS search_index_users_insert
+AFTER INSERT ON users
+BEGIN
+  INSERT INTO search_index (rowid, body, user_id, guild_id, kind, created_at)
+  VALUES (NEW.id * 8 + 4, TRIM(COALESCE(NEW.username, '') || ' ' || COALESCE(NEW.server_username, '')),
+          NEW.discord_id, NEW.guild_id, 'user', NEW.joined_at);
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_users_delete
+AFTER DELETE ON users
+BEGIN
+  DELETE FROM search_index WHERE rowid = OLD.id * 8 + 4;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_users_update
+AFTER UPDATE OF username, server_username, discord_id, guild_id, joined_at ON users
+BEGIN
+  DELETE FROM search_index WHERE rowid = OLD.id * 8 + 4;
+  INSERT INTO search_index (rowid, body, user_id, guild_id, kind, created_at)
+  VALUES (NEW.id * 8 + 4, TRIM(COALESCE(NEW.username, '') || ' ' || COALESCE(NEW.server_username, '')),
+          NEW.discord_id, NEW.guild_id, 'user', NEW.joined_at);
+END;
@@ -0,0 +1,4 @@
+-- Lecture incrémentale des users modifiés depuis un watermark (index de préfixes du panel)
+-- updated_at est écrit en ISO 8601 par la synchro du bot et en CURRENT_TIMESTAMP par les triggers :
+-- datetime() ramène les deux au même format, comparable en texte.
+CREATE INDEX IF NOT EXISTS idx_users_guild_updated ON users(guild_id, datetime(updated_at));
@@ -0,0 +1,139 @@
+-- Cube horaire par guild pour la heatmap jour de semaine × heure (Dashboard)
+-- kind : warning | sanction | automod ; type : type de sanction / trigger_type ('' pour les warnings)
+-- channel_id : salon de l'action AutoMod ('' pour les warnings et sanctions)
+-- day = '' si created_at est NULL ou illisible (exclu des fenêtres, comme daily_guild_stats)
+-- Le jour est gardé pour filtrer n'importe quelle période ; le jour de semaine s'en déduit à la lecture.
+
+CREATE TABLE IF NOT EXISTS hourly_guild_stats (
+  guild_id TEXT NOT NULL,
+  kind TEXT NOT NULL,
+  day TEXT NOT NULL,
+  hour INTEGER NOT NULL,
+  type TEXT NOT NULL DEFAULT '',
+  channel_id TEXT NOT NULL DEFAULT '',
+  count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (guild_id, kind, day, hour, type, channel_id)
+) WITHOUT ROWID;
+
+-- Backfill depuis les tables brutes
+DELETE FROM hourly_guild_stats;
+
+INSERT INTO hourly_guild_stats (guild_id, kind, day, hour, type, channel_id, count)
+SELECT guild_id, 'warning', COALESCE(DATE(created_at), ''),
+       COALESCE(CAST(strftime('%H', created_at) AS INTEGER), 0), '', '', COUNT(*)
+FROM warnings GROUP BY 1, 3, 4;
+
+INSERT INTO hourly_guild_stats (guild_id, kind, day, hour, type, channel_id, count)
+SELECT guild_id, 'sanction', COALESCE(DATE(created_at), ''),
+       COALESCE(CAST(strftime('%H', created_at) AS INTEGER), 0), type, '', COUNT(*)
+FROM sanctions GROUP BY 1, 3, 4, 5;
+
+INSERT INTO hourly_guild_stats (guild_id, kind, day, hour, type, channel_id, count)
+SELECT guild_id, 'automod', COALESCE(DATE(created_at), ''),
+       COALESCE(CAST(strftime('%H', created_at) AS INTEGER), 0),
+       COALESCE(trigger_type, ''), COALESCE(channel_id, ''), COUNT(*)
+FROM automod_logs GROUP BY 1, 3, 4, 5, 6;
+
+-- Warnings
+CREATE TRIGGER IF NOT EXISTS hourly_stats_warnings_insert
+AFTER INSERT ON warnings
+BEGIN
+  INSERT INTO hourly_guild_stats (guild_id, kind, day, hour, type, channel_id, count)
+  VALUES (NEW.guild_id, 'warning', COALESCE(DATE(NEW.created_at), ''),
+          COALESCE(CAST(strftime('%H', NEW.created_at) AS INTEGER), 0), '', '', 1)
+  ON CONFLICT (guild_id, kind, day, hour, type, channel_id) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS hourly_stats_warnings_delete
+AFTER DELETE ON warnings
+BEGIN
+  UPDATE hourly_guild_stats SET count = count - 1
+  WHERE guild_id = OLD.guild_id AND kind = 'warning'
+    AND day = COALESCE(DATE(OLD.created_at), '')
+    AND hour = COALESCE(CAST(strftime('%H', OLD.created_at) AS INTEGER), 0)
+    AND type = '' AND channel_id = '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS hourly_stats_warnings_update
+AFTER UPDATE OF guild_id, created_at ON warnings
+BEGIN
+  UPDATE hourly_guild_stats SET count = count - 1
+  WHERE guild_id = OLD.guild_id AND kind = 'warning'
+    AND day = COALESCE(DATE(OLD.created_at), '')
+    AND hour = COALESCE(CAST(strftime('%H', OLD.created_at) AS INTEGER), 0)
+    AND type = '' AND channel_id = '';
+  INSERT INTO hourly_guild_stats (guild_id, kind, day, hour, type, channel_id, count)
+  VALUES (NEW.guild_id, 'warning', COALESCE(DATE(NEW.created_at), ''),
+          COALESCE(CAST(strftime('%H', NEW.created_at) AS INTEGER), 0), '', '', 1)
+  ON CONFLICT (guild_id, kind, day, hour, type, channel_id) DO UPDATE SET count = count + 1;
+END;
+
+-- Sanctions
+CREATE TRIGGER IF NOT EXISTS hourly_stats_sanctions_insert
+AFTER INSERT ON sanctions
+BEGIN
+  INSERT INTO hourly_guild_stats (guild_id, kind, day, hour, type, channel_id, count)
+  VALUES (NEW.guild_id, 'sanction', COALESCE(DATE(NEW.created_at), ''),
+          COALESCE(CAST(strftime('%H', NEW.created_at) AS INTEGER), 0), NEW.type, '', 1)
+  ON CONFLICT (guild_id, kind, day, hour, type, channel_id) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS hourly_stats_sanctions_delete
+AFTER DELETE ON sanctions
+BEGIN
+  UPDATE hourly_guild_stats SET count = count - 1
+  WHERE guild_id = OLD.guild_id AND kind = 'sanction'
+    AND day = COALESCE(DATE(OLD.created_at), '')
+    AND hour = COALESCE(CAST(strftime('%H', OLD.created_at) AS INTEGER), 0)
+    AND type = OLD.type AND channel_id = '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS hourly_stats_sanctions_update
+AFTER UPDATE OF guild_id, created_at, type ON sanctions
+BEGIN
+  UPDATE hourly_guild_stats SET count = count - 1
+  WHERE guild_id = OLD.guild_id AND kind = 'sanction'
+    AND day = COALESCE(DATE(OLD.created_at), '')
+    AND hour = COALESCE(CAST(strftime('%H', OLD.created_at) AS INTEGER), 0)
+    AND type = OLD.type AND channel_id = '';
+  INSERT INTO hourly_guild_stats (guild_id, kind, day, hour, type, channel_id, count)
+  VALUES (NEW.guild_id, 'sanction', COALESCE(DATE(NEW.created_at), ''),
+          COALESCE(CAST(strftime('%H', NEW.created_at) AS INTEGER), 0), NEW.type, '', 1)
+  ON CONFLICT (guild_id, kind, day, hour, type, channel_id) DO UPDATE SET count = count + 1;
+END;
+
+-- AutoMod
+CREATE TRIGGER IF NOT EXISTS hourly_stats_automod_insert
+AFTER INSERT ON automod_logs
+BEGIN
+  INSERT INTO hourly_guild_stats (guild_id, kind, day, hour, type, channel_id, count)
+  VALUES (NEW.guild_id, 'automod', COALESCE(DATE(NEW.created_at), ''),
+          COALESCE(CAST(strftime('%H', NEW.created_at) AS INTEGER), 0),
+          COALESCE(NEW.trigger_type, ''), COALESCE(NEW.channel_id, ''), 1)
+  ON CONFLICT (guild_id, kind, day, hour, type, channel_id) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS hourly_stats_automod_delete
+AFTER DELETE ON automod_logs
+BEGIN
+  UPDATE hourly_guild_stats SET count = count - 1
+  WHERE guild_id = OLD.guild_id AND kind = 'automod'
+    AND day = COALESCE(DATE(OLD.created_at), '')
+    AND hour = COALESCE(CAST(strftime('%H', OLD.created_at) AS INTEGER), 0)
+    AND type = COALESCE(OLD.trigger_type, '') AND channel_id = COALESCE(OLD.channel_id, '');
+END;
+
+CREATE TRIGGER IF NOT EXISTS hourly_stats_automod_update
+AFTER UPDATE OF guild_id, created_at, trigger_type, channel_id ON automod_logs
+BEGIN
+  UPDATE hourly_guild_stats SET count = count - 1
+  WHERE guild_id = OLD.guild_id AND kind = 'automod'
+    AND day = COALESCE(DATE(OLD.created_at), '')
+    AND hour = COALESCE(CAST(strftime('%H', OLD.created_at) AS INTEGER), 0)
+    AND type = COALESCE(OLD.trigger_type, '') AND channel_id = COALESCE(OLD.channel_id, '');
+  INSERT INTO hourly_guild_stats (guild_id, kind, day, hour, type, channel_id, count)
+  VALUES (NEW.guild_id, 'automod', COALESCE(DATE(NEW.created_at), ''),
+          COALESCE(CAST(strftime('%H', NEW.created_at) AS INTEGER), 0),
+          COALESCE(NEW.trigger_type, ''), COALESCE(NEW.channel_id, ''), 1)
+  ON CONFLICT (guild_id, kind, day, hour, type, channel_id) DO UPDATE SET count = count + 1;
+END;
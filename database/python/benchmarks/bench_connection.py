@@ -0,0 +1,104 @@
+# Benchmark connexions : ouverture à chaque requête vs pool
+#
+# Usage (depuis la racine du projet) :
+#   python -m database.python.benchmarks.bench_connection --reruns 50
+#   python -m database.python.benchmarks.bench_connection --db /tmp/big.db
+import argparse
+import sqlite3
+import statistics
+import time
+from pathlib import Path
+
+from database.python import connection
+
+# Requêtes d'un rerun du Dashboard (une connexion par requête côté repos)
+DASHBOARD_QUERIES = [
+    ("SELECT COUNT(*), COUNT(CASE WHEN created_at >= DATE('now', '-30 days') THEN 1 END) "
+     "FROM warnings WHERE guild_id = ?"),
+    ("SELECT COUNT(*), COUNT(CASE WHEN created_at >= DATE('now', '-30 days') THEN 1 END), "
+     "COUNT(CASE WHEN active = 1 THEN 1 END) FROM sanctions WHERE guild_id = ?"),
+    "SELECT COUNT(DISTINCT user_id) FROM users WHERE guild_id = ? AND is_active = 1",
+    ("SELECT COUNT(*), COUNT(CASE WHEN created_at >= DATE('now', '-30 days') THEN 1 END) "
+     "FROM automod_logs WHERE guild_id = ?"),
+    ("SELECT DATE(created_at) as date, COUNT(*) FROM warnings "
+     "WHERE guild_id = ? AND created_at >= DATE('now', '-30 days') GROUP BY DATE(created_at)"),
+    ("SELECT type, COUNT(*) FROM sanctions "
+     "WHERE guild_id = ? AND created_at >= DATE('now', '-30 days') GROUP BY type"),
+    ("SELECT moderator_id, COUNT(*) as count FROM warnings "
+     "WHERE guild_id = ? AND created_at >= DATE('now', '-30 days') "
+     "GROUP BY moderator_id ORDER BY count DESC LIMIT 10"),
+    ("SELECT user_id, COUNT(*) as c FROM warnings "
+     "WHERE guild_id = ? AND created_at >= DATE('now', '-30 days') "
+     "GROUP BY user_id HAVING c >= 2 ORDER BY c DESC LIMIT 10"),
+]
+
+
+def legacy_connection():
+    """Ancien get_connection() : nouvelle connexion, pragmas par défaut."""
+    conn = sqlite3.connect(str(connection.DB_PATH))
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def run_rerun(open_conn, guild_id):
+    for sql in DASHBOARD_QUERIES:
+        conn = open_conn()
+        conn.execute(sql, (guild_id,)).fetchall()
+        conn.close()
+
+
+def bench(label, open_conn, guild_id, reruns, count_opened):
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        run_rerun(open_conn, guild_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    opened = count_opened()
+    return {
+        'mode': label,
+        'connections_per_rerun': opened / reruns,
+        'mean_ms': statistics.mean(timings),
+        'p95_ms': sorted(timings)[int(len(timings) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark connexions SQLite")
+    parser.add_argument('--db', type=Path, default=connection.DB_PATH)
+    parser.add_argument('--guild', default=None, help="ID du serveur (défaut: premier)")
+    parser.add_argument('--reruns', type=int, default=50)
+    args = parser.parse_args()
+
+    connection.DB_PATH = args.db
+    connection.reset_pools()
+
+    guild_id = args.guild
+    if guild_id is None:
+        conn = legacy_connection()
+        row = conn.execute("SELECT id FROM guilds LIMIT 1").fetchone()
+        conn.close()
+        guild_id = row[0] if row else ''
+
+    legacy_opened = [0]
+
+    def open_legacy():
+        legacy_opened[0] += 1
+        return legacy_connection()
+
+    results = [
+        bench("avant (connexion par requête)", open_legacy, guild_id, args.reruns,
+              lambda: legacy_opened[0]),
+        bench("après (pool lecture)", lambda: connection.get_connection(readonly=True),
+              guild_id, args.reruns,
+              lambda: connection.get_pool_stats()['read']['opened']),
+    ]
+
+    print(f"DB: {args.db} | guild: {guild_id} | reruns: {args.reruns}")
+    print(f"{'mode':<32} {'conn/rerun':>10} {'moy (ms)':>10} {'p95 (ms)':>10}")
+    for r in results:
+        print(f"{r['mode']:<32} {r['connections_per_rerun']:>10.2f} "
+              f"{r['mean_ms']:>10.3f} {r['p95_ms']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+# Benchmark des fonctions repository et des requêtes écrites dans les pages, base par base
+#
+# Chaque base (ex: une par échelle, cf. generate.py) est mesurée sur son plus gros serveur, avec
+# les valeurs les plus coûteuses (user le plus averti, modérateur le plus actif). Cache de requêtes
+# désactivé : chaque appel exécute ses requêtes. Les écritures (--writes) tournent sur une copie.
+# Résultats en JSON (--output) ; --compare signale les écarts avec un résultat précédent.
+#
+# Usage (depuis la racine du projet) :
+#   python -m database.python.benchmarks.generate --scale small --output /tmp/small.db
+#   python -m database.python.benchmarks.generate --scale medium --output /tmp/medium.db
+#   python -m database.python.benchmarks.bench_repositories --db small=/tmp/small.db --db medium=/tmp/medium.db \
+#       --writes --output bench-$(git rev-parse --short HEAD).json
+#   python -m database.python.benchmarks.bench_repositories --db small=/tmp/small.db --compare bench-old.json
+import argparse
+import asyncio
+import importlib
+import inspect
+import json
+import pkgutil
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+
+from database.python import cache, connection, instrumentation, migrations, repositories
+from database.python.repositories import (
+    bundle, guild_repo, sanction_repo, search_repo, timeline_repo, user_repo, warning_repo
+)
+
+# Fonctions repository sans requête propre (utilitaires)
+EXCLUDED = {'bundle.run_async'}
+
+# Taille des lots pour les opérations en masse (--writes)
+BULK_SIZE = 500
+
+# Écart (ratio) au-delà duquel --compare signale une régression / amélioration,
+# ignoré en dessous d'un écart absolu (bruit des requêtes sub-milliseconde)
+COMPARE_THRESHOLD = 1.2
+COMPARE_MIN_DELTA_MS = 0.5
+
+
+def _context(conn, guild_id: str = None) -> dict:
+    """Valeurs de test : plus gros serveur (ou guild_id), user le plus averti, modérateur le plus actif."""
+    if guild_id is None:
+        row = conn.execute(
+            "SELECT guild_id FROM warnings GROUP BY guild_id ORDER BY COUNT(*) DESC LIMIT 1"
+        ).fetchone() or conn.execute("SELECT id FROM guilds LIMIT 1").fetchone()
+        guild_id = row[0] if row else '0'
+
+    def top(sql):
+        row = conn.execute(sql, (guild_id,)).fetchone()
+        return row[0] if row else '0'
+
+    return {
+        'guild_id': guild_id,
+        'user_id': top("SELECT user_id FROM warnings WHERE guild_id = ? GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1"),
+        'moderator_id': top(
+            "SELECT moderator_id FROM warnings WHERE guild_id = ? GROUP BY moderator_id ORDER BY COUNT(*) DESC LIMIT 1"
+        ),
+        'search': top(
+            "SELECT trigger_type FROM automod_logs WHERE guild_id = ? GROUP BY trigger_type ORDER BY COUNT(*) DESC LIMIT 1"
+        ),
+        'automod_config': '{}',
+    }
+
+
+def read_cases(ctx: dict) -> list:
+    """Lectures : (label, fonction sans argument). Au moins un cas par fonction repository."""
+    g, u, m = ctx['guild_id'], ctx['user_id'], ctx['moderator_id']
+    # Curseurs de la 2e page : reprise au milieu des données, pas en tête d'index
+    warning_cursor = warning_repo.get_page(g).next_cursor
+    sanction_cursor = sanction_repo.get_page(g).next_cursor
+    timeline_cursor = timeline_repo.get_page(g).next_cursor
+    watermarks = {kind: max(value - 1000, 0) for kind, value in timeline_repo.get_watermarks().items()}
+    return [
+        ('guild_repo.get_all', guild_repo.get_all),
+        ('guild_repo.get_by_id', lambda: guild_repo.get_by_id(g)),
+        ('guild_repo.get_overview', guild_repo.get_overview),
+        ('guild_repo.get_stats', lambda: guild_repo.get_stats(g)),
+        ('guild_repo.get_snapshot', lambda: guild_repo.get_snapshot(g)),
+        ('guild_repo.get_recent_activity', lambda: guild_repo.get_recent_activity(g)),
+        ('guild_repo.get_hour_of_week', lambda: guild_repo.get_hour_of_week(g)),
+        ('guild_repo.get_hour_of_week (365 j, spam)',
+         lambda: guild_repo.get_hour_of_week(g, 365, kinds=('automod',), trigger_type=ctx['search'])),
+        ('guild_repo.get_automod_filters', lambda: guild_repo.get_automod_filters(g)),
+        ('warning_repo.get_by_guild', lambda: warning_repo.get_by_guild(g)),
+        ('warning_repo.get_page', lambda: warning_repo.get_page(g)),
+        ('warning_repo.get_page (page 2)', lambda: warning_repo.get_page(g, warning_cursor)),
+        ('warning_repo.get_page (filtres)', lambda: warning_repo.get_page(g, moderator_id=m, days=7)),
+        ('warning_repo.get_page (recherche)', lambda: warning_repo.get_page(g, user_search=u[:6])),
+        ('warning_repo.get_page (user_id)', lambda: warning_repo.get_page(g, order_by='user_id')),
+        ('warning_repo.get_by_user', lambda: warning_repo.get_by_user(u, g)),
+        ('warning_repo.get_active_by_user', lambda: warning_repo.get_active_by_user(u, g)),
+        ('warning_repo.get_recent', lambda: warning_repo.get_recent(g)),
+        ('warning_repo.get_stats_by_day', lambda: warning_repo.get_stats_by_day(g)),
+        ('warning_repo.get_top_warned_users', lambda: warning_repo.get_top_warned_users(g)),
+        ('sanction_repo.get_by_guild', lambda: sanction_repo.get_by_guild(g)),
+        ('sanction_repo.get_page', lambda: sanction_repo.get_page(g)),
+        ('sanction_repo.get_page (page 2)', lambda: sanction_repo.get_page(g, sanction_cursor)),
+        ('sanction_repo.get_page (filtres)',
+         lambda: sanction_repo.get_page(g, sanction_type='ban', active=True, days=7)),
+        ('warning_repo.count_many', lambda: warning_repo.count_many(g, moderator_id=m, days=30)),
+        ('sanction_repo.count_many', lambda: sanction_repo.count_many(g, sanction_type='ban', active=True)),
+        ('sanction_repo.get_by_user', lambda: sanction_repo.get_by_user(u, g)),
+        ('sanction_repo.get_active', lambda: sanction_repo.get_active(g)),
+        ('sanction_repo.get_by_type', lambda: sanction_repo.get_by_type(g, 'ban')),
+        ('sanction_repo.get_stats_by_type', lambda: sanction_repo.get_stats_by_type(g)),
+        ('sanction_repo.get_stats_by_day', lambda: sanction_repo.get_stats_by_day(g)),
+        ('timeline_repo.get_page', lambda: timeline_repo.get_page(g)),
+        ('timeline_repo.get_page (page 2)', lambda: timeline_repo.get_page(g, timeline_cursor)),
+        ('timeline_repo.get_page (filtres)',
+         lambda: timeline_repo.get_page(g, log_type='ban', moderator_id=m, days=7)),
+        ('timeline_repo.iter_timeline (1000)',
+         lambda: list(islice(timeline_repo.iter_timeline(g), 1000))),
+        ('timeline_repo.get_watermarks', timeline_repo.get_watermarks),
+        ('timeline_repo.get_since', lambda: timeline_repo.get_since(g, watermarks)),
+        ('timeline_repo.get_columns (30 j)', lambda: timeline_repo.get_columns(g, 30)),
+        ('timeline_repo.get_columns (365 j)', lambda: timeline_repo.get_columns(g, 365)),
+        ('search_repo.build_match', lambda: search_repo.build_match(g, ctx['search'])),
+        ('search_repo.search', lambda: search_repo.search(g, ctx['search'])),
+        ('search_repo.search (kinds)', lambda: search_repo.search(g, ctx['search'], kinds=('warning', 'automod'))),
+        ('user_repo.get_list', lambda: user_repo.get_list(g)),
+        ('user_repo.get_list (filtres)', lambda: user_repo.get_list(g, search='a', min_warnings=3)),
+        ('user_repo.get_warning_distribution', lambda: user_repo.get_warning_distribution(g)),
+        ('user_repo.get_joins_by_month', lambda: user_repo.get_joins_by_month(g)),
+        ('user_repo.get_watch_list', lambda: user_repo.get_watch_list(g)),
+        ('bundle.fetch_bundle (Dashboard)', lambda: bundle.fetch_bundle({
+            'snapshot': (guild_repo.get_snapshot, g),
+            'recent_activity': (guild_repo.get_recent_activity, g),
+            'stats_by_day': (warning_repo.get_stats_by_day, g),
+        })),
+        ('bundle.gather_bundle (Dashboard)', lambda: asyncio.run(bundle.gather_bundle({
+            'snapshot': (guild_repo.get_snapshot, g),
+            'recent_activity': (guild_repo.get_recent_activity, g),
+            'stats_by_day': (warning_repo.get_stats_by_day, g),
+        }))),
+    ]
+
+
+def _lots(conn, sql: str, params, names, runs: int, size: int):
+    """
+    Lots d'IDs disjoints (les plus récents d'abord), un par appel de chaque opération `names`.
+    Lots plus petits que `size` si la base n'a pas assez de lignes. Retourne ({op: [lots]}, taille).
+    """
+    ids = [row[0] for row in conn.execute(sql + " ORDER BY id DESC LIMIT ?", (*params, len(names) * runs * size))]
+    size = max(min(size, len(ids) // (len(names) * runs)), 1)
+    lots = iter([ids[i:i + size] for i in range(0, len(ids), size)])
+    return {name: [next(lots, []) for _ in range(runs)] for name in names}, size
+
+
+def write_cases(ctx: dict, runs: int) -> list:
+    """Écritures (sur une copie de la base) : chaque appel vise des lignes encore non modifiées."""
+    g, u, m = ctx['guild_id'], ctx['user_id'], ctx['moderator_id']
+    conn = connection.get_connection(readonly=True)
+    try:
+        # Désactivation sur des lignes actives, suppression / réaffectation sur les autres
+        warnings, warning_size = _lots(conn, "SELECT id FROM warnings WHERE guild_id = ? AND active = 1", (g,),
+                                       ('deactivate', 'expire'), runs, BULK_SIZE)
+        old_warnings, _ = _lots(conn, "SELECT id FROM warnings WHERE guild_id = ? AND active = 0", (g,),
+                                ('delete', 'reassign'), runs, warning_size)
+        sanctions, sanction_size = _lots(conn, "SELECT id FROM sanctions WHERE guild_id = ? AND active = 1", (g,),
+                                         ('deactivate', 'single'), runs, BULK_SIZE // 5)
+        old_sanctions, _ = _lots(conn, "SELECT id FROM sanctions WHERE guild_id = ? AND active = 0", (g,),
+                                 ('delete', 'reassign'), runs, sanction_size)
+    finally:
+        conn.close()
+    lots = {**{f"warning_{k}": v for k, v in {**warnings, **old_warnings}.items()},
+            **{f"sanction_{k}": v for k, v in {**sanctions, **old_sanctions}.items()}}
+
+    def pop(name):
+        return lots[name].pop() if lots[name] else []
+
+    sanction = {'guild_id': g, 'user_id': u, 'moderator_id': m, 'type': 'mute',
+                'reason': 'Benchmark', 'duration': 600}
+    return [
+        ('guild_repo.update_settings', lambda: guild_repo.update_settings(g, {'prefix': '!'})),
+        ('sanction_repo.create', lambda: sanction_repo.create(sanction)),
+        ('sanction_repo.deactivate', lambda: sanction_repo.deactivate((pop('sanction_single') or [0])[0])),
+        (f'warning_repo.deactivate_many ({warning_size})',
+         lambda: warning_repo.deactivate_many(g, ids=pop('warning_deactivate'))),
+        (f'warning_repo.expire_many ({warning_size})',
+         lambda: warning_repo.expire_many(g, ids=pop('warning_expire'))),
+        (f'warning_repo.delete_many ({warning_size})',
+         lambda: warning_repo.delete_many(g, ids=pop('warning_delete'))),
+        (f'warning_repo.reassign_moderator ({warning_size})',
+         lambda: warning_repo.reassign_moderator(g, u, ids=pop('warning_reassign'))),
+        (f'sanction_repo.deactivate_many ({sanction_size})',
+         lambda: sanction_repo.deactivate_many(g, ids=pop('sanction_deactivate'))),
+        (f'sanction_repo.delete_many ({sanction_size})',
+         lambda: sanction_repo.delete_many(g, ids=pop('sanction_delete'))),
+        (f'sanction_repo.reassign_moderator ({sanction_size})',
+         lambda: sanction_repo.reassign_moderator(g, u, ids=pop('sanction_reassign'))),
+    ]
+
+
+def page_cases(ctx: dict, writes: bool = False) -> list:
+    """Requêtes des pages (migrations.PAGE_QUERIES), paramètres remplacés par ceux du contexte."""
+    cases = []
+    for label, sql, params in migrations.PAGE_QUERIES:
+        is_read = sql.lstrip().upper().startswith(('SELECT', 'WITH'))
+        if is_read == writes:
+            continue
+        values = {name: ctx.get(name, value) for name, value in params.items()}
+
+        def run(sql=sql, values=values, is_read=is_read):
+            conn = connection.get_connection(readonly=is_read)
+            try:
+                rows = conn.execute(sql, values).fetchall()
+                if not is_read:
+                    conn.commit()
+                return rows
+            finally:
+                conn.close()
+
+        cases.append((label, run))
+    return cases
+
+
+def uncovered(labels) -> list:
+    """Fonctions publiques des modules repositories sans cas mesuré."""
+    covered = {label.split(' ')[0] for label in labels}
+    missing = []
+    for module_info in pkgutil.iter_modules(repositories.__path__):
+        module = importlib.import_module(f"{repositories.__name__}.{module_info.name}")
+        for name, func in inspect.getmembers(module, inspect.isfunction):
+            label = f"{module_info.name}.{name}"
+            if (name.startswith('_') or inspect.unwrap(func).__module__ != module.__name__
+                    or label in covered or label in EXCLUDED):
+                continue
+            missing.append(label)
+    return missing
+
+
+def _size(result):
+    if hasattr(result, 'items') and isinstance(result.items, list):
+        return len(result.items)   # Page
+    if isinstance(result, (list, dict, tuple)):
+        return len(result)
+    return None
+
+
+def measure(label: str, kind: str, func, reruns: int, warmup: int) -> dict:
+    """Temps d'appel (ms) sur `reruns` appels ; `queries` ne compte que les requêtes du thread courant."""
+    for _ in range(warmup):
+        func()
+    with instrumentation.capture_queries() as captured:
+        result = func()
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'name': label,
+        'kind': kind,
+        'queries': len(captured),
+        'rows': _size(result),
+        'mean_ms': statistics.mean(timings),
+        'p50_ms': statistics.median(timings),
+        'p95_ms': timings[max(int(len(timings) * 0.95) - 1, 0)],
+        'min_ms': timings[0],
+        'max_ms': timings[-1],
+    }
+
+
+def _counts(path: Path) -> dict:
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('guilds', 'users', 'warnings', 'sanctions', 'automod_logs')}
+    finally:
+        conn.close()
+
+
+def _use(path: Path):
+    connection.DB_PATH = path
+    connection.reset_pools()
+
+
+def bench_database(name: str, path: Path, guild_id: str, reruns: int, warmup: int, writes: bool) -> dict:
+    _use(path)
+    pending = migrations.pending_migrations()
+    if pending:
+        sys.exit(f"{path} : migrations en attente ({', '.join(pending)}), "
+                 f"python -m database.python.migrations --db {path}")
+    conn = connection.get_connection(readonly=True)
+    try:
+        ctx = _context(conn, guild_id)
+    finally:
+        conn.close()
+
+    results = []
+    for label, func in read_cases(ctx):
+        results.append(measure(label, 'repository', func, reruns, warmup))
+    for label, func in page_cases(ctx):
+        results.append(measure(label, 'page', func, reruns, warmup))
+
+    if writes:
+        with tempfile.TemporaryDirectory() as tmp:
+            copy = Path(tmp) / path.name
+            shutil.copyfile(path, copy)
+            _use(copy)
+            cases = write_cases(ctx, reruns + warmup + 1) + page_cases(ctx, writes=True)
+            for label, func in cases:
+                results.append(measure(label, 'write', func, reruns, warmup))
+            _use(path)
+
+    return {
+        'name': name,
+        'path': str(path),
+        'counts': _counts(path),
+        'guild_id': ctx['guild_id'],
+        'results': results,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: dict, previous: dict, threshold: float = COMPARE_THRESHOLD) -> list:
+    """Écarts de p50 entre deux rapports : [(base, cas, avant ms, après ms, ratio)] hors seuil."""
+    before = {(db['name'], r['name']): r['p50_ms'] for db in previous['databases'] for r in db['results']}
+    changes = []
+    for db in report['databases']:
+        for r in db['results']:
+            old = before.get((db['name'], r['name']))
+            if old is None or old <= 0:
+                continue
+            ratio = r['p50_ms'] / old
+            if abs(r['p50_ms'] - old) < COMPARE_MIN_DELTA_MS:
+                continue
+            if ratio >= threshold or ratio <= 1 / threshold:
+                changes.append((db['name'], r['name'], old, r['p50_ms'], ratio))
+    return changes
+
+
+def _database_arg(value: str):
+    name, _, path = value.rpartition('=')
+    path = Path(path)
+    return name or path.stem, path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark repositories et requêtes des pages")
+    parser.add_argument('--db', dest='databases', type=_database_arg, action='append', default=None,
+                        help="Base à mesurer, [nom=]chemin (répétable ; défaut: database/cardinal.db)")
+    parser.add_argument('--guild', default=None, help="ID du serveur (défaut: celui qui a le plus de warnings)")
+    parser.add_argument('--reruns', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--writes', action='store_true', help="Mesurer aussi les écritures (sur une copie)")
+    parser.add_argument('--output', type=Path, default=None, help="Fichier JSON des résultats")
+    parser.add_argument('--compare', type=Path, default=None, help="JSON d'un run précédent")
+    args = parser.parse_args()
+
+    databases = args.databases or [('cardinal', connection.DB_PATH)]
+    # Mesure des requêtes, pas du cache
+    cache.set_enabled(False)
+
+    report = {
+        'commit': _git_commit(),
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'reruns': args.reruns,
+        'databases': [],
+        'uncovered': [],
+    }
+    for name, path in databases:
+        if not path.exists():
+            sys.exit(f"{path} introuvable")
+        db = bench_database(name, path, args.guild, args.reruns, args.warmup, args.writes)
+        report['databases'].append(db)
+
+        print(f"\n{name} ({path}) | guild {db['guild_id']} | "
+              + ' | '.join(f"{table} {count}" for table, count in db['counts'].items()))
+        print(f"{'cas':<48} {'requêtes':>8} {'lignes':>8} {'p50 (ms)':>10} {'p95 (ms)':>10}")
+        for r in db['results']:
+            rows = '' if r['rows'] is None else r['rows']
+            print(f"{r['name']:<48} {r['queries']:>8} {rows:>8} {r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f}")
+
+    report['uncovered'] = uncovered(r['name'] for db in report['databases'] for r in db['results'])
+    if report['uncovered']:
+        print("\nFonctions repository non mesurées : " + ', '.join(report['uncovered']))
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"\nRésultats : {args.output}")
+
+    if args.compare:
+        previous = json.loads(args.compare.read_text(encoding='utf-8'))
+        changes = compare(report, previous)
+        print(f"\nComparaison avec {args.compare} (commit {previous.get('commit')}), p50, seuil x{COMPARE_THRESHOLD}")
+        for db_name, label, old, new, ratio in changes:
+            status = 'RÉGRESSION' if ratio > 1 else 'gain'
+            print(f"{status:<11} {db_name:<10} {label:<48} {old:>9.3f} -> {new:>9.3f} ms (x{ratio:.2f})")
+        if not changes:
+            print("Aucun écart au-delà du seuil")
+
+
+if __name__ == "__main__":
+    main()
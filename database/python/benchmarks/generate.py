@@ -0,0 +1,373 @@
+# Générateur de bases synthétiques (schema-unified.sql + migrations) pour les benchmarks
+#
+# Déterministe : même seed, même échelle et même --end => même base, ligne pour ligne
+# (hors users.updated_at, posé à CURRENT_TIMESTAMP par les triggers du schéma).
+# Répartition réaliste : taille des serveurs, users sanctionnés, modérateurs et salons suivent
+# une loi de Zipf (quelques serveurs / récidivistes / modérateurs concentrent l'activité),
+# activité en hausse sur la période, pic en soirée et le week-end, raids ponctuels côté automod.
+# Les lignes sont insérées dans l'ordre chronologique (id croissant avec created_at), tous
+# serveurs mêlés comme en production ; les migrations sont appliquées ensuite (backfill
+# des rollups, compteurs, index de recherche).
+#
+# Usage (depuis la racine du projet) :
+#   python -m database.python.benchmarks.generate --scale small --output /tmp/bench-small.db
+#   python -m database.python.benchmarks.generate --scale medium --seed 7 --warnings 1000000 --output /tmp/m.db
+import argparse
+import random
+import sqlite3
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from pathlib import Path
+
+from database.python import connection, migrations
+
+SCHEMA_PATH = Path(__file__).parent.parent.parent / 'schema-unified.sql'
+
+# Volumes totaux (tous serveurs) par échelle
+SCALES = {
+    'small': {'guilds': 3, 'members': 5_000, 'warnings': 20_000, 'sanctions': 4_000, 'automod_logs': 40_000},
+    'medium': {'guilds': 10, 'members': 100_000, 'warnings': 400_000, 'sanctions': 60_000,
+               'automod_logs': 800_000},
+    'large': {'guilds': 20, 'members': 1_000_000, 'warnings': 4_000_000, 'sanctions': 600_000,
+              'automod_logs': 8_000_000},
+}
+
+# Exposants de Zipf : taille des serveurs, users visés, modérateurs, salons
+GUILD_SKEW = 1.0
+OFFENDER_SKEW = 0.8
+MODERATOR_SKEW = 1.2
+CHANNEL_SKEW = 1.0
+# Part des membres qui reçoivent warnings / sanctions / logs automod (les autres n'en ont aucun)
+OFFENDER_RATE = 0.2
+
+# Activité relative par heure UTC (creux la nuit, pic en soirée)
+HOUR_WEIGHTS = [3, 2, 1.5, 1, 1, 1, 1.5, 2, 3, 4, 5, 6, 7, 7, 7, 8, 9, 10, 12, 14, 15, 14, 10, 6]
+WEEKEND_FACTOR = 1.3
+# Activité en fin de période / début de période
+GROWTH = 3.0
+# Jours de raid (automod) : part des jours et multiplicateur d'activité
+RAID_RATE = 0.02
+RAID_FACTOR = 15
+
+SANCTION_TYPES = {'timeout': 35, 'mute': 25, 'kick': 15, 'ban': 12, 'unmute': 8, 'unban': 5}
+SANCTION_DURATIONS = [600, 3600, 6 * 3600, 86400, 7 * 86400]
+TRIGGER_TYPES = {'spam': 40, 'links': 15, 'caps': 15, 'bad_words': 10, 'invites': 10,
+                 'mass_mentions': 5, 'blacklist': 5}
+TRIGGER_ACTIONS = {'spam': 'timeout', 'mass_mentions': 'timeout', 'blacklist': 'warn'}
+
+REASONS = [
+    "Spam dans le salon général", "Insultes envers un membre", "Langage inapproprié",
+    "Publicité non autorisée", "Flood de messages", "Contenu NSFW", "Harcèlement",
+    "Provocation répétée", "Non-respect des règles", "Mentions abusives", "Lien suspect",
+    "Usurpation d'identité", "Spam de réactions", "Hors sujet répété", "Comportement toxique",
+]
+TRIGGER_CONTENTS = {
+    'spam': ["aaaaaaaaaa", "free nitro free nitro", "lol lol lol lol"],
+    'links': ["https://bit.ly/{n}", "http://free-gift-{n}.xyz", "https://grabify.link/{n}"],
+    'caps': ["ARRÊTEZ DE ME MENTIONNER", "C'EST N'IMPORTE QUOI", "QUI VEUT JOUER {n}"],
+    'bad_words': ["message filtré #{n}", "mot interdit #{n}"],
+    'invites': ["discord.gg/{n}", "https://discord.gg/raid{n}"],
+    'mass_mentions': ["@everyone @here", "@user x{n}"],
+    'blacklist': ["terme blacklisté #{n}"],
+}
+SYLLABLES = ['ka', 'lo', 'mi', 'ra', 'to', 'zu', 'ne', 'shi', 'va', 'dor', 'lyn', 'rex', 'fox', 'nox',
+             'pix', 'el', 'an', 'qu', 'bo', 'ti']
+GUILD_WORDS = ['Gaming', 'Café', 'Communauté', 'Dev', 'Anime', 'Musique', 'FR', 'Hub', 'Arena', 'Lounge']
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+BATCH_SIZE = 10_000
+
+
+def _rng(seed: int, *parts) -> random.Random:
+    """Générateur dédié à (seed, parts) : ajouter un serveur ne décale pas les tirages des autres."""
+    return random.Random(':'.join(map(str, (seed, *parts))))
+
+
+def _zipf_cum(n: int, skew: float) -> list:
+    """Poids cumulés de Zipf pour n rangs (pour random.choices)."""
+    return list(accumulate(1 / (rank ** skew) for rank in range(1, n + 1)))
+
+
+def _split(total: int, cum_weights: list) -> list:
+    """Répartit `total` selon des poids cumulés (arrondi, reste au premier)."""
+    weights = [b - a for a, b in zip([0] + cum_weights, cum_weights)]
+    parts = [int(total * w / cum_weights[-1]) for w in weights]
+    parts[0] += total - sum(parts)
+    return parts
+
+
+def _snowflake(rng: random.Random, when: datetime) -> str:
+    """ID Discord plausible (horodatage depuis 2015 dans les bits de poids fort)."""
+    ms = max(int((when - datetime(2015, 1, 1, tzinfo=timezone.utc)).total_seconds() * 1000), 0)
+    return str((ms << 22) | rng.getrandbits(22))
+
+
+def _username(rng: random.Random) -> str:
+    name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3)))
+    return name + (str(rng.randint(1, 999)) if rng.random() < 0.4 else '')
+
+
+class Generator:
+    """Construit une base synthétique ; voir SCALES pour les volumes."""
+
+    def __init__(self, conn, seed: int, end: datetime, days: int, guilds: int, members: int,
+                 warnings: int, sanctions: int, automod_logs: int):
+        self.conn = conn
+        self.seed = seed
+        self.end = end
+        self.days = days
+        self.start = end - timedelta(days=days)
+        guild_cum = _zipf_cum(guilds, GUILD_SKEW)
+        self.counts = {
+            'members': _split(members, guild_cum),
+            'warnings': _split(warnings, guild_cum),
+            'sanctions': _split(sanctions, guild_cum),
+            'automod_logs': _split(automod_logs, guild_cum),
+        }
+        self.guilds = []   # [{'id', 'offenders', 'moderators', 'channels'} + poids cumulés]
+
+    # ---------- Horodatage ----------
+
+    def _slot_weights(self, rng: random.Random, raids: bool = False) -> list:
+        """Poids cumulés des créneaux horaires de la période (jour x heure)."""
+        weights = []
+        for day in range(self.days):
+            date = self.start + timedelta(days=day)
+            factor = 1 + (GROWTH - 1) * day / max(self.days - 1, 1)
+            if date.weekday() >= 5:
+                factor *= WEEKEND_FACTOR
+            if raids and rng.random() < RAID_RATE:
+                factor *= RAID_FACTOR
+            weights.extend(factor * w for w in HOUR_WEIGHTS)
+        return list(accumulate(weights))
+
+    def _slots(self, rng: random.Random, count: int, cum_weights: list) -> Counter:
+        """Nb d'événements par créneau horaire."""
+        return Counter(rng.choices(range(len(cum_weights)), cum_weights=cum_weights, k=count))
+
+    def _events(self, table: str, raids: bool = False):
+        """
+        Événements de `table` dans l'ordre chronologique, tous serveurs mêlés.
+        Yield (rng, guild, created_at) ; rng est celui du serveur pour cette table.
+        """
+        per_guild = []
+        for index, guild in enumerate(self.guilds):
+            rng = _rng(self.seed, table, index)
+            cum_weights = self._slot_weights(rng, raids)
+            per_guild.append((rng, guild, self._slots(rng, self.counts[table][index], cum_weights)))
+        for slot in range(self.days * 24):
+            hour = self.start + timedelta(hours=slot)
+            events = []
+            for rng, guild, slots in per_guild:
+                for _ in range(slots.get(slot, 0)):
+                    events.append((rng.randrange(3600), len(events), rng, guild))
+            events.sort(key=lambda e: e[:2])
+            for second, _, rng, guild in events:
+                yield rng, guild, hour + timedelta(seconds=second)
+
+    # ---------- Tables ----------
+
+    def _insert(self, sql: str, rows):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                self.conn.executemany(sql, batch)
+                batch.clear()
+        if batch:
+            self.conn.executemany(sql, batch)
+
+    def guilds_and_members(self):
+        for index, members in enumerate(self.counts['members']):
+            rng = _rng(self.seed, 'guild', index)
+            created = self.start - timedelta(days=rng.randint(30, 1500))
+            guild_id = _snowflake(rng, created)
+            members = max(members, 1)
+            # Membres par date d'arrivée : les premiers arrivés forment l'équipe de modération
+            joined = sorted(created + timedelta(seconds=rng.randrange(int((self.end - created).total_seconds())))
+                            for _ in range(members))
+            ids, seen = [], set()
+            for when in joined:
+                discord_id = _snowflake(rng, when - timedelta(days=rng.randint(0, 1000)))
+                while discord_id in seen:
+                    discord_id = _snowflake(rng, when)
+                seen.add(discord_id)
+                ids.append(discord_id)
+            moderators = ids[:min(max(2, members // 1500), 50)]
+            # Récidivistes tirés au hasard : rang indépendant de la date d'arrivée
+            offenders = rng.sample(ids, max(int(members * OFFENDER_RATE), 1))
+            channels = [_snowflake(rng, created) for _ in range(min(5 + members // 2000, 200))]
+            self.guilds.append({
+                'id': guild_id,
+                'offenders': offenders,
+                'offender_cum': _zipf_cum(len(offenders), OFFENDER_SKEW),
+                'moderators': moderators,
+                'moderator_cum': _zipf_cum(len(moderators), MODERATOR_SKEW),
+                'channels': channels,
+                'channel_cum': _zipf_cum(len(channels), CHANNEL_SKEW),
+            })
+            name = f"{rng.choice(GUILD_WORDS)} {rng.choice(GUILD_WORDS)} #{index + 1}"
+            self.conn.execute(
+                "INSERT INTO guilds (id, name, member_count, owner_id, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (guild_id, name, members, ids[0], created.strftime(TIME_FORMAT), created.strftime(TIME_FORMAT))
+            )
+            self.conn.execute("INSERT INTO automod (guild_id, enabled) VALUES (?, 1)", (guild_id,))
+
+            def users():
+                for discord_id, when in zip(ids, joined):
+                    username = _username(rng)
+                    active = rng.random() < 0.9
+                    last_seen = self.end - timedelta(minutes=rng.randrange(60 * 24 * (7 if active else 365)))
+                    yield (
+                        discord_id, guild_id, username,
+                        _username(rng) if rng.random() < 0.3 else None,
+                        when.strftime(TIME_FORMAT), int(active), last_seen.strftime(TIME_FORMAT),
+                        discord_id, when.strftime(TIME_FORMAT), when.strftime(TIME_FORMAT),
+                    )
+
+            self._insert("""
+                INSERT INTO users (discord_id, guild_id, username, server_username, joined_at, is_active,
+                                   last_seen, user_id, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, users())
+
+    def _offender(self, rng, guild):
+        return rng.choices(guild['offenders'], cum_weights=guild['offender_cum'])[0]
+
+    def _moderator(self, rng, guild):
+        return rng.choices(guild['moderators'], cum_weights=guild['moderator_cum'])[0]
+
+    def warnings(self):
+        recent = self.end - timedelta(days=30)
+
+        def rows():
+            for rng, guild, when in self._events('warnings'):
+                active = rng.random() < (0.9 if when >= recent else 0.3)
+                expires = when + timedelta(days=30) if rng.random() < 0.5 else None
+                yield (
+                    guild['id'], self._offender(rng, guild), self._moderator(rng, guild),
+                    rng.choice(REASONS), when.strftime(TIME_FORMAT), int(active),
+                    expires.strftime(TIME_FORMAT) if expires else None,
+                )
+
+        self._insert("""
+            INSERT INTO warnings (guild_id, user_id, moderator_id, reason, created_at, active, expires_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows())
+
+    def sanctions(self):
+        types, type_cum = list(SANCTION_TYPES), list(accumulate(SANCTION_TYPES.values()))
+
+        def rows():
+            for rng, guild, when in self._events('sanctions'):
+                sanction_type = rng.choices(types, cum_weights=type_cum)[0]
+                duration = expires = None
+                if sanction_type in ('mute', 'timeout'):
+                    duration = rng.choice(SANCTION_DURATIONS)
+                    expires = when + timedelta(seconds=duration)
+                    active = expires > self.end
+                elif sanction_type == 'ban':
+                    active = rng.random() < 0.8
+                else:
+                    active = False
+                yield (
+                    guild['id'], self._offender(rng, guild), self._moderator(rng, guild), sanction_type,
+                    rng.choice(REASONS), duration, expires.strftime(TIME_FORMAT) if expires else None,
+                    int(active), when.strftime(TIME_FORMAT),
+                )
+
+        self._insert("""
+            INSERT INTO sanctions (guild_id, user_id, moderator_id, type, reason, duration, expires_at,
+                                   active, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows())
+
+    def automod_logs(self):
+        triggers, trigger_cum = list(TRIGGER_TYPES), list(accumulate(TRIGGER_TYPES.values()))
+
+        def rows():
+            for rng, guild, when in self._events('automod_logs', raids=True):
+                trigger = rng.choices(triggers, cum_weights=trigger_cum)[0]
+                content = rng.choice(TRIGGER_CONTENTS[trigger]).format(n=rng.randint(1, 9999))
+                yield (
+                    guild['id'], self._offender(rng, guild), rng.choices(guild['channels'], cum_weights=guild['channel_cum'])[0],
+                    _snowflake(rng, when), trigger, content, TRIGGER_ACTIONS.get(trigger, 'delete'),
+                    rng.choices((1, 2, 3), cum_weights=(70, 90, 100))[0], round(rng.uniform(0.5, 1), 2),
+                    when.strftime(TIME_FORMAT),
+                )
+
+        self._insert("""
+            INSERT INTO automod_logs (guild_id, user_id, channel_id, message_id, trigger_type, trigger_content,
+                                      action_taken, severity, confidence_score, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows())
+
+
+def generate(output: Path, seed: int = 42, end: datetime = None, days: int = 365, **counts) -> dict:
+    """
+    Crée la base `output` (qui ne doit pas exister) : schéma unifié, données, migrations.
+    counts : guilds, members, warnings, sanctions, automod_logs. Retourne les durées par étape (s).
+    """
+    if end is None:
+        end = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    conn = sqlite3.connect(str(output), isolation_level=None)
+    # Base jetable jusqu'à la fin du chargement : pas de journal
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.executescript(SCHEMA_PATH.read_text(encoding='utf-8'))
+    generator = Generator(conn, seed, end, days, **counts)
+    timings = {}
+    for step in ('guilds_and_members', 'warnings', 'sanctions', 'automod_logs'):
+        started = time.perf_counter()
+        conn.execute("BEGIN")
+        getattr(generator, step)()
+        conn.execute("COMMIT")
+        timings[step] = time.perf_counter() - started
+    conn.close()
+
+    started = time.perf_counter()
+    previous = connection.DB_PATH
+    connection.DB_PATH = output
+    connection.reset_pools()
+    try:
+        migrations.migrate()
+    finally:
+        connection.DB_PATH = previous
+        connection.reset_pools()
+    timings['migrations'] = time.perf_counter() - started
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Base SQLite synthétique pour les benchmarks")
+    parser.add_argument('--output', type=Path, required=True)
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--end', default=None, help="Date de fin YYYY-MM-DD (défaut: aujourd'hui, UTC)")
+    parser.add_argument('--days', type=int, default=365, help="Profondeur d'historique (jours)")
+    parser.add_argument('--force', action='store_true', help="Écraser la base existante")
+    for name in SCALES['small']:
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=int, default=None,
+                            help=f"Surcharge le volume '{name}' de l'échelle")
+    args = parser.parse_args()
+
+    if args.output.exists():
+        if not args.force:
+            sys.exit(f"{args.output} existe déjà (--force pour écraser)")
+        args.output.unlink()
+    counts = {name: getattr(args, name) if getattr(args, name) is not None else value
+              for name, value in SCALES[args.scale].items()}
+    end = datetime.strptime(args.end, '%Y-%m-%d').replace(tzinfo=timezone.utc) if args.end else None
+
+    timings = generate(args.output, args.seed, end, args.days, **counts)
+    print(f"{args.output} | échelle {args.scale} | seed {args.seed} | "
+          + ' | '.join(f"{name} {value}" for name, value in counts.items()))
+    for step, elapsed in timings.items():
+        print(f"  {step:<20} {elapsed:>8.1f} s")
+
+
+if __name__ == "__main__":
+    main()
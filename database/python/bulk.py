@@ -0,0 +1,61 @@
+# Opérations en masse sur une table par guild (warnings, sanctions)
+#
+# Une opération = une transaction. Les IDs sont chargés par executemany dans une table temporaire,
+# puis un seul UPDATE / DELETE ensembliste s'applique. Pas de gros paramètre lié : le trace callback
+# (instrumentation) reçoit le statement développé à chaque statement de trigger, un paramètre JSON
+# de milliers d'IDs y coûtait plus que l'opération elle-même.
+# Les triggers (compteurs users, rollups, table_versions, search_index) s'appliquent ligne à ligne
+# dans la même transaction.
+from database.python.connection import DatabaseConnection
+
+
+def _target(conn, table: str, alias: str, guild_id: str, ids=None, where: str = '', params=()):
+    """
+    Clause WHERE des lignes visées dans une guild : liste d'IDs, ou filtre `where` (clauses
+    " AND ..." sur l'alias, comme les get_page). Retourne (sql, params).
+    """
+    if ids is not None:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS bulk_ids (id INTEGER PRIMARY KEY)")
+        conn.execute("DELETE FROM temp.bulk_ids")
+        conn.executemany("INSERT OR IGNORE INTO temp.bulk_ids (id) VALUES (?)", ((int(i),) for i in ids))
+        # `+guild_id` : parcours par rowid des IDs, pas de toute la guild
+        return "id IN (SELECT id FROM temp.bulk_ids) AND +guild_id = ?", [guild_id]
+    if not where:
+        # Pas de filtre = toute la guild : refusé plutôt que deviné
+        raise ValueError("Opération en masse sans IDs ni filtre")
+    return (f"id IN (SELECT {alias}.id FROM {table} {alias} WHERE {alias}.guild_id = ?{where})",
+            [guild_id, *params])
+
+
+def count(table: str, alias: str, guild_id: str, where: str = '', params=()) -> int:
+    """Nb de lignes visées par un filtre (cf. _target), pour confirmation avant une opération."""
+    if not where:
+        raise ValueError("Opération en masse sans IDs ni filtre")
+    with DatabaseConnection(readonly=True) as conn:
+        return conn.execute(
+            f"SELECT COUNT(*) FROM {table} {alias} WHERE {alias}.guild_id = ?{where}", [guild_id, *params]
+        ).fetchone()[0]
+
+
+def update(table: str, alias: str, assignments: str, guild_id: str, ids=None, where: str = '',
+           params=(), assignment_params=(), condition: str = '', condition_params=()) -> int:
+    """
+    UPDATE {table} SET {assignments} sur les lignes visées (cf. _target).
+    condition: clause supplémentaire (sans alias) qui exclut les lignes déjà dans l'état voulu.
+    Retourne le nb de lignes modifiées.
+    """
+    with DatabaseConnection() as conn:
+        target, target_params = _target(conn, table, alias, guild_id, ids, where, params)
+        cursor = conn.execute(
+            f"UPDATE {table} SET {assignments} WHERE {target}{condition}",
+            [*assignment_params, *target_params, *condition_params]
+        )
+        return cursor.rowcount
+
+
+def delete(table: str, alias: str, guild_id: str, ids=None, where: str = '', params=()) -> int:
+    """DELETE des lignes visées (cf. _target). Retourne le nb de lignes supprimées."""
+    with DatabaseConnection() as conn:
+        target, target_params = _target(conn, table, alias, guild_id, ids, where, params)
+        cursor = conn.execute(f"DELETE FROM {table} WHERE {target}", target_params)
+        return cursor.rowcount
@@ -0,0 +1,173 @@
+# Cache des résultats repository, invalidé seulement quand la table concernée a été écrite
+#
+# Validation en deux temps :
+#   1. PRAGMA data_version sur une connexion dédiée : inchangé => aucune écriture, tout est valide
+#   2. sinon relecture de table_versions (migration 003, maintenue par triggers) et comparaison
+#      des versions (table, guild) enregistrées avec chaque entrée
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+
+from database.python import connection
+
+# Nombre max d'entrées (éviction LRU)
+MAX_ENTRIES = int(os.getenv('DB_CACHE_SIZE', 256))
+
+enabled = os.getenv('DB_CACHE', 'true').lower() == 'true'
+
+
+class QueryCache:
+    """Cache LRU de résultats, entrées marquées par les versions des tables lues."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # clé -> (guild_id, tables, versions, valeur)
+        self._lock = threading.Lock()
+        self._probe = None             # data_version est propre à chaque connexion
+        self._probe_path = None
+        self._data_version = None
+        self._versions = {}            # (table, guild_id) -> version
+        self._totals = {}              # table -> somme des versions (entrées globales)
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def _refresh(self) -> bool:
+        """Relit table_versions si une autre connexion a écrit. False si la table n'existe pas."""
+        try:
+            if self._probe is not None and self._probe_path != connection.DB_PATH:
+                # Base changée (tests, --db) : les entrées ne sont plus valables
+                self._entries.clear()
+                self._probe.close()
+                self._probe = None
+            if self._probe is None:
+                self._probe = connection._pools[True]._open()
+                self._probe._pool = None  # close() ferme réellement
+                self._probe_path = connection.DB_PATH
+                self._data_version = None
+            data_version = sqlite3.Connection.execute(self._probe, "PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version:
+                rows = sqlite3.Connection.execute(
+                    self._probe, "SELECT table_name, guild_id, version FROM table_versions"
+                ).fetchall()
+                self._versions = {(table, guild_id): version for table, guild_id, version in rows}
+                self._totals = {}
+                for (table, _), version in self._versions.items():
+                    self._totals[table] = self._totals.get(table, 0) + version
+                self._data_version = data_version
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _stamp(self, tables, guild_id):
+        if guild_id is None:
+            return tuple(self._totals.get(table, 0) for table in tables)
+        return tuple(self._versions.get((table, guild_id), 0) for table in tables)
+
+    def get_or_compute(self, key, tables, guild_id, compute):
+        """Retourne la valeur en cache si les tables n'ont pas changé, sinon appelle compute()."""
+        with self._lock:
+            if not self._refresh():
+                self.stats['misses'] += 1
+                return compute()
+            stamp = self._stamp(tables, guild_id)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] == stamp:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry[3]
+                del self._entries[key]
+                self.stats['invalidations'] += 1
+            self.stats['misses'] += 1
+
+        # Calcul hors verrou : les requêtes d'un fetch_bundle restent parallèles.
+        # Le stamp est pris avant la lecture : une écriture concurrente invalidera l'entrée.
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = (guild_id, tables, stamp, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+        return value
+
+    def invalidate(self, guild_id: str = None):
+        """Supprime les entrées d'une guild (et les entrées globales), ou toutes si guild_id est None."""
+        with self._lock:
+            if guild_id is None:
+                self._entries.clear()
+                return
+            for key in [k for k, e in self._entries.items() if e[0] in (guild_id, None)]:
+                del self._entries[key]
+
+    def clear(self):
+        """Vide le cache et ferme la connexion de contrôle (ex: après changement de DB_PATH)."""
+        with self._lock:
+            self._entries.clear()
+            if self._probe is not None:
+                self._probe.close()
+                self._probe = None
+            self._data_version = None
+            self._versions, self._totals = {}, {}
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+            stats['max_entries'] = self.max_entries
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+
+query_cache = QueryCache()
+
+
+def cached(*tables, per_guild: bool = True):
+    """
+    Met en cache le résultat d'une fonction repository.
+
+    tables: tables lues par la fonction (invalidation)
+    per_guild: le premier argument est le guild_id ; sinon l'entrée dépend de toutes les guilds
+
+    La date UTC fait partie de la clé : les fenêtres DATE('now', '-N days') avancent chaque jour.
+    Le résultat est partagé entre les appels : ne pas le modifier.
+
+    Ex:
+        @cached('warnings')
+        def get_stats_by_day(guild_id, days=30): ...
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            guild_id = (args[0] if args else kwargs.get('guild_id')) if per_guild else None
+            today = datetime.now(timezone.utc).date()
+            key = (name, today, args, tuple(sorted(kwargs.items())))
+            return query_cache.get_or_compute(key, tables, guild_id, lambda: func(*args, **kwargs))
+
+        return wrapper
+    return decorator
+
+
+def get_cache_stats() -> dict:
+    """Compteurs du cache (hits, misses, évictions, invalidations, taux de succès)."""
+    return query_cache.get_stats()
+
+
+def set_enabled(value: bool):
+    """Active/désactive le cache à chaud."""
+    global enabled
+    enabled = value
+    if not value:
+        query_cache.invalidate()
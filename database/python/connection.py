@@ -1,16 +1,269 @@
 # Connexion à la base SQLite
 import sqlite3
 import os
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
+from database.python import instrumentation
+
 # Chemin vers la BDD (relative au projet)
 DB_PATH = Path(__file__).parent.parent.parent / 'database' / 'cardinal.db'
 
-def get_connection():
-    """Retourne une connexion à la BDD."""
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.row_factory = sqlite3.Row  # Accès par nom de colonne
-    return conn
+# Taille max du pool (connexions inactives conservées par mode)
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 8))
+
+# Pragmas appliqués à l'ouverture (compatibles avec le mode WAL du bot)
+PRAGMAS = {
+    'busy_timeout': 5000,       # ms d'attente si le bot écrit
+    'cache_size': -16000,       # 16 Mo de cache de pages
+    'mmap_size': 268435456,     # 256 Mo mappés en mémoire
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
+}
+
+# Pragmas spécifiques au mode écriture / lecture
+WRITER_PRAGMAS = {
+    'synchronous': 'NORMAL',
+}
+READER_PRAGMAS = {
+    'query_only': 'ON',
+}
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Curseur qui mesure durée (execute + fetch) et lignes retournées par requête."""
+    _pending = None  # [sql, secondes, lignes] de la requête en cours
+
+    def _flush(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            instrumentation.record_query(*pending)
+
+    def _timed(self, method, sql, *args):
+        self._flush()
+        instrumentation.capture(sql, *args)
+        if not instrumentation.enabled:
+            return method(sql, *args)
+        start = time.perf_counter()
+        try:
+            return method(sql, *args)
+        finally:
+            self._pending = [sql, time.perf_counter() - start, 0]
+
+    def _fetched(self, method, *args, exhausted=None):
+        if self._pending is None:
+            return method(*args)
+        start = time.perf_counter()
+        result = method(*args)
+        self._pending[1] += time.perf_counter() - start
+        if isinstance(result, list):
+            self._pending[2] += len(result)
+        elif result is not None:
+            self._pending[2] += 1
+        if exhausted is None or exhausted(result):
+            self._flush()
+        return result
+
+    def execute(self, sql, parameters=()):
+        self._timed(super().execute, sql, parameters)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._timed(super().executemany, sql, seq_of_parameters)
+        return self
+
+    def fetchone(self):
+        return self._fetched(super().fetchone, exhausted=lambda row: row is None)
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        return self._fetched(super().fetchmany, size, exhausted=lambda rows: len(rows) < size)
+
+    def fetchall(self):
+        return self._fetched(super().fetchall)
+
+    def close(self):
+        self._flush()
+        super().close()
+
+    def __del__(self):
+        self._flush()
+
+
+class PooledConnection(sqlite3.Connection):
+    """Connexion SQLite dont close() la rend au pool au lieu de la fermer."""
+    _pool = None
+    _pinned = False  # True pendant un read_snapshot()
+    _traced = False
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def sync_tracing(self):
+        """Branche/débranche le trace callback selon l'état de l'instrumentation."""
+        if self._traced != instrumentation.enabled:
+            self.set_trace_callback(instrumentation.trace_callback if instrumentation.enabled else None)
+            self._traced = instrumentation.enabled
+
+    def commit(self):
+        if not self._pinned:
+            super().commit()
+
+    def rollback(self):
+        if not self._pinned:
+            super().rollback()
+
+    def close(self):
+        if self._pinned:
+            return
+        if self._pool is not None:
+            self._pool.release(self)
+        else:
+            super().close()
+
+    def close_now(self):
+        """Ferme réellement la connexion."""
+        super().close()
+
+
+class ConnectionPool:
+    """Pool de connexions réutilisées entre les reruns Streamlit."""
+
+    def __init__(self, readonly: bool = False, max_size: int = POOL_SIZE):
+        self.readonly = readonly
+        self.max_size = max_size
+        self._idle = []
+        self._lock = threading.Lock()
+        self.stats = {'opened': 0, 'reused': 0, 'discarded': 0}
+
+    def _open(self):
+        if self.readonly:
+            # mode=ro : le panel ne prend jamais de verrou d'écriture sur la base du bot
+            database, uri = Path(DB_PATH).resolve().as_uri() + '?mode=ro', True
+        else:
+            database, uri = str(DB_PATH), False
+        conn = sqlite3.connect(
+            database,
+            uri=uri,
+            factory=PooledConnection,
+            check_same_thread=False  # une connexion peut changer de thread entre deux reruns
+        )
+        conn.row_factory = sqlite3.Row  # Accès par nom de colonne
+        pragmas = dict(PRAGMAS)
+        pragmas.update(READER_PRAGMAS if self.readonly else WRITER_PRAGMAS)
+        for name, value in pragmas.items():
+            sqlite3.Connection.execute(conn, f"PRAGMA {name} = {value}")  # hors instrumentation
+        conn._pool = self
+        conn.sync_tracing()
+        return conn
+
+    def acquire(self):
+        """Retourne une connexion inactive ou en ouvre une nouvelle."""
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+            self.stats['reused' if conn else 'opened'] += 1
+        if conn is None:
+            return self._open()
+        conn.sync_tracing()
+        return conn
+
+    def release(self, conn):
+        """Remet une connexion dans le pool (ou la ferme si le pool est plein)."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+        except sqlite3.ProgrammingError:
+            # Déjà fermée
+            return
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(conn)
+                return
+            self.stats['discarded'] += 1
+        conn.close_now()
+
+    def clear(self):
+        """Ferme toutes les connexions inactives."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close_now()
+
+
+_pools = {
+    False: ConnectionPool(readonly=False),
+    True: ConnectionPool(readonly=True),
+}
+
+_local = threading.local()
+
+
+def get_connection(readonly: bool = False):
+    """
+    Retourne une connexion à la BDD depuis le pool.
+    conn.close() la rend au pool ; readonly=True ouvre en mode=ro + query_only.
+    Dans un read_snapshot(), les lectures réutilisent la connexion du snapshot.
+    """
+    if readonly:
+        snapshot = getattr(_local, 'snapshot', None)
+        if snapshot is not None:
+            return snapshot
+    return _pools[readonly].acquire()
+
+
+@contextmanager
+def read_snapshot():
+    """
+    Exécute un bloc (ex: le rendu d'une page) dans une seule transaction de lecture.
+    Toutes les lectures du thread voient le même état de la base, même si le bot écrit.
+    Utilisable aussi comme décorateur : @read_snapshot()
+    """
+    current = getattr(_local, 'snapshot', None)
+    if current is not None:
+        # Snapshot imbriqué : on réutilise celui en cours
+        yield current
+        return
+
+    pool = _pools[True]
+    conn = pool.acquire()
+    try:
+        # BEGIN ou la lecture peuvent échouer (ex: SQLITE_BUSY) : release() annule la transaction
+        conn.execute("BEGIN")
+        conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()  # fige le snapshot WAL
+        conn._pinned = True
+        _local.snapshot = conn
+        yield conn
+    finally:
+        _local.snapshot = None
+        conn._pinned = False
+        pool.release(conn)
+
+
+def get_pool_stats():
+    """Compteurs d'ouverture/réutilisation des pools."""
+    return {
+        'write': dict(_pools[False].stats),
+        'read': dict(_pools[True].stats),
+    }
+
+
+def reset_pools(max_size: int = None):
+    """Ferme les connexions inactives (ex: après changement de DB_PATH)."""
+    for pool in _pools.values():
+        pool.clear()
+        pool.stats = {'opened': 0, 'reused': 0, 'discarded': 0}
+        if max_size is not None:
+            pool.max_size = max_size
+
 
 def dict_from_row(row):
     """Convertit une Row en dict."""
@@ -19,15 +272,24 @@ def dict_from_row(row):
     return dict(row)
 
 class DatabaseConnection:
-    """Context manager pour connexions."""
+    """Context manager pour connexions (commit si succès, rollback sinon)."""
+    def __init__(self, readonly: bool = False):
+        self.readonly = readonly
+
     def __enter__(self):
-        self.conn = get_connection()
+        self.conn = get_connection(self.readonly)
         return self.conn
-    
+
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.conn.close()
+        try:
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        finally:
+            self.conn.close()
 
 # Usage:
-# with DatabaseConnection() as conn:
+# with DatabaseConnection(readonly=True) as conn:
 #     cursor = conn.execute("SELECT * FROM guilds")
 #     rows = cursor.fetchall()
@@ -0,0 +1,92 @@
+# Compteurs dénormalisés des users (total_warnings, total_sanctions, risk_score)
+#
+# Maintenus par triggers (schéma + migration 004). Ils peuvent dériver si une écriture
+# les contourne (ex: upsert d'un user par le bot avec des compteurs en mémoire).
+# Ce job détecte et corrige les écarts.
+#
+# Usage (depuis la racine du projet) :
+#   python -m database.python.counters --check              # liste les écarts
+#   python -m database.python.counters --repair [--guild ID]
+import argparse
+import sys
+from pathlib import Path
+
+from database.python.connection import DatabaseConnection, dict_from_row
+
+# Compteurs attendus par user, recalculés depuis les tables (warnings / sanctions actifs)
+# `+active` : force la recherche par l'index (guild_id, user_id) plutôt que (active, expires_at)
+EXPECTED_SQL = """
+    SELECT u.id, u.discord_id, u.guild_id,
+           u.total_warnings, u.total_sanctions, u.risk_score,
+           (SELECT COUNT(*) FROM warnings w
+            WHERE w.guild_id = u.guild_id AND w.user_id = u.discord_id AND +w.active = 1) as expected_warnings,
+           (SELECT COUNT(*) FROM sanctions s
+            WHERE s.guild_id = u.guild_id AND s.user_id = u.discord_id AND +s.active = 1) as expected_sanctions
+    FROM users u
+    WHERE (:guild_id IS NULL OR u.guild_id = :guild_id)
+"""
+
+
+def find_drift(guild_id: str = None) -> list:
+    """
+    Users dont les compteurs ne correspondent pas aux tables.
+    Retourne [{'id', 'discord_id', 'guild_id', 'total_warnings', 'expected_warnings', ...}] (vide si cohérent).
+    """
+    with DatabaseConnection(readonly=True) as conn:
+        cursor = conn.execute(f"""
+            SELECT *, expected_warnings * 10 + expected_sanctions * 25 as expected_risk
+            FROM ({EXPECTED_SQL})
+            WHERE total_warnings IS NOT expected_warnings
+               OR total_sanctions IS NOT expected_sanctions
+               OR risk_score IS NOT expected_warnings * 10 + expected_sanctions * 25
+        """, {'guild_id': guild_id})
+        return [dict_from_row(row) for row in cursor.fetchall()]
+
+
+def repair(guild_id: str = None) -> int:
+    """Corrige les compteurs en dérive (une guild ou toutes), en une transaction. Retourne le nb de users corrigés."""
+    with DatabaseConnection() as conn:
+        cursor = conn.execute(f"""
+            UPDATE users SET
+                total_warnings = e.expected_warnings,
+                total_sanctions = e.expected_sanctions,
+                risk_score = e.expected_warnings * 10 + e.expected_sanctions * 25
+            FROM ({EXPECTED_SQL}) e
+            WHERE users.id = e.id
+              AND (e.total_warnings IS NOT e.expected_warnings
+                   OR e.total_sanctions IS NOT e.expected_sanctions
+                   OR e.risk_score IS NOT e.expected_warnings * 10 + e.expected_sanctions * 25)
+        """, {'guild_id': guild_id})
+        return cursor.rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compteurs dénormalisés des utilisateurs")
+    parser.add_argument('--repair', action='store_true', help="Corriger les compteurs en dérive")
+    parser.add_argument('--check', action='store_true', help="Lister les écarts")
+    parser.add_argument('--guild', default=None, help="Limiter à un serveur")
+    parser.add_argument('--db', type=Path, default=None, help="Chemin de la base (défaut: database/cardinal.db)")
+    args = parser.parse_args()
+
+    if args.db is not None:
+        from database.python import connection
+        connection.DB_PATH = args.db
+        connection.reset_pools()
+
+    if args.repair:
+        fixed = repair(args.guild)
+        print(f"Compteurs corrigés : {fixed} utilisateur(s)")
+
+    if args.check or not args.repair:
+        drift = find_drift(args.guild)
+        for d in drift:
+            print(f"{d['guild_id']} {d['discord_id']:<20} "
+                  f"warnings={d['total_warnings']}/{d['expected_warnings']} "
+                  f"sanctions={d['total_sanctions']}/{d['expected_sanctions']} "
+                  f"risk={d['risk_score']}/{d['expected_risk']}")
+        print(f"{len(drift)} écart(s)")
+        sys.exit(1 if drift else 0)
+
+
+if __name__ == "__main__":
+    main()
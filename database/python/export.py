@@ -0,0 +1,171 @@
+# Export en flux des logs de modération (CSV, JSONL, Parquet)
+#
+# Les lignes sont lues par fetchmany via timeline_repo.iter_timeline et écrites par blocs :
+# la mémoire reste constante quelle que soit la taille de l'historique.
+#
+# Usage (depuis la racine du projet) :
+#   python -m database.python.export GUILD_ID --format csv --output logs.csv [--days 365]
+import argparse
+import csv
+import io
+import json
+import os
+import uuid
+from pathlib import Path
+
+from database.python.repositories import timeline_repo
+
+FORMATS = {
+    'csv': ('text/csv', '.csv'),
+    'jsonl': ('application/x-ndjson', '.jsonl'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+}
+
+COLUMNS = ['kind', 'id', 'type', 'user_id', 'moderator_id', 'reason', 'duration', 'active', 'details', 'created_at']
+
+# Lignes par bloc (fetchmany, écriture, row group Parquet)
+CHUNK_SIZE = int(os.getenv('DB_EXPORT_CHUNK_SIZE', 5000))
+
+# Dossier des exports écrits sur disque par le panel
+EXPORT_DIR = Path(os.getenv('DB_EXPORT_DIR', Path(__file__).parent.parent / 'exports'))
+
+
+def _chunks(rows, size: int):
+    """Regroupe un itérable de lignes en listes de `size` lignes."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_csv(rows, chunk_size: int = CHUNK_SIZE):
+    """Blocs CSV (bytes, en-tête compris) pour un itérable de lignes."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS, extrasaction='ignore')
+    writer.writeheader()
+    for chunk in _chunks(rows, chunk_size):
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def iter_jsonl(rows, chunk_size: int = CHUNK_SIZE):
+    """Blocs JSON Lines (bytes) pour un itérable de lignes."""
+    for chunk in _chunks(rows, chunk_size):
+        yield ''.join(
+            json.dumps({col: row.get(col) for col in COLUMNS}, ensure_ascii=False) + '\n'
+            for row in chunk
+        ).encode('utf-8')
+
+
+def write_parquet(rows, path, chunk_size: int = CHUNK_SIZE) -> int:
+    """Écrit les lignes en Parquet, un row group par bloc. Nécessite pyarrow."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("L'export Parquet nécessite pyarrow (pip install pyarrow)")
+
+    schema = pa.schema([
+        ('kind', pa.string()), ('id', pa.int64()), ('type', pa.string()),
+        ('user_id', pa.string()), ('moderator_id', pa.string()), ('reason', pa.string()),
+        ('duration', pa.int64()), ('active', pa.int64()), ('details', pa.string()),
+        ('created_at', pa.string()),
+    ])
+    count = 0
+    with pq.ParquetWriter(str(path), schema) as writer:
+        for chunk in _chunks(rows, chunk_size):
+            columns = {col: [row.get(col) for row in chunk] for col in COLUMNS}
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            count += len(chunk)
+    return count
+
+
+def write_export(rows, fmt: str, path, chunk_size: int = CHUNK_SIZE) -> int:
+    """Écrit les lignes dans `path` au format demandé. Retourne le nombre de lignes."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Format inconnu : {fmt}")
+    if fmt == 'parquet':
+        return write_parquet(rows, path, chunk_size)
+
+    count = 0
+
+    def counted():
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+
+    blocks = iter_csv(counted(), chunk_size) if fmt == 'csv' else iter_jsonl(counted(), chunk_size)
+    with open(path, 'wb') as f:
+        for block in blocks:
+            f.write(block)
+    return count
+
+
+def export_logs(guild_id: str, fmt: str = 'csv', path=None, chunk_size: int = CHUNK_SIZE, **filters):
+    """
+    Exporte tout l'historique filtré de la timeline d'une guild.
+    filters: mêmes filtres que timeline_repo.iter_timeline (kinds, log_type, user_id, moderator_id, days)
+
+    Sans `path`, écrit dans EXPORT_DIR un seul fichier par guild et format, remplacé à chaque
+    export : le dossier ne grossit pas avec le nombre d'exports. Retourne (chemin, nombre de lignes).
+    """
+    if path is None:
+        EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+        path = EXPORT_DIR / f"logs_{guild_id}{FORMATS[fmt][1]}"
+    path = Path(path)
+
+    # Écriture dans un fichier temporaire puis renommage : pas d'export partiel visible
+    # Nom temporaire unique : deux exports simultanés du même fichier ne se mélangent pas
+    tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.part")
+    try:
+        rows = timeline_repo.iter_timeline(guild_id, chunk_size=chunk_size, **filters)
+        try:
+            count = write_export(rows, fmt, tmp, chunk_size)
+        finally:
+            rows.close()
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return path, count
+
+
+def take_export(path) -> bytes:
+    """Contenu d'un export, puis suppression du fichier (téléchargement depuis le panel)."""
+    path = Path(path)
+    data = path.read_bytes()
+    path.unlink(missing_ok=True)
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export des logs de modération")
+    parser.add_argument('guild_id', help="ID du serveur")
+    parser.add_argument('--format', choices=list(FORMATS), default='csv')
+    parser.add_argument('--output', type=Path, default=None, help="Fichier de sortie (défaut: database/exports/)")
+    parser.add_argument('--days', type=int, default=None, help="Limiter aux N derniers jours")
+    parser.add_argument('--kind', action='append', choices=list(timeline_repo.KINDS), help="Source(s) à exporter")
+    parser.add_argument('--db', type=Path, default=None, help="Chemin de la base (défaut: database/cardinal.db)")
+    args = parser.parse_args()
+
+    if args.db is not None:
+        from database.python import connection
+        connection.DB_PATH = args.db
+        connection.reset_pools()
+
+    path, count = export_logs(args.guild_id, args.format, args.output, kinds=args.kind, days=args.days)
+    print(f"{count} ligne(s) exportée(s) -> {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# Instrumentation des requêtes SQL (timings par statement + temps de rendu des pages)
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+
+# Activé par défaut, désactivable via DB_QUERY_STATS=false
+enabled = os.getenv('DB_QUERY_STATS', 'true').lower() == 'true'
+
+# Nombre d'échantillons conservés par statement pour les percentiles
+MAX_SAMPLES = 1000
+
+_lock = threading.Lock()
+_statements = {}
+_pages = {}
+_capture = threading.local()
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)+\s*\)", re.IGNORECASE)
+_SPACES_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql: str) -> str:
+    """
+    Normalise une requête : littéraux -> ?, listes IN (?, ?) -> IN (?), espaces compactés.
+    Mémoïsé : le trace callback reçoit le même texte pour chaque statement de trigger exécuté.
+    """
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('IN (?)', sql)
+    return _SPACES_RE.sub(' ', sql).strip()
+
+
+class _Stats:
+    __slots__ = ('count', 'total', 'rows', 'traced', 'samples')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.rows = 0
+        self.traced = 0
+        self.samples = deque(maxlen=MAX_SAMPLES)
+
+    def add(self, elapsed: float, rows: int = 0):
+        self.count += 1
+        self.total += elapsed
+        self.rows += rows
+        self.samples.append(elapsed)
+
+
+def _entry(registry: dict, key: str) -> _Stats:
+    stats = registry.get(key)
+    if stats is None:
+        stats = registry[key] = _Stats()
+    return stats
+
+
+def record_query(sql: str, elapsed: float, rows: int = 0):
+    """Enregistre une exécution (durée en secondes, lignes retournées)."""
+    key = normalize_sql(sql)
+    with _lock:
+        _entry(_statements, key).add(elapsed, rows)
+
+
+def trace_callback(sql: str):
+    """Callback pour Connection.set_trace_callback : compte les statements réellement exécutés
+    par SQLite (y compris executescript et corps de triggers)."""
+    key = normalize_sql(sql)
+    with _lock:
+        _entry(_statements, key).traced += 1
+
+
+def capture(sql: str, parameters):
+    """Ajoute (sql, paramètres) à la capture en cours du thread, s'il y en a une."""
+    captured = getattr(_capture, 'statements', None)
+    if captured is not None:
+        captured.append((sql, parameters))
+
+
+@contextmanager
+def capture_queries():
+    """Collecte les requêtes exécutées par le thread courant dans le bloc (ex: EXPLAIN QUERY PLAN)."""
+    previous = getattr(_capture, 'statements', None)
+    _capture.statements = captured = []
+    try:
+        yield captured
+    finally:
+        _capture.statements = previous
+
+
+def record_page(name: str, elapsed: float):
+    """Enregistre un temps de rendu de page (secondes)."""
+    with _lock:
+        _entry(_pages, name).add(elapsed)
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _summary(key: str, stats: _Stats) -> dict:
+    samples = sorted(stats.samples)
+    return {
+        'key': key,
+        'count': stats.count,
+        'traced': stats.traced,
+        'total_ms': stats.total * 1000,
+        'avg_ms': stats.total * 1000 / stats.count if stats.count else 0.0,
+        'rows': stats.rows,
+        'p50_ms': _percentile(samples, 50) * 1000,
+        'p95_ms': _percentile(samples, 95) * 1000,
+        'p99_ms': _percentile(samples, 99) * 1000,
+    }
+
+
+def get_query_stats() -> list:
+    """Stats par statement normalisé, triées par temps total décroissant."""
+    with _lock:
+        items = [_summary(k, s) for k, s in _statements.items()]
+    return sorted(items, key=lambda s: s['total_ms'], reverse=True)
+
+
+def get_page_stats() -> list:
+    """Temps de rendu par page, triés par temps moyen décroissant."""
+    with _lock:
+        items = [_summary(k, s) for k, s in _pages.items()]
+    return sorted(items, key=lambda s: s['avg_ms'], reverse=True)
+
+
+def reset_stats():
+    """Remet à zéro toutes les stats."""
+    with _lock:
+        _statements.clear()
+        _pages.clear()
+
+
+def set_enabled(value: bool):
+    """Active/désactive l'instrumentation à chaud."""
+    global enabled
+    enabled = bool(value)
+
+
+def timed_page(name: str):
+    """Décorateur mesurant le temps de rendu d'une page Streamlit."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if enabled:
+                    record_page(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
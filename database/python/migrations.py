@@ -0,0 +1,277 @@
+# Migrations SQL versionnées (database/migrations/NNN_nom.sql)
+#
+# Usage (depuis la racine du projet) :
+#   python -m database.python.migrations            # applique les migrations en attente
+#   python -m database.python.migrations --status   # liste appliquées / en attente
+#   python -m database.python.migrations --verify   # EXPLAIN QUERY PLAN des requêtes du panel
+import argparse
+import re
+import sys
+from pathlib import Path
+
+from database.python import instrumentation
+from database.python.connection import get_connection, DatabaseConnection
+
+MIGRATIONS_DIR = Path(__file__).parent.parent / 'migrations'
+
+_MIGRATION_RE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+def list_migrations():
+    """Migrations disponibles, triées par version : [(version, nom, chemin)]."""
+    migrations = []
+    for path in MIGRATIONS_DIR.glob('*.sql'):
+        match = _MIGRATION_RE.match(path.name)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), path))
+    return sorted(migrations)
+
+
+def _ensure_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
+
+
+def applied_versions(conn) -> set:
+    """Versions déjà enregistrées dans schema_migrations."""
+    _ensure_table(conn)
+    return {row[0] for row in conn.execute("SELECT version FROM schema_migrations")}
+
+
+def migrate() -> list:
+    """Applique les migrations en attente, chacune dans sa transaction. Retourne les noms appliqués."""
+    applied = []
+    conn = get_connection()
+    try:
+        done = applied_versions(conn)
+        for version, name, path in list_migrations():
+            if version in done:
+                continue
+            script = path.read_text(encoding='utf-8')
+            try:
+                conn.executescript(
+                    f"BEGIN;\n{script}\n"
+                    f"INSERT INTO schema_migrations (version, name) VALUES ({version}, '{name}');\n"
+                    f"COMMIT;"
+                )
+            except Exception:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            applied.append(f"{version:03d}_{name}")
+    finally:
+        conn.close()
+    return applied
+
+
+def pending_migrations() -> list:
+    """
+    Migrations pas encore appliquées, lues en lecture seule (aucune écriture, aucun verrou).
+    Le panel s'en sert pour avertir ; l'application reste une étape de déploiement explicite.
+    """
+    with DatabaseConnection(readonly=True) as conn:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_migrations'"
+        ).fetchone()
+        done = {row[0] for row in conn.execute("SELECT version FROM schema_migrations")} if exists else set()
+    return [f"{version:03d}_{name}" for version, name, _ in list_migrations() if version not in done]
+
+
+# ============ VÉRIFICATION DES PLANS ============
+
+def _user_index_refresh(guild_id):
+    """Construction puis lecture du delta de l'index de préfixes."""
+    from database.python import user_index
+    index = user_index.UserPrefixIndex(guild_id)
+    index.refresh(force=True)
+    index.refresh(force=True)
+
+
+def _repository_checks():
+    """Fonctions repository vérifiées : (label, fonction, args). Les requêtes exécutées sont capturées."""
+    from database.python.repositories import (
+        guild_repo, sanction_repo, search_repo, timeline_repo, user_repo, warning_repo
+    )
+    g, u = '0', '0'
+    cursor = ('2000-01-01 00:00:00', 0)
+    return [
+        ('guild_repo.get_snapshot', guild_repo.get_snapshot, (g,)),
+        ('guild_repo.get_recent_activity', guild_repo.get_recent_activity, (g,)),
+        ('guild_repo.get_hour_of_week', guild_repo.get_hour_of_week, (g, 30)),
+        ('guild_repo.get_hour_of_week (filtres)',
+         lambda: guild_repo.get_hour_of_week(g, kinds=('automod',), trigger_type='spam', channel_id='0'), ()),
+        ('guild_repo.get_automod_filters', guild_repo.get_automod_filters, (g,)),
+        ('warning_repo.get_by_guild', warning_repo.get_by_guild, (g,)),
+        ('warning_repo.get_page', warning_repo.get_page, (g, cursor)),
+        ('warning_repo.get_page (filtres)', lambda: warning_repo.get_page(g, cursor, moderator_id=u, days=7), ()),
+        ('warning_repo.get_page (user_id)', lambda: warning_repo.get_page(g, ('0', 0), order_by='user_id'), ()),
+        ('warning_repo.get_by_user', warning_repo.get_by_user, (u, g)),
+        ('warning_repo.get_active_by_user', warning_repo.get_active_by_user, (u, g)),
+        ('warning_repo.get_recent', warning_repo.get_recent, (g,)),
+        ('warning_repo.get_stats_by_day', warning_repo.get_stats_by_day, (g,)),
+        ('warning_repo.get_top_warned_users', warning_repo.get_top_warned_users, (g,)),
+        ('sanction_repo.get_by_guild', sanction_repo.get_by_guild, (g,)),
+        ('sanction_repo.get_page', sanction_repo.get_page, (g, cursor)),
+        ('sanction_repo.get_page (filtres)',
+         lambda: sanction_repo.get_page(g, cursor, sanction_type='ban', active=True, days=7), ()),
+        ('warning_repo.count_many', lambda: warning_repo.count_many(g, moderator_id=u, days=7), ()),
+        ('sanction_repo.count_many', lambda: sanction_repo.count_many(g, sanction_type='ban', active=True), ()),
+        ('sanction_repo.get_by_user', sanction_repo.get_by_user, (u, g)),
+        ('sanction_repo.get_active', sanction_repo.get_active, (g,)),
+        ('sanction_repo.get_by_type', sanction_repo.get_by_type, (g, 'ban')),
+        ('sanction_repo.get_stats_by_type', sanction_repo.get_stats_by_type, (g,)),
+        ('sanction_repo.get_stats_by_day', sanction_repo.get_stats_by_day, (g,)),
+        ('timeline_repo.get_page', timeline_repo.get_page, (g, ('2000-01-01 00:00:00', 'sanction', 0))),
+        ('timeline_repo.get_page (filtres)',
+         lambda: timeline_repo.get_page(g, None, log_type='ban', moderator_id=u, days=7), ()),
+        ('search_repo.search', search_repo.search, (g, 'spam')),
+        ('search_repo.search (kinds)', lambda: search_repo.search(g, 'spam', kinds=('warning', 'automod')), ()),
+        ('user_repo.get_list', user_repo.get_list, (g,)),
+        ('user_repo.get_list (filtres)', lambda: user_repo.get_list(g, search='a', min_warnings=3), ()),
+        ('user_repo.get_warning_distribution', user_repo.get_warning_distribution, (g,)),
+        ('user_repo.get_joins_by_month', user_repo.get_joins_by_month, (g,)),
+        ('user_repo.get_watch_list', user_repo.get_watch_list, (g,)),
+        ('user_index.refresh', _user_index_refresh, (g,)),
+        ('timeline_repo.get_watermarks', timeline_repo.get_watermarks, ()),
+        ('timeline_repo.get_since', lambda: timeline_repo.get_since(g, {}, user_id=u, days=7), ()),
+        ('timeline_repo.get_columns', timeline_repo.get_columns, (g, 30)),
+    ]
+
+
+# Requêtes encore écrites dans les pages : (label, sql, params nommés)
+# Les benchmarks (benchmarks/bench_repositories.py) remplacent les valeurs par celles de la base testée.
+PAGE_QUERIES = [
+    ('4_Settings configuration', "SELECT * FROM guilds WHERE id = :guild_id", {'guild_id': '0'}),
+    ('4_Settings enregistrement',
+     "UPDATE guilds SET automod_config = :automod_config WHERE id = :guild_id",
+     {'automod_config': '{}', 'guild_id': '0'}),
+]
+
+_SCAN_RE = re.compile(r'^SCAN (\S+)(.*)$')
+_FROM_RE = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+_WINDOW_RE = re.compile(r'\b(?:WHERE|AND)\s+(?:\w+\.)?created_at\s*>', re.IGNORECASE)
+_SQL_KEYWORDS = {'WHERE', 'LEFT', 'JOIN', 'ON', 'GROUP', 'ORDER', 'LIMIT', 'INNER', 'UNION', 'HAVING'}
+
+
+def _aliases(sql: str) -> dict:
+    """Alias -> table d'après les clauses FROM / JOIN."""
+    aliases = {}
+    for table, alias in _FROM_RE.findall(sql):
+        aliases[table] = table
+        if alias and alias.upper() not in _SQL_KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def explain(conn, sql: str, params=()) -> dict:
+    """
+    EXPLAIN QUERY PLAN d'une requête : scans de table complets, scans d'index,
+    et fenêtre temporelle (WHERE created_at >= ...) non servie par un index.
+    """
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    aliases = _aliases(sql)
+    plan, table_scans, index_scans = [], [], []
+    for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params):
+        detail = row[3]
+        plan.append(detail)
+        match = _SCAN_RE.match(detail)
+        if not match:
+            continue
+        table = aliases.get(match.group(1), match.group(1))
+        if table not in tables or 'VIRTUAL TABLE' in match.group(2):
+            continue  # sous-requête, CTE, CONSTANT ROW... ; FTS5 : l'index est celui du module
+        if 'INDEX' in match.group(2):
+            index_scans.append(detail)
+        else:
+            table_scans.append(detail)
+    # Un index couvrant contient created_at : le filtre est évalué sans lire la table.
+    # Une plage de rowid (id > dernier vu) borne aussi les lignes lues.
+    unindexed_window = bool(_WINDOW_RE.search(sql)) and not any(
+        'created_at' in detail or 'COVERING INDEX' in detail or '(rowid>' in detail
+        for detail in plan if detail.startswith('SEARCH')
+    )
+    return {
+        'plan': plan,
+        'table_scans': table_scans,
+        'index_scans': index_scans,
+        'unindexed_window': unindexed_window,
+        'ok': not table_scans and not unindexed_window,
+    }
+
+
+def verify_query_plans() -> list:
+    """Vérifie que les requêtes repository et pages utilisent un index (pas de SCAN de table,
+    fenêtres created_at servies par l'index)."""
+    from database.python import cache
+    results = []
+    statements = []
+    # Cache désactivé : chaque fonction doit réellement exécuter ses requêtes
+    cache_enabled, cache.enabled = cache.enabled, False
+    try:
+        for label, func, args in _repository_checks():
+            with instrumentation.capture_queries() as captured:
+                func(*args)
+            statements.extend((label, sql, params) for sql, params in captured)
+    finally:
+        cache.enabled = cache_enabled
+    statements.extend(PAGE_QUERIES)
+
+    with DatabaseConnection(readonly=True) as conn:
+        for label, sql, params in statements:
+            if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+                continue
+            result = explain(conn, sql, params)
+            result['label'] = label
+            result['sql'] = ' '.join(sql.split())
+            results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrations SQLite du panel")
+    parser.add_argument('--status', action='store_true', help="Afficher les migrations appliquées / en attente")
+    parser.add_argument('--verify', action='store_true', help="Vérifier les plans d'exécution")
+    parser.add_argument('--db', type=Path, default=None, help="Chemin de la base (défaut: database/cardinal.db)")
+    args = parser.parse_args()
+
+    if args.db is not None:
+        from database.python import connection
+        connection.DB_PATH = args.db
+        connection.reset_pools()
+
+    if args.status:
+        conn = get_connection()
+        done = applied_versions(conn)
+        conn.close()
+        for version, name, _ in list_migrations():
+            print(f"[{'x' if version in done else ' '}] {version:03d}_{name}")
+        return
+
+    if args.verify:
+        failures = 0
+        for result in verify_query_plans():
+            status = 'OK  ' if result['ok'] else 'FAIL'
+            print(f"{status} {result['label']}")
+            for detail in result['table_scans'] + result['index_scans']:
+                print(f"       {detail}")
+            if result['unindexed_window']:
+                print("       fenêtre created_at non indexée : " + ' | '.join(result['plan']))
+            failures += not result['ok']
+        print(f"\n{failures} requête(s) avec scan de table ou fenêtre non indexée")
+        sys.exit(1 if failures else 0)
+
+    applied = migrate()
+    if applied:
+        for name in applied:
+            print(f"Appliquée : {name}")
+    else:
+        print("Base à jour")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Requêtes "entité + K derniers enfants" en un seul aller-retour
+#
+# Les parents (ex: utilisateurs à surveiller) et leurs K enfants les plus récents (ex: warnings)
+# sont lus par une seule requête : ROW_NUMBER() OVER (PARTITION BY parent ORDER BY ...) <= K.
+# Remplace le motif N+1 "une requête par parent dans la boucle d'affichage".
+
+
+def with_latest_children(conn, parents_sql: str, parent_order: str, children_sql: str,
+                         link: dict, k: int, params=(), child_order: str = 'created_at DESC, id DESC',
+                         key: str = 'children') -> list:
+    """
+    Exécute parents + K derniers enfants par parent en une requête.
+
+    Args:
+        parents_sql: SELECT des parents (ORDER BY / LIMIT compris)
+        parent_order: ordre des parents, sur les colonnes de parents_sql (ex: 'warning_count DESC')
+        children_sql: SELECT des enfants candidats (ex: warnings d'une guild)
+        link: {colonne enfant: colonne parent} pour la jointure
+        k: nombre max d'enfants par parent
+        params: paramètres de parents_sql puis de children_sql
+        child_order: ordre des enfants dans chaque parent
+        key: clé sous laquelle la liste d'enfants est ajoutée à chaque parent
+
+    Returns:
+        [{...colonnes parent, key: [{...colonnes enfant}]}] dans l'ordre des parents
+    """
+    # CROSS JOIN : les parents pilotent la boucle, chaque parent est une recherche d'index
+    join = ' AND '.join(f"c.{child_col} = p.{parent_col}" for child_col, parent_col in link.items())
+    sql = f"""
+        WITH parents AS (
+            SELECT *, ROW_NUMBER() OVER (ORDER BY {parent_order}) AS _pos
+            FROM ({parents_sql})
+        ), children AS (
+            SELECT c.*, p._pos AS _parent_pos,
+                   ROW_NUMBER() OVER (PARTITION BY p._pos ORDER BY {child_order}) AS _rn
+            FROM parents p
+            CROSS JOIN ({children_sql}) c ON {join}
+        )
+        SELECT p.*, c.*
+        FROM parents p
+        LEFT JOIN children c ON c._parent_pos = p._pos AND c._rn <= ?
+        ORDER BY p._pos, c._rn
+    """
+    cursor = conn.execute(sql, [*params, k])
+    columns = [d[0] for d in cursor.description]
+    split = columns.index('_pos') + 1
+    parent_cols, child_cols = columns[:split - 1], columns[split:-2]
+
+    results = []
+    current_pos = None
+    for row in cursor.fetchall():
+        if row[split - 1] != current_pos:
+            current_pos = row[split - 1]
+            parent = dict(zip(parent_cols, row[:split - 1]))
+            parent[key] = []
+            results.append(parent)
+        if row[-1] is not None:  # _rn NULL : parent sans enfant
+            results[-1][key].append(dict(zip(child_cols, row[split:-2])))
+    return results
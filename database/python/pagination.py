@@ -0,0 +1,78 @@
+# Pagination par clé (keyset) : curseur (colonne de tri, id) au lieu de OFFSET
+#
+# Le coût d'une page est une recherche dans l'index (guild_id, colonne[, id]) :
+# la page 500 coûte autant que la page 1.
+from dataclasses import dataclass
+from typing import Optional
+
+from database.python.connection import dict_from_row
+
+# Colonnes autorisées comme clé de tri (interpolées dans le SQL) -> colonne nullable ?
+SORT_COLUMNS = {'created_at': True, 'user_id': False}
+
+
+@dataclass(frozen=True)
+class Page:
+    """Une page de résultats et le curseur de la suivante (None = dernière page)."""
+    items: list
+    next_cursor: Optional[tuple] = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+
+def fetch_page(conn, sql: str, params, cursor: tuple = None, limit: int = 50,
+               order_by: str = 'created_at', descending: bool = True, alias: str = '') -> Page:
+    """
+    Exécute une requête paginée par curseur (valeur de tri, id).
+
+    sql doit contenir {keyset} à la fin du WHERE et {order} à la place du ORDER BY :
+        SELECT w.* FROM warnings w WHERE w.guild_id = ? {keyset} {order}
+    Les lignes dont la colonne de tri est NULL forment un segment à part
+    (en fin de liste en DESC, en début en ASC), parcouru par id.
+    """
+    if order_by not in SORT_COLUMNS:
+        raise ValueError(f"Colonne de tri non supportée : {order_by}")
+    col = f"{alias}.{order_by}" if alias else order_by
+    id_col = f"{alias}.id" if alias else 'id'
+    op, direction = ('<', 'DESC') if descending else ('>', 'ASC')
+
+    segments = ['value', 'null'] if descending else ['null', 'value']
+    if not SORT_COLUMNS[order_by]:
+        segments = ['value']
+    if cursor is not None:
+        segments = segments[segments.index('null' if cursor[0] is None else 'value'):]
+
+    rows = []
+    for segment in segments:
+        # Le curseur ne s'applique qu'au segment où il a été pris
+        from_cursor = cursor is not None and segment == ('null' if cursor[0] is None else 'value')
+        if segment == 'null':
+            keyset = f"AND {col} IS NULL"
+            keyset_params = []
+            if from_cursor:
+                keyset += f" AND {id_col} {op} ?"
+                keyset_params.append(cursor[1])
+            order = f"ORDER BY {id_col} {direction}"
+        else:
+            keyset = f"AND {col} IS NOT NULL"
+            keyset_params = []
+            if from_cursor:
+                keyset += f" AND ({col}, {id_col}) {op} (?, ?)"
+                keyset_params.extend(cursor)
+            order = f"ORDER BY {col} {direction}, {id_col} {direction}"
+
+        # Une ligne de plus pour savoir s'il reste une page
+        remaining = limit + 1 - len(rows)
+        query = sql.format(keyset=keyset, order=order) + " LIMIT ?"
+        rows.extend(conn.execute(query, [*params, *keyset_params, remaining]).fetchall())
+        if len(rows) > limit:
+            break
+
+    items = [dict_from_row(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = (last[order_by], last['id'])
+    return Page(items=items, next_cursor=next_cursor)
@@ -0,0 +1,41 @@
+# Exécution concurrente de requêtes repository (thread pool de connexions lecture seule)
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+# Un worker = une connexion lecture du pool ; garder <= DB_POOL_SIZE
+BUNDLE_WORKERS = int(os.getenv('DB_BUNDLE_WORKERS', 6))
+
+_executor = ThreadPoolExecutor(max_workers=BUNDLE_WORKERS, thread_name_prefix='repo-bundle')
+
+
+async def run_async(func, *args, **kwargs):
+    """Exécute une fonction repository dans le thread pool sans bloquer la boucle asyncio."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
+
+
+async def gather_bundle(queries: dict) -> dict:
+    """
+    Version asyncio de fetch_bundle.
+    queries: {'nom': (fonction, arg1, arg2, ...)}
+    """
+    names = list(queries)
+    results = await asyncio.gather(*(run_async(*queries[name]) for name in names))
+    return dict(zip(names, results))
+
+
+def fetch_bundle(queries: dict) -> dict:
+    """
+    Lance un lot de requêtes repository en parallèle et attend tous les résultats.
+    La latence est celle de la requête la plus lente, pas la somme.
+    Chaque requête a sa propre transaction de lecture (pas de read_snapshot commun).
+
+    Ex: fetch_bundle({
+        'snapshot': (guild_repo.get_snapshot, guild_id, 30),
+        'trend': (warning_repo.get_stats_by_day, guild_id, 30),
+    })
+    """
+    futures = {name: _executor.submit(*spec) for name, spec in queries.items()}
+    return {name: future.result() for name, future in futures.items()}
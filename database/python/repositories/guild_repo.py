@@ -1,16 +1,19 @@
 # Repo Guild Python
 import json
-from database.python.connection import get_connection, dict_from_row
+from dataclasses import dataclass
+from database.python.cache import cached
+from database.python.connection import DatabaseConnection, dict_from_row
 
+@cached('guilds', per_guild=False)
 def get_all():
     """Récupère toutes les guilds."""
-    with get_connection() as conn:
+    with DatabaseConnection(readonly=True) as conn:
         cursor = conn.execute("SELECT * FROM guilds ORDER BY name")
         return [dict_from_row(row) for row in cursor.fetchall()]
 
 def get_by_id(guild_id: str):
     """Récupère une guild par ID."""
-    with get_connection() as conn:
+    with DatabaseConnection(readonly=True) as conn:
         cursor = conn.execute(
             "SELECT * FROM guilds WHERE id = ?", 
             (guild_id,)
@@ -24,44 +27,79 @@ def get_by_id(guild_id: str):
             return data
         return None
 
+@dataclass(frozen=True)
+class GuildSnapshot:
+    """Métriques principales d'une guild, calculées en une passe par table."""
+    guild_id: str
+    days: int
+    total_warnings: int = 0
+    recent_warnings: int = 0
+    active_warnings: int = 0
+    warned_users: int = 0
+    total_sanctions: int = 0
+    recent_sanctions: int = 0
+    active_sanctions: int = 0
+    sanctioned_users: int = 0
+    tracked_users: int = 0
+    active_users: int = 0
+    total_automod: int = 0
+    recent_automod: int = 0
+
+@cached('warnings', 'sanctions', 'users', 'automod_logs')
+def get_snapshot(guild_id: str, days: int = 30) -> GuildSnapshot:
+    """Toutes les métriques du Dashboard en une requête (une passe indexée par table)."""
+    with DatabaseConnection(readonly=True) as conn:
+        cursor = conn.execute("""
+            WITH w AS (
+                SELECT COUNT(*) as total_warnings,
+                       COUNT(CASE WHEN created_at >= DATE('now', :since) THEN 1 END) as recent_warnings,
+                       COUNT(CASE WHEN active = 1 THEN 1 END) as active_warnings,
+                       COUNT(DISTINCT user_id) as warned_users
+                FROM warnings WHERE guild_id = :guild_id
+            ), s AS (
+                SELECT COUNT(*) as total_sanctions,
+                       COUNT(CASE WHEN created_at >= DATE('now', :since) THEN 1 END) as recent_sanctions,
+                       COUNT(CASE WHEN active = 1 THEN 1 END) as active_sanctions,
+                       COUNT(DISTINCT user_id) as sanctioned_users
+                FROM sanctions WHERE guild_id = :guild_id
+            ), u AS (
+                SELECT COUNT(*) as tracked_users,
+                       COUNT(DISTINCT CASE WHEN is_active = 1 THEN user_id END) as active_users
+                FROM users WHERE guild_id = :guild_id
+            ), a AS (
+                SELECT COUNT(*) as total_automod,
+                       COUNT(CASE WHEN created_at >= DATE('now', :since) THEN 1 END) as recent_automod
+                FROM automod_logs WHERE guild_id = :guild_id
+            )
+            SELECT * FROM w, s, u, a
+        """, {'guild_id': guild_id, 'since': f'-{days} days'})
+        return GuildSnapshot(guild_id=guild_id, days=days, **dict_from_row(cursor.fetchone()))
+
 def get_stats(guild_id: str):
     """Statistiques d'une guild."""
-    with get_connection() as conn:
-        stats = {}
-        
-        # Total warnings
-        cursor = conn.execute(
-            "SELECT COUNT(*) FROM warnings WHERE guild_id = ?",
-            (guild_id,)
-        )
-        stats['total_warnings'] = cursor.fetchone()[0]
-        
-        # Total sanctions
-        cursor = conn.execute(
-            "SELECT COUNT(*) FROM sanctions WHERE guild_id = ?",
-            (guild_id,)
-        )
-        stats['total_sanctions'] = cursor.fetchone()[0]
-        
-        # Sanctions actives
-        cursor = conn.execute(
-            "SELECT COUNT(*) FROM sanctions WHERE guild_id = ? AND active = 1",
-            (guild_id,)
-        )
-        stats['active_sanctions'] = cursor.fetchone()[0]
-        
-        # Users trackés
-        cursor = conn.execute(
-            "SELECT COUNT(*) FROM users WHERE guild_id = ?",
-            (guild_id,)
-        )
-        stats['tracked_users'] = cursor.fetchone()[0]
-        
-        return stats
+    snapshot = get_snapshot(guild_id)
+    return {
+        'total_warnings': snapshot.total_warnings,
+        'total_sanctions': snapshot.total_sanctions,
+        'active_sanctions': snapshot.active_sanctions,
+        'tracked_users': snapshot.tracked_users,
+    }
+
+def get_overview():
+    """Chiffres globaux (tous serveurs) pour la page d'accueil, en une requête."""
+    with DatabaseConnection(readonly=True) as conn:
+        cursor = conn.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM guilds) as guilds_count,
+                (SELECT COUNT(DISTINCT discord_id) FROM users WHERE is_active = 1) as users_count,
+                (SELECT COUNT(*) FROM warnings WHERE created_at >= DATE('now')) as warnings_today,
+                (SELECT COUNT(*) FROM sanctions WHERE active = 1) as active_sanctions
+        """)
+        return dict_from_row(cursor.fetchone())
 
 def update_settings(guild_id: str, settings: dict):
     """Met à jour les settings depuis le panel."""
-    with get_connection() as conn:
+    with DatabaseConnection() as conn:
         # Construire la requête dynamiquement
         fields = []
         values = []
@@ -75,3 +113,64 @@ def update_settings(guild_id: str, settings: dict):
         query = f"UPDATE guilds SET {', '.join(fields)}, updated_at = datetime('now') WHERE id = ?"
         conn.execute(query, values)
         conn.commit()
+
+@cached('warnings', 'sanctions')
+def get_recent_activity(guild_id: str, limit: int = 10):
+    """Derniers warnings et sanctions confondus."""
+    with DatabaseConnection(readonly=True) as conn:
+        cursor = conn.execute("""
+            SELECT 'warning' as type, user_id, moderator_id, reason, created_at
+            FROM warnings
+            WHERE guild_id = ?
+            UNION ALL
+            SELECT type, user_id, moderator_id, reason, created_at
+            FROM sanctions
+            WHERE guild_id = ?
+            ORDER BY created_at DESC
+            LIMIT ?
+        """, (guild_id, guild_id, limit))
+        return [dict_from_row(row) for row in cursor.fetchall()]
+
+HEATMAP_KINDS = ('warning', 'sanction', 'automod')
+
+@cached('warnings', 'sanctions', 'automod_logs')
+def get_hour_of_week(guild_id: str, days: int = None, kinds: tuple = HEATMAP_KINDS,
+                     trigger_type: str = None, channel_id: str = None):
+    """
+    Événements par jour de semaine (0 = lundi) et heure (UTC), depuis le cube hourly_guild_stats.
+    trigger_type / channel_id ne retiennent que les actions AutoMod correspondantes.
+    Retourne [{'weekday', 'hour', 'count'}] (cases vides omises).
+    """
+    placeholders = ', '.join('?' * len(kinds))
+    with DatabaseConnection(readonly=True) as conn:
+        cursor = conn.execute(f"""
+            SELECT (CAST(strftime('%w', day) AS INTEGER) + 6) % 7 as weekday, hour, SUM(count) as count
+            FROM hourly_guild_stats
+            WHERE guild_id = ? AND kind IN ({placeholders})
+            AND day != '' AND (? IS NULL OR day >= DATE('now', ?))
+            AND (? IS NULL OR (kind = 'automod' AND type = ?))
+            AND (? IS NULL OR (kind = 'automod' AND channel_id = ?))
+            GROUP BY 1, 2
+            HAVING SUM(count) > 0
+        """, (guild_id, *kinds,
+              days, f'-{days} days',
+              trigger_type, trigger_type,
+              channel_id, channel_id))
+        return [dict_from_row(row) for row in cursor.fetchall()]
+
+@cached('automod_logs')
+def get_automod_filters(guild_id: str):
+    """Déclencheurs et salons présents dans le cube horaire (options des filtres de la heatmap)."""
+    with DatabaseConnection(readonly=True) as conn:
+        cursor = conn.execute("""
+            SELECT type, channel_id
+            FROM hourly_guild_stats
+            WHERE guild_id = ? AND kind = 'automod'
+            GROUP BY 1, 2
+            HAVING SUM(count) > 0
+        """, (guild_id,))
+        rows = cursor.fetchall()
+        return {
+            'trigger_types': sorted({row['type'] for row in rows if row['type']}),
+            'channels': sorted({row['channel_id'] for row in rows if row['channel_id']}),
+        }
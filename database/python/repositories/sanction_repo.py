@@ -1,9 +1,12 @@
 # Repo Sanction Python
-from database.python.connection import get_connection, dict_from_row
+from database.python import bulk
+from database.python.cache import cached
+from database.python.connection import DatabaseConnection, dict_from_row
+from database.python.pagination import Page, fetch_page
 
 def get_by_guild(guild_id: str, limit: int = 100):
     """Toutes les sanctions d'une guild."""
-    with get_connection() as conn:
+    with DatabaseConnection(readonly=True) as conn:
         cursor = conn.execute("""
             SELECT s.*, u.username
             FROM sanctions s
@@ -14,9 +17,52 @@ def get_by_guild(guild_id: str, limit: int = 100):
         """, (guild_id, limit))
         return [dict_from_row(row) for row in cursor.fetchall()]
 
+def _filters(sanction_type: str = None, active: bool = None, user_search: str = None,
+             moderator_id: str = None, user_id: str = None, days: int = None):
+    """Filtres communs à get_page et aux opérations en masse : (clauses " AND ...", params)."""
+    sql, params = "", []
+    if sanction_type:
+        sql += " AND s.type = ?"
+        params.append(sanction_type)
+    if active is not None:
+        sql += " AND s.active = ?"
+        params.append(int(active))
+    if user_search:
+        sql += " AND s.user_id LIKE ?"
+        params.append(f"%{user_search}%")
+    if user_id:
+        sql += " AND s.user_id = ?"
+        params.append(user_id)
+    if moderator_id:
+        sql += " AND s.moderator_id = ?"
+        params.append(moderator_id)
+    if days is not None:
+        sql += " AND s.created_at >= DATE('now', ?)"
+        params.append(f'-{days} days')
+    return sql, params
+
+@cached('sanctions', 'users')
+def get_page(guild_id: str, cursor: tuple = None, limit: int = 50, sanction_type: str = None,
+             active: bool = None, user_search: str = None, moderator_id: str = None,
+             user_id: str = None, days: int = None, descending: bool = True) -> Page:
+    """
+    Sanctions d'une guild, paginées par curseur (created_at, id).
+    Passer page.next_cursor pour obtenir la page suivante.
+    """
+    where, params = _filters(sanction_type, active, user_search, moderator_id, user_id, days)
+    sql = """
+        SELECT s.*, u.username
+        FROM sanctions s
+        LEFT JOIN users u ON s.user_id = u.discord_id AND s.guild_id = u.guild_id
+        WHERE s.guild_id = ?
+    """ + where + " {keyset} {order}"
+    params = [guild_id, *params]
+    with DatabaseConnection(readonly=True) as conn:
+        return fetch_page(conn, sql, params, cursor, limit, descending=descending, alias='s')
+
 def get_by_user(user_id: str, guild_id: str):
     """Sanctions d'un user."""
-    with get_connection() as conn:
+    with DatabaseConnection(readonly=True) as conn:
         cursor = conn.execute("""
             SELECT s.*, u.username
             FROM sanctions s
@@ -28,7 +74,7 @@ def get_by_user(user_id: str, guild_id: str):
 
 def get_active(guild_id: str):
     """Sanctions actives (bans/mutes en cours)."""
-    with get_connection() as conn:
+    with DatabaseConnection(readonly=True) as conn:
         cursor = conn.execute("""
             SELECT s.*, u.username
             FROM sanctions s
@@ -40,7 +86,7 @@ def get_active(guild_id: str):
 
 def get_by_type(guild_id: str, sanction_type: str):
     """Sanctions par type (ban, mute, kick)."""
-    with get_connection() as conn:
+    with DatabaseConnection(readonly=True) as conn:
         cursor = conn.execute("""
             SELECT s.*, u.username
             FROM sanctions s
@@ -51,33 +97,36 @@ def get_by_type(guild_id: str, sanction_type: str):
         """, (guild_id, sanction_type))
         return [dict_from_row(row) for row in cursor.fetchall()]
 
+@cached('sanctions')
 def get_stats_by_type(guild_id: str):
-    """Stats par type pour pie chart."""
-    with get_connection() as conn:
+    """Stats par type pour pie chart (depuis le rollup daily_guild_stats)."""
+    with DatabaseConnection(readonly=True) as conn:
         cursor = conn.execute("""
-            SELECT type, COUNT(*) as count
-            FROM sanctions
-            WHERE guild_id = ?
+            SELECT type, SUM(count) as count
+            FROM daily_guild_stats
+            WHERE guild_id = ? AND kind = 'sanction'
             GROUP BY type
+            HAVING SUM(count) > 0
         """, (guild_id,))
         return [dict_from_row(row) for row in cursor.fetchall()]
 
+@cached('sanctions')
 def get_stats_by_day(guild_id: str, days: int = 30):
-    """Sanctions par jour pour line chart."""
-    with get_connection() as conn:
+    """Sanctions par jour pour line chart (depuis le rollup daily_guild_stats)."""
+    with DatabaseConnection(readonly=True) as conn:
         cursor = conn.execute("""
-            SELECT DATE(created_at) as date, type, COUNT(*) as count
-            FROM sanctions
-            WHERE guild_id = ?
-            AND created_at >= datetime('now', ?)
-            GROUP BY DATE(created_at), type
+            SELECT day as date, type, count
+            FROM daily_guild_stats
+            WHERE guild_id = ? AND kind = 'sanction'
+            AND day >= DATE('now', ?)
+            AND count > 0
             ORDER BY date
         """, (guild_id, f'-{days} days'))
         return [dict_from_row(row) for row in cursor.fetchall()]
 
 def create(sanction_data: dict):
     """Créer une nouvelle sanction."""
-    with get_connection() as conn:
+    with DatabaseConnection() as conn:
         cursor = conn.execute("""
             INSERT INTO sanctions (guild_id, user_id, moderator_id, type, reason, duration, expires_at, active)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
@@ -86,6 +135,7 @@ def create(sanction_data: dict):
             sanction_data.get('user_id'),
             sanction_data.get('moderator_id'),
             sanction_data.get('type'),
+            sanction_data.get('reason'),
             sanction_data.get('duration'),
             sanction_data.get('expires_at'),
             sanction_data.get('active', 1)
@@ -95,9 +145,38 @@ def create(sanction_data: dict):
 
 def deactivate(sanction_id: int):
     """Désactiver une sanction."""
-    with get_connection() as conn:
+    with DatabaseConnection() as conn:
         conn.execute(
             "UPDATE sanctions SET active = 0 WHERE id = ?",
             (sanction_id,)
         )
         conn.commit()
+
+# Opérations en masse : `ids` (liste d'IDs) ou filtres de get_page (sanction_type, active,
+# user_search, user_id, moderator_id, days) ; une transaction par appel.
+# Retournent le nb de sanctions modifiées.
+
+@cached('sanctions')
+def count_many(guild_id: str, **filters) -> int:
+    """Nb de sanctions visées par une opération en masse sur filtres (aperçu avant confirmation)."""
+    where, params = _filters(**filters)
+    return bulk.count('sanctions', 's', guild_id, where, params)
+
+def deactivate_many(guild_id: str, ids=None, **filters) -> int:
+    """Désactive des sanctions actives."""
+    where, params = _filters(**filters)
+    return bulk.update('sanctions', 's', "active = 0", guild_id, ids, where, params,
+                       condition=" AND +active = 1")
+
+def delete_many(guild_id: str, ids=None, **filters) -> int:
+    """Supprime des sanctions."""
+    where, params = _filters(**filters)
+    return bulk.delete('sanctions', 's', guild_id, ids, where, params)
+
+def reassign_moderator(guild_id: str, new_moderator_id: str, ids=None, **filters) -> int:
+    """Attribue des sanctions à un autre modérateur (ex: filtre moderator_id=ancien)."""
+    where, params = _filters(**filters)
+    return bulk.update('sanctions', 's', "moderator_id = ?", guild_id, ids, where, params,
+                       assignment_params=(new_moderator_id,),
+                       condition=" AND moderator_id IS NOT ?", condition_params=(new_moderator_id,))
+
@@ -0,0 +1,75 @@
+# Repo Search Python
+# Recherche plein texte sur l'index FTS5 search_index (migration 005, maintenu par triggers) :
+# raisons des warnings / sanctions, pseudos des users, contenu des déclenchements automod.
+import re
+
+from database.python.cache import cached
+from database.python.connection import DatabaseConnection, dict_from_row
+
+# kind -> code dans le rowid (rowid = id source * 8 + code)
+KINDS = {'warning': 1, 'sanction': 2, 'automod': 3, 'user': 4}
+
+# Nombre de correspondances les plus récentes classées par bm25, par kind. Classer toutes les
+# correspondances d'un terme fréquent coûte des centaines de ms sur un million de lignes ;
+# la lecture par rowid décroissant s'arrête après RANK_WINDOW lignes. Le rowid ne suit l'ordre
+# chronologique qu'à l'intérieur d'un kind (ids de tables différentes) : une fenêtre par kind,
+# sinon la table aux ids les plus hauts (automod_logs) évincerait les autres avant le classement.
+RANK_WINDOW = 1000
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _quote(value) -> str:
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def build_match(guild_id: str, text: str, kinds=None):
+    """
+    Expression MATCH pour une saisie libre, limitée à une guild (et à des kinds).
+    Chaque mot est cherché tel quel (pas de syntaxe FTS5 exposée), le dernier en préfixe
+    pour la saisie en cours. None si la saisie ne contient aucun mot.
+    """
+    tokens = _TOKEN_RE.findall(text or '')
+    if not tokens:
+        return None
+    terms = ' '.join(_quote(token) for token in tokens) + '*'
+    match = f"guild_id : {_quote(guild_id)} AND {{body user_id}} : ({terms})"
+    if kinds:
+        match += f" AND kind : ({' OR '.join(_quote(kind) for kind in kinds)})"
+    return match
+
+
+@cached('warnings', 'sanctions', 'automod_logs', 'users')
+def search(guild_id: str, text: str, kinds=None, limit: int = 50) -> list:
+    """
+    Résultats d'une guild pour une saisie libre, classés par pertinence (bm25)
+    parmi les RANK_WINDOW correspondances les plus récentes de chaque kind.
+    kinds: sous-ensemble de KINDS (défaut: tous)
+
+    Retourne [{'kind', 'id', 'user_id', 'created_at', 'snippet', 'score'}] ; le snippet encadre
+    les termes trouvés de ** (markdown).
+    """
+    if not _TOKEN_RE.search(text or ''):
+        return []
+    kinds = kinds or tuple(KINDS)
+    window = """
+        SELECT * FROM (
+            SELECT kind, rowid >> 3 as id, user_id, created_at,
+                   snippet(search_index, 0, '**', '**', '…', 12) as snippet,
+                   rank as score
+            FROM search_index
+            WHERE search_index MATCH ?
+            ORDER BY rowid DESC
+            LIMIT ?
+        )
+    """
+    params = []
+    for kind in kinds:
+        params += [build_match(guild_id, text, (kind,)), RANK_WINDOW]
+    with DatabaseConnection(readonly=True) as conn:
+        cursor = conn.execute(f"""
+            SELECT * FROM ({' UNION ALL '.join([window] * len(kinds))})
+            ORDER BY score
+            LIMIT ?
+        """, (*params, limit))
+        return [dict_from_row(row) for row in cursor.fetchall()]
@@ -0,0 +1,213 @@
+# Repo Timeline Python
+# Flux unique trié (plus récent d'abord) sur warnings, sanctions, automod_logs et mod_logs :
+# fusion k-way (heapq.merge) de curseurs par table, chacun lu dans l'ordre de son index
+# (guild_id, created_at) par fetchmany. Seules les lignes consommées sont lues.
+import heapq
+from itertools import islice
+
+from database.python.connection import DatabaseConnection, dict_from_row
+from database.python.pagination import Page
+
+# kind -> (SELECT normalisé, colonne du type, colonne de l'utilisateur ciblé)
+# L'ordre des kinds départage les lignes de même created_at.
+SOURCES = {
+    'warning': ("""
+        SELECT id, 'warning' as kind, 'warning' as type, user_id, moderator_id, reason,
+               NULL as duration, active, NULL as details, created_at
+        FROM warnings
+    """, None, 'user_id'),
+    'sanction': ("""
+        SELECT id, 'sanction' as kind, type, user_id, moderator_id, reason,
+               duration, active, NULL as details, created_at
+        FROM sanctions
+    """, 'type', 'user_id'),
+    'automod': ("""
+        SELECT id, 'automod' as kind, trigger_type as type, user_id, moderator_id,
+               trigger_content as reason, NULL as duration, NULL as active,
+               action_taken as details, created_at
+        FROM automod_logs
+    """, 'trigger_type', 'user_id'),
+    'mod_log': ("""
+        SELECT id, 'mod_log' as kind, action_type as type, target_id as user_id, moderator_id, reason,
+               NULL as duration, NULL as active, details, created_at
+        FROM mod_logs
+    """, 'action_type', 'target_id'),
+}
+
+KINDS = tuple(SOURCES)
+
+TABLES = {'warning': 'warnings', 'sanction': 'sanctions', 'automod': 'automod_logs', 'mod_log': 'mod_logs'}
+
+
+def _sort_key(row):
+    """Clé de tri globale : (created_at, rang du kind, id) ; created_at NULL en dernier."""
+    return (row['created_at'] or '', KINDS.index(row['kind']), row['id'])
+
+
+def _resolve_kinds(kinds, log_type):
+    """Sources à lire et type à filtrer, d'après les filtres communs."""
+    kinds = [k for k in KINDS if not kinds or k in kinds]
+    if log_type == 'warning':
+        # Les warnings n'ont pas de colonne type : 'warning' désigne la table
+        return [k for k in kinds if k == 'warning'], None
+    if log_type:
+        return [k for k in kinds if SOURCES[k][1]], log_type
+    return kinds, None
+
+
+def _where(kind, guild_id, log_type, user_id, moderator_id, days):
+    """Clause WHERE (et paramètres) des filtres communs pour une source."""
+    _, type_col, user_col = SOURCES[kind]
+    where = " WHERE guild_id = ?"
+    params = [guild_id]
+    if log_type and type_col:
+        where += f" AND {type_col} = ?"
+        params.append(log_type)
+    if user_id:
+        where += f" AND {user_col} = ?"
+        params.append(user_id)
+    if moderator_id:
+        where += " AND moderator_id = ?"
+        params.append(moderator_id)
+    if days is not None:
+        where += " AND created_at >= DATE('now', ?)"
+        params.append(f'-{days} days')
+    return where, params
+
+
+def _iter_source(conn, kind, guild_id, cursor, log_type, user_id, moderator_id, days, chunk_size):
+    """Lignes d'une table dans l'ordre (created_at DESC, id DESC), après le curseur global."""
+    sql = SOURCES[kind][0]
+    where, params = _where(kind, guild_id, log_type, user_id, moderator_id, days)
+
+    rank = KINDS.index(kind)
+    segments = [('value', '', []), ('null', '', [])]
+    if cursor is not None:
+        created_at, cursor_kind, cursor_id = cursor
+        cursor_rank = KINDS.index(cursor_kind)
+        if created_at:
+            # Clé (created_at, rang, id) < curseur, réécrite en condition servie par l'index
+            if rank < cursor_rank:
+                value = (" AND created_at <= ?", [created_at])
+            elif rank > cursor_rank:
+                value = (" AND created_at < ?", [created_at])
+            else:
+                value = (" AND (created_at, id) < (?, ?)", [created_at, cursor_id])
+            segments = [('value', *value), ('null', '', [])]
+        else:
+            # Curseur dans le segment created_at NULL
+            if rank > cursor_rank:
+                return
+            segments = [('null', " AND id < ?" if rank == cursor_rank else "",
+                         [cursor_id] if rank == cursor_rank else [])]
+
+    for segment, keyset, keyset_params in segments:
+        if segment == 'value':
+            query = f"{sql}{where} AND created_at IS NOT NULL{keyset} ORDER BY created_at DESC, id DESC"
+        else:
+            query = f"{sql}{where} AND created_at IS NULL{keyset} ORDER BY id DESC"
+        rows = conn.execute(query, [*params, *keyset_params])
+        while True:
+            chunk = rows.fetchmany(chunk_size)
+            if not chunk:
+                break
+            for row in chunk:
+                yield dict_from_row(row)
+
+
+def iter_timeline(guild_id: str, cursor: tuple = None, kinds=None, log_type: str = None,
+                  user_id: str = None, moderator_id: str = None, days: int = None,
+                  chunk_size: int = 100):
+    """
+    Générateur de la timeline de modération d'une guild, du plus récent au plus ancien.
+
+    cursor: (created_at, kind, id) de la dernière ligne vue, ou None
+    kinds: sous-ensemble de KINDS (défaut: tous)
+    log_type: type de sanction / trigger_type / action_type (les warnings n'ont pas de type)
+    """
+    kinds, log_type = _resolve_kinds(kinds, log_type)
+    with DatabaseConnection(readonly=True) as conn:
+        streams = [
+            _iter_source(conn, kind, guild_id, cursor, log_type, user_id, moderator_id, days, chunk_size)
+            for kind in kinds
+        ]
+        try:
+            yield from heapq.merge(*streams, key=_sort_key, reverse=True)
+        finally:
+            for stream in streams:
+                stream.close()
+
+
+def get_page(guild_id: str, cursor: tuple = None, limit: int = 50, **filters) -> Page:
+    """Une page de la timeline (mêmes filtres que iter_timeline) et le curseur de la suivante."""
+    stream = iter_timeline(guild_id, cursor, chunk_size=limit + 1, **filters)
+    try:
+        rows = list(islice(stream, limit + 1))
+    finally:
+        stream.close()
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = (last['created_at'], last['kind'], last['id'])
+    return Page(items=items, next_cursor=next_cursor)
+
+
+def get_watermarks() -> dict:
+    """Dernier id de chaque source : MAX(id) lit la fin du rowid, coût constant."""
+    with DatabaseConnection(readonly=True) as conn:
+        row = conn.execute("SELECT " + ", ".join(
+            f"(SELECT MAX(id) FROM {table}) as {kind}" for kind, table in TABLES.items()
+        )).fetchone()
+        return {kind: row[kind] or 0 for kind in KINDS}
+
+
+def get_since(guild_id: str, watermarks: dict, limit: int = 200, kinds=None, log_type: str = None,
+              user_id: str = None, moderator_id: str = None, days: int = None) -> list:
+    """
+    Lignes ajoutées après les watermarks (id > dernier id vu par source), plus récentes d'abord.
+    Lecture par plage de rowid : seules les nouvelles lignes sont parcourues.
+    """
+    kinds, log_type = _resolve_kinds(kinds, log_type)
+    rows = []
+    with DatabaseConnection(readonly=True) as conn:
+        for kind in kinds:
+            where, params = _where(kind, guild_id, log_type, user_id, moderator_id, days)
+            # NOT INDEXED : force la plage sur le rowid plutôt que l'index (guild_id, created_at)
+            cursor = conn.execute(
+                f"{SOURCES[kind][0]} NOT INDEXED {where} AND id > ? ORDER BY id DESC LIMIT ?",
+                [*params, watermarks.get(kind, 0), limit]
+            )
+            rows.extend(dict_from_row(row) for row in cursor.fetchall())
+    rows.sort(key=_sort_key, reverse=True)
+    return rows[:limit]
+
+
+# Colonnes des événements pour les calculs vectorisés (panel/analytics.py)
+# created_at en epoch secondes : conversion directe en datetime64, sans parsing côté Python
+COLUMN_SOURCES = {
+    'warning': "SELECT CAST(strftime('%s', created_at) AS INTEGER), user_id, moderator_id, '', active FROM warnings",
+    'sanction': "SELECT CAST(strftime('%s', created_at) AS INTEGER), user_id, moderator_id, type, active FROM sanctions",
+    'automod': """
+        SELECT CAST(strftime('%s', created_at) AS INTEGER), user_id, moderator_id, trigger_type, 0
+        FROM automod_logs
+    """,
+}
+
+COLUMNS = ('ts', 'user_id', 'moderator_id', 'type', 'active')
+
+
+def get_columns(guild_id: str, days: int = None) -> dict:
+    """
+    Warnings, sanctions et déclenchements automod d'une guild, en colonnes :
+    {kind: {'ts', 'user_id', 'moderator_id', 'type', 'active'}} (tuples de même longueur).
+    Une requête par table, lue par l'index (guild_id, created_at).
+    """
+    columns = {}
+    with DatabaseConnection(readonly=True) as conn:
+        for kind, select in COLUMN_SOURCES.items():
+            where, params = _where(kind, guild_id, None, None, None, days)
+            rows = conn.execute(f"{select} {where} AND strftime('%s', created_at) IS NOT NULL", params).fetchall()
+            values = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+            columns[kind] = dict(zip(COLUMNS, values))
+    return columns
@@ -1 +1,105 @@
 # Repo User Python
+# Les compteurs total_warnings / total_sanctions / risk_score sont maintenus par triggers
+# (warnings / sanctions actifs uniquement, cf. migration 004 et database.python.counters).
+from database.python.cache import cached
+from database.python.connection import DatabaseConnection, dict_from_row
+from database.python.nested import with_latest_children
+from database.python.repositories import search_repo
+
+@cached('users')
+def get_list(guild_id: str, search: str = None, min_warnings: int = None, max_warnings: int = None,
+             limit: int = 25):
+    """
+    Utilisateurs actifs d'une guild, triés par nombre de warnings actifs.
+    Filtre et tri sur les compteurs (index guild_id, is_active, total_warnings), sans agrégation.
+    """
+    query = """
+        SELECT discord_id as user_id, username, server_username, joined_at,
+               total_warnings as warning_count, total_sanctions as sanction_count, risk_score
+        FROM users
+        WHERE guild_id = ? AND is_active = 1
+    """
+    params = [guild_id]
+    if min_warnings is not None:
+        query += " AND total_warnings >= ?"
+        params.append(min_warnings)
+    if max_warnings is not None:
+        query += " AND total_warnings <= ?"
+        params.append(max_warnings)
+    match = search_repo.build_match(guild_id, search, kinds=['user']) if search else None
+    if match:
+        # Index plein texte (ID, pseudo, pseudo serveur) plutôt qu'un LIKE '%...%' sur toute la table
+        query += " AND id IN (SELECT rowid >> 3 FROM search_index WHERE search_index MATCH ?)"
+        params.append(match)
+    query += " ORDER BY total_warnings DESC, id DESC LIMIT ?"
+    params.append(limit)
+
+    with DatabaseConnection(readonly=True) as conn:
+        return [dict_from_row(row) for row in conn.execute(query, params).fetchall()]
+
+@cached('users')
+def get_warning_distribution(guild_id: str):
+    """Nombre d'utilisateurs par tranche de warnings actifs (lu sur l'index des compteurs)."""
+    with DatabaseConnection(readonly=True) as conn:
+        cursor = conn.execute("""
+            SELECT
+                CASE
+                    WHEN total_warnings = 0 THEN '0 warning'
+                    WHEN total_warnings = 1 THEN '1 warning'
+                    WHEN total_warnings = 2 THEN '2 warnings'
+                    WHEN total_warnings BETWEEN 3 AND 5 THEN '3-5 warnings'
+                    ELSE '6+ warnings'
+                END as category,
+                MIN(total_warnings) as bucket,
+                COUNT(*) as count
+            FROM users
+            WHERE guild_id = ?
+            GROUP BY category
+            ORDER BY bucket
+        """, (guild_id,))
+        return [{'category': row['category'], 'count': row['count']} for row in cursor.fetchall()]
+
+@cached('users')
+def get_joins_by_month(guild_id: str, months: int = 12):
+    """Nouveaux membres actifs par mois d'arrivée, du plus récent au plus ancien : [{'month', 'count'}]."""
+    with DatabaseConnection(readonly=True) as conn:
+        cursor = conn.execute("""
+            SELECT strftime('%Y-%m', joined_at) as month, COUNT(*) as count
+            FROM users
+            WHERE guild_id = ? AND joined_at IS NOT NULL AND is_active = 1
+            GROUP BY month
+            ORDER BY month DESC
+            LIMIT ?
+        """, (guild_id, months))
+        return [dict_from_row(row) for row in cursor.fetchall()]
+
+@cached('users', 'warnings')
+def get_watch_list(guild_id: str, min_warnings: int = 3, limit: int = 20, recent: int = 5):
+    """
+    Utilisateurs à surveiller (>= min_warnings warnings actifs) avec leurs `recent` derniers warnings,
+    en une seule requête. Chaque user a une clé 'recent_warnings'.
+    """
+    with DatabaseConnection(readonly=True) as conn:
+        users = with_latest_children(
+            conn,
+            parents_sql="""
+                SELECT discord_id as user_id, username, server_username, total_warnings as warning_count
+                FROM users
+                WHERE guild_id = ? AND is_active = 1 AND total_warnings >= ?
+                ORDER BY total_warnings DESC
+                LIMIT ?
+            """,
+            parent_order='warning_count DESC, user_id',
+            children_sql="""
+                SELECT id, user_id, moderator_id, reason, created_at
+                FROM warnings
+                WHERE guild_id = ?
+            """,
+            link={'user_id': 'user_id'},
+            k=recent,
+            params=(guild_id, min_warnings, limit, guild_id),
+            key='recent_warnings'
+        )
+    for user in users:
+        user['last_warning'] = user['recent_warnings'][0]['created_at'] if user['recent_warnings'] else None
+    return users
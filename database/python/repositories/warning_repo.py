@@ -1,10 +1,12 @@
 # Repo Warning Python
-from database.python.connection import get_connection, dict_from_row
-from datetime import datetime, timedelta
+from database.python import bulk
+from database.python.cache import cached
+from database.python.connection import DatabaseConnection, dict_from_row
+from database.python.pagination import Page, fetch_page
 
 def get_by_guild(guild_id: str, limit: int = 100):
     """Tous les warnings d'une guild."""
-    with get_connection() as conn:
+    with DatabaseConnection(readonly=True) as conn:
         cursor = conn.execute("""
             SELECT w.*, u.username 
             FROM warnings w
@@ -15,9 +17,49 @@ def get_by_guild(guild_id: str, limit: int = 100):
         """, (guild_id, limit))
         return [dict_from_row(row) for row in cursor.fetchall()]
 
+def _filters(user_search: str = None, moderator_id: str = None, user_id: str = None,
+             days: int = None, active: bool = None):
+    """Filtres communs à get_page et aux opérations en masse : (clauses " AND ...", params)."""
+    sql, params = "", []
+    if user_search:
+        sql += " AND w.user_id LIKE ?"
+        params.append(f"%{user_search}%")
+    if user_id:
+        sql += " AND w.user_id = ?"
+        params.append(user_id)
+    if moderator_id:
+        sql += " AND w.moderator_id = ?"
+        params.append(moderator_id)
+    if days is not None:
+        sql += " AND w.created_at >= DATE('now', ?)"
+        params.append(f'-{days} days')
+    if active is not None:
+        sql += " AND w.active = ?"
+        params.append(int(active))
+    return sql, params
+
+@cached('warnings', 'users')
+def get_page(guild_id: str, cursor: tuple = None, limit: int = 50, user_search: str = None,
+             moderator_id: str = None, user_id: str = None, days: int = None,
+             order_by: str = 'created_at', descending: bool = True) -> Page:
+    """
+    Warnings d'une guild, paginés par curseur (created_at, id).
+    Passer page.next_cursor pour obtenir la page suivante.
+    """
+    where, params = _filters(user_search, moderator_id, user_id, days)
+    sql = """
+        SELECT w.*, u.username
+        FROM warnings w
+        LEFT JOIN users u ON w.user_id = u.discord_id AND w.guild_id = u.guild_id
+        WHERE w.guild_id = ?
+    """ + where + " {keyset} {order}"
+    params = [guild_id, *params]
+    with DatabaseConnection(readonly=True) as conn:
+        return fetch_page(conn, sql, params, cursor, limit, order_by, descending, alias='w')
+
 def get_by_user(user_id: str, guild_id: str):
     """Warnings d'un user."""
-    with get_connection() as conn:
+    with DatabaseConnection(readonly=True) as conn:
         cursor = conn.execute("""
             SELECT w.*, u.username 
             FROM warnings w
@@ -29,7 +71,7 @@ def get_by_user(user_id: str, guild_id: str):
 
 def get_active_by_user(user_id: str, guild_id: str):
     """Warnings actifs seulement."""
-    with get_connection() as conn:
+    with DatabaseConnection(readonly=True) as conn:
         cursor = conn.execute("""
             SELECT w.*, u.username 
             FROM warnings w
@@ -41,7 +83,7 @@ def get_active_by_user(user_id: str, guild_id: str):
 
 def get_recent(guild_id: str, days: int = 7):
     """Warnings récents."""
-    with get_connection() as conn:
+    with DatabaseConnection(readonly=True) as conn:
         cursor = conn.execute("""
             SELECT w.*, u.username 
             FROM warnings w
@@ -53,22 +95,25 @@ def get_recent(guild_id: str, days: int = 7):
         """, (guild_id, f'-{days} days'))
         return [dict_from_row(row) for row in cursor.fetchall()]
 
+@cached('warnings')
 def get_stats_by_day(guild_id: str, days: int = 30):
-    """Warnings par jour pour graphique."""
-    with get_connection() as conn:
+    """Warnings par jour pour graphique (depuis le rollup daily_guild_stats)."""
+    with DatabaseConnection(readonly=True) as conn:
         cursor = conn.execute("""
-            SELECT DATE(created_at) as date, COUNT(*) as count
-            FROM warnings
-            WHERE guild_id = ?
-            AND created_at >= datetime('now', ?)
-            GROUP BY DATE(created_at)
+            SELECT day as date, SUM(count) as count
+            FROM daily_guild_stats
+            WHERE guild_id = ? AND kind = 'warning'
+            AND day >= DATE('now', ?)
+            GROUP BY day
+            HAVING SUM(count) > 0
             ORDER BY date
         """, (guild_id, f'-{days} days'))
         return [dict_from_row(row) for row in cursor.fetchall()]
 
+@cached('warnings')
 def get_top_warned_users(guild_id: str, limit: int = 10):
     """Users avec le plus de warnings."""
-    with get_connection() as conn:
+    with DatabaseConnection(readonly=True) as conn:
         cursor = conn.execute("""
             SELECT user_id, COUNT(*) as warning_count
             FROM warnings
@@ -78,3 +123,36 @@ def get_top_warned_users(guild_id: str, limit: int = 10):
             LIMIT ?
         """, (guild_id, limit))
         return [dict_from_row(row) for row in cursor.fetchall()]
+
+# Opérations en masse : `ids` (liste d'IDs) ou filtres de get_page (user_search, user_id,
+# moderator_id, days, active) ; une transaction par appel. Retournent le nb de warnings modifiés.
+
+@cached('warnings')
+def count_many(guild_id: str, **filters) -> int:
+    """Nb de warnings visés par une opération en masse sur filtres (aperçu avant confirmation)."""
+    where, params = _filters(**filters)
+    return bulk.count('warnings', 'w', guild_id, where, params)
+
+def deactivate_many(guild_id: str, ids=None, **filters) -> int:
+    """Désactive des warnings actifs."""
+    where, params = _filters(**filters)
+    return bulk.update('warnings', 'w', "active = 0", guild_id, ids, where, params,
+                       condition=" AND +active = 1")
+
+def expire_many(guild_id: str, ids=None, **filters) -> int:
+    """Fait expirer des warnings actifs maintenant (active = 0, expires_at = date courante)."""
+    where, params = _filters(**filters)
+    return bulk.update('warnings', 'w', "active = 0, expires_at = CURRENT_TIMESTAMP", guild_id, ids,
+                       where, params, condition=" AND +active = 1")
+
+def delete_many(guild_id: str, ids=None, **filters) -> int:
+    """Supprime des warnings."""
+    where, params = _filters(**filters)
+    return bulk.delete('warnings', 'w', guild_id, ids, where, params)
+
+def reassign_moderator(guild_id: str, new_moderator_id: str, ids=None, **filters) -> int:
+    """Attribue des warnings à un autre modérateur (ex: filtre moderator_id=ancien)."""
+    where, params = _filters(**filters)
+    return bulk.update('warnings', 'w', "moderator_id = ?", guild_id, ids, where, params,
+                       assignment_params=(new_moderator_id,),
+                       condition=" AND moderator_id IS NOT ?", condition_params=(new_moderator_id,))
@@ -0,0 +1,127 @@
+# Rollups maintenus par triggers : journalier daily_guild_stats (migration 002)
+# et cube horaire hourly_guild_stats (migration 007)
+#
+# Usage (depuis la racine du projet) :
+#   python -m database.python.rollups --check              # compare rollups et tables brutes
+#   python -m database.python.rollups --rebuild [--guild ID] [--rollup hourly]
+import argparse
+import sys
+from pathlib import Path
+
+from database.python.connection import DatabaseConnection, dict_from_row
+
+# Agrégation brute, même découpage que les triggers : (guild_id, kind, day, type, count)
+RAW_DAILY_SQL = """
+    SELECT guild_id, 'warning' as kind, COALESCE(DATE(created_at), '') as day, '' as type, COUNT(*) as count
+    FROM warnings WHERE (:guild_id IS NULL OR guild_id = :guild_id) GROUP BY 1, 3
+    UNION ALL
+    SELECT guild_id, 'sanction', COALESCE(DATE(created_at), ''), type, COUNT(*)
+    FROM sanctions WHERE (:guild_id IS NULL OR guild_id = :guild_id) GROUP BY 1, 3, 4
+    UNION ALL
+    SELECT guild_id, 'automod', COALESCE(DATE(created_at), ''), COALESCE(trigger_type, ''), COUNT(*)
+    FROM automod_logs WHERE (:guild_id IS NULL OR guild_id = :guild_id) GROUP BY 1, 3, 4
+"""
+
+_HOUR = "COALESCE(CAST(strftime('%H', created_at) AS INTEGER), 0)"
+
+# Idem pour le cube horaire : (guild_id, kind, day, hour, type, channel_id, count)
+RAW_HOURLY_SQL = f"""
+    SELECT guild_id, 'warning' as kind, COALESCE(DATE(created_at), '') as day, {_HOUR} as hour,
+           '' as type, '' as channel_id, COUNT(*) as count
+    FROM warnings WHERE (:guild_id IS NULL OR guild_id = :guild_id) GROUP BY 1, 3, 4
+    UNION ALL
+    SELECT guild_id, 'sanction', COALESCE(DATE(created_at), ''), {_HOUR}, type, '', COUNT(*)
+    FROM sanctions WHERE (:guild_id IS NULL OR guild_id = :guild_id) GROUP BY 1, 3, 4, 5
+    UNION ALL
+    SELECT guild_id, 'automod', COALESCE(DATE(created_at), ''), {_HOUR},
+           COALESCE(trigger_type, ''), COALESCE(channel_id, ''), COUNT(*)
+    FROM automod_logs WHERE (:guild_id IS NULL OR guild_id = :guild_id) GROUP BY 1, 3, 4, 5, 6
+"""
+
+# nom -> (table, colonnes de clé, agrégation brute)
+ROLLUPS = {
+    'daily': ('daily_guild_stats', ('guild_id', 'kind', 'day', 'type'), RAW_DAILY_SQL),
+    'hourly': ('hourly_guild_stats', ('guild_id', 'kind', 'day', 'hour', 'type', 'channel_id'), RAW_HOURLY_SQL),
+}
+
+
+def rebuild(guild_id: str = None, rollup: str = 'daily') -> int:
+    """Recalcule un rollup (une guild ou toutes) depuis les tables brutes. Retourne le nb de lignes."""
+    table, keys, raw_sql = ROLLUPS[rollup]
+    params = {'guild_id': guild_id}
+    with DatabaseConnection() as conn:
+        conn.execute(
+            f"DELETE FROM {table} WHERE (:guild_id IS NULL OR guild_id = :guild_id)",
+            params
+        )
+        cursor = conn.execute(
+            f"INSERT INTO {table} ({', '.join(keys)}, count) {raw_sql}",
+            params
+        )
+        return cursor.rowcount
+
+
+def check_consistency(guild_id: str = None, rollup: str = 'daily') -> list:
+    """
+    Différences entre un rollup et les tables brutes.
+    Retourne [{colonnes de clé..., 'expected', 'actual'}] (vide si cohérent).
+    """
+    table, keys, raw_sql = ROLLUPS[rollup]
+    columns = ', '.join(keys)
+    join = ' AND '.join(f"d.{key} = r.{key}" for key in keys)
+    with DatabaseConnection(readonly=True) as conn:
+        cursor = conn.execute(f"""
+            WITH raw AS ({raw_sql}),
+            rollup AS (
+                SELECT {columns}, count FROM {table}
+                WHERE (:guild_id IS NULL OR guild_id = :guild_id) AND count != 0
+            )
+            SELECT {', '.join(f'r.{key}' for key in keys)}, r.count as expected, COALESCE(d.count, 0) as actual
+            FROM raw r
+            LEFT JOIN rollup d ON {join}
+            WHERE d.count IS NULL OR d.count != r.count
+            UNION ALL
+            SELECT {', '.join(f'd.{key}' for key in keys)}, 0, d.count
+            FROM rollup d
+            WHERE NOT EXISTS (SELECT 1 FROM raw r WHERE {join})
+        """, {'guild_id': guild_id})
+        return [dict_from_row(row) for row in cursor.fetchall()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rollups daily_guild_stats et hourly_guild_stats")
+    parser.add_argument('--rebuild', action='store_true', help="Recalculer les rollups")
+    parser.add_argument('--check', action='store_true', help="Vérifier la cohérence")
+    parser.add_argument('--guild', default=None, help="Limiter à un serveur")
+    parser.add_argument('--rollup', choices=list(ROLLUPS), default=None, help="Un seul rollup (défaut: tous)")
+    parser.add_argument('--db', type=Path, default=None, help="Chemin de la base (défaut: database/cardinal.db)")
+    args = parser.parse_args()
+
+    if args.db is not None:
+        from database.python import connection
+        connection.DB_PATH = args.db
+        connection.reset_pools()
+
+    rollups = [args.rollup] if args.rollup else list(ROLLUPS)
+
+    if args.rebuild:
+        for rollup in rollups:
+            rows = rebuild(args.guild, rollup)
+            print(f"Rollup {rollup} reconstruit : {rows} ligne(s)")
+
+    if args.check or not args.rebuild:
+        total = 0
+        for rollup in rollups:
+            diffs = check_consistency(args.guild, rollup)
+            for d in diffs:
+                hour = f" {d['hour']:02d}h" if 'hour' in d else ''
+                channel = f" #{d['channel_id']}" if d.get('channel_id') else ''
+                print(f"[{rollup}] {d['guild_id']} {d['kind']:<8} {d['day'] or '(sans date)'}{hour} "
+                      f"{d['type'] or '-':<12}{channel} attendu={d['expected']} rollup={d['actual']}")
+            total += len(diffs)
+        print(f"{total} écart(s)")
+        sys.exit(1 if total else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+# Snapshots colonnes (Arrow IPC) de l'historique des guilds
+#
+# Une guild = un dossier SNAPSHOT_DIR/<guild_id>/ : un manifest.json et, par table
+# (warnings, sanctions, automod_logs, users), des fichiers Arrow IPC non compressés lus en
+# memory-map (zero-copy : les colonnes pointent directement dans le fichier).
+#
+# Rafraîchissement incrémental par watermark de rowid : seules les lignes d'id > watermark sont
+# lues et ajoutées dans un nouveau fichier « part ». table_versions (migration 003) dit si autre
+# chose qu'un ajout a eu lieu : si la version a avancé de plus que le nombre de lignes ajoutées
+# (UPDATE, DELETE), la table de la guild est reconstruite. Au-delà de MAX_PARTS fichiers, les
+# parts sont fusionnés.
+#
+# Lecture (load) : snapshot + « queue chaude » lue dans SQLite (lignes ajoutées depuis le dernier
+# rafraîchissement), tant qu'elle reste sous TAIL_MAX lignes.
+#
+# Nécessite pyarrow (optionnel : available() indique s'il est installé).
+#
+# Usage (depuis la racine du projet) :
+#   python -m database.python.snapshots                 # toutes les guilds
+#   python -m database.python.snapshots --guild ID [--rebuild]
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from database.python.connection import DatabaseConnection, read_snapshot
+
+# Dossier des snapshots
+SNAPSHOT_DIR = Path(os.getenv('DB_SNAPSHOT_DIR', Path(__file__).parent.parent / 'snapshots'))
+
+# Lignes par record batch (lecture fetchmany et écriture)
+CHUNK_SIZE = int(os.getenv('DB_SNAPSHOT_CHUNK_SIZE', 50000))
+
+# Nb max de fichiers part par table avant fusion
+MAX_PARTS = 16
+
+# Au-delà de ce nb de lignes non encore snapshotées, load() rafraîchit avant de lire
+TAIL_MAX = 20000
+
+# table -> [(colonne, type Arrow, expression SQL)] ; dates en epoch secondes (UTC)
+SCHEMAS = {
+    'warnings': [
+        ('id', 'int64', 'id'),
+        ('user_id', 'string', 'user_id'),
+        ('moderator_id', 'string', 'moderator_id'),
+        ('reason', 'string', 'reason'),
+        ('active', 'int64', 'active'),
+        ('ts', 'int64', "CAST(strftime('%s', created_at) AS INTEGER)"),
+    ],
+    'sanctions': [
+        ('id', 'int64', 'id'),
+        ('user_id', 'string', 'user_id'),
+        ('moderator_id', 'string', 'moderator_id'),
+        ('type', 'string', 'type'),
+        ('reason', 'string', 'reason'),
+        ('duration', 'int64', 'duration'),
+        ('active', 'int64', 'active'),
+        ('ts', 'int64', "CAST(strftime('%s', created_at) AS INTEGER)"),
+    ],
+    'automod_logs': [
+        ('id', 'int64', 'id'),
+        ('user_id', 'string', 'user_id'),
+        ('moderator_id', 'string', 'moderator_id'),
+        ('channel_id', 'string', 'channel_id'),
+        ('trigger_type', 'string', 'trigger_type'),
+        ('action_taken', 'string', 'action_taken'),
+        ('severity', 'int64', 'severity'),
+        ('ts', 'int64', "CAST(strftime('%s', created_at) AS INTEGER)"),
+    ],
+    'users': [
+        ('id', 'int64', 'id'),
+        ('discord_id', 'string', 'discord_id'),
+        ('username', 'string', 'username'),
+        ('server_username', 'string', 'server_username'),
+        ('total_warnings', 'int64', 'total_warnings'),
+        ('total_sanctions', 'int64', 'total_sanctions'),
+        ('risk_score', 'int64', 'risk_score'),
+        ('is_active', 'int64', 'is_active'),
+        ('ts', 'int64', "CAST(strftime('%s', joined_at) AS INTEGER)"),
+    ],
+}
+
+# Sérialise rafraîchissements et lectures du process (pas de part supprimé pendant une lecture)
+_lock = threading.RLock()
+
+
+def available() -> bool:
+    """True si pyarrow est installé."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        raise RuntimeError("Les snapshots colonnes nécessitent pyarrow (pip install pyarrow)")
+    return pa, pc
+
+
+def _schema(table: str):
+    pa, _ = _pyarrow()
+    return pa.schema([(name, getattr(pa, arrow_type)()) for name, arrow_type, _ in SCHEMAS[table]])
+
+
+def _guild_dir(guild_id: str) -> Path:
+    return SNAPSHOT_DIR / str(guild_id)
+
+
+def read_manifest(guild_id: str) -> dict:
+    """Manifest d'une guild : {table: {'watermark', 'version', 'rows', 'parts', 'refreshed_at'}}."""
+    path = _guild_dir(guild_id) / 'manifest.json'
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def _write_manifest(guild_id: str, manifest: dict):
+    path = _guild_dir(guild_id) / 'manifest.json'
+    tmp = path.with_name(path.name + '.part')
+    tmp.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def _version(conn, table: str, guild_id: str) -> int:
+    row = conn.execute(
+        "SELECT version FROM table_versions WHERE table_name = ? AND guild_id = ?", (table, guild_id)
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def _select(table: str, guild_id: str, after_id: int = 0):
+    """
+    SELECT des lignes d'une guild d'id > after_id.
+    Complément (after_id > 0) : NOT INDEXED force la plage sur le rowid, seules les nouvelles lignes
+    sont parcourues. Construction : index de la guild, sans tri.
+    """
+    expressions = ', '.join(expr for _, _, expr in SCHEMAS[table])
+    if after_id:
+        return (f"SELECT {expressions} FROM {table} NOT INDEXED WHERE guild_id = ? AND id > ?",
+                (guild_id, after_id))
+    return f"SELECT {expressions} FROM {table} WHERE guild_id = ?", (guild_id,)
+
+
+def _iter_batches(conn, table: str, guild_id: str, after_id: int = 0):
+    """Record batches Arrow des lignes d'id > after_id, lues par fetchmany."""
+    pa, _ = _pyarrow()
+    schema = _schema(table)
+    cursor = conn.execute(*_select(table, guild_id, after_id))
+    while True:
+        rows = cursor.fetchmany(CHUNK_SIZE)
+        if not rows:
+            break
+        columns = list(zip(*rows))
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema
+        )
+
+
+def _write_part(guild_id: str, table: str, batches) -> tuple:
+    """Écrit un fichier part (Arrow IPC). Retourne (nom du fichier, lignes, id max) ou None si vide."""
+    pa, pc = _pyarrow()
+    directory = _guild_dir(guild_id) / table
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f"part-{uuid.uuid4().hex}.arrow"
+    tmp = directory / (name + '.part')
+    rows, last_id = 0, 0
+    with pa.OSFile(str(tmp), 'wb') as sink, pa.ipc.new_file(sink, _schema(table)) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+            last_id = max(last_id, pc.max(batch.column(0)).as_py())
+    if not rows:
+        tmp.unlink()
+        return None
+    os.replace(tmp, directory / name)
+    return name, rows, last_id
+
+
+def _read_parts(guild_id: str, table: str, parts: list):
+    """Table Arrow des parts, en memory-map (zero-copy)."""
+    pa, _ = _pyarrow()
+    directory = _guild_dir(guild_id) / table
+    tables = [pa.ipc.open_file(pa.memory_map(str(directory / name), 'r')).read_all() for name in parts]
+    if not tables:
+        return _schema(table).empty_table()
+    return pa.concat_tables(tables)
+
+
+def _cleanup(guild_id: str, table: str, parts: list):
+    """Supprime les fichiers part qui ne sont plus référencés par le manifest."""
+    directory = _guild_dir(guild_id) / table
+    if directory.exists():
+        for path in directory.iterdir():
+            if path.name not in parts:
+                path.unlink(missing_ok=True)
+
+
+def refresh(guild_id: str, table: str, rebuild: bool = False) -> dict:
+    """
+    Met à jour le snapshot d'une table pour une guild.
+    Retourne l'entrée du manifest, avec 'action' : 'unchanged', 'append', 'rebuild' ou 'compact'.
+    """
+    with _lock, read_snapshot() as conn:
+        manifest = read_manifest(guild_id)
+        entry = manifest.get(table)
+        version = _version(conn, table, guild_id)
+
+        if entry is not None and not rebuild and entry['version'] == version:
+            return dict(entry, action='unchanged')
+
+        if entry is not None and not rebuild:
+            added = conn.execute(
+                f"SELECT COUNT(*) FROM {table} NOT INDEXED WHERE guild_id = ? AND id > ?",
+                (guild_id, entry['watermark'])
+            ).fetchone()[0]
+            # Seuls des ajouts : la version a avancé d'une unité par ligne ajoutée
+            if version - entry['version'] == added:
+                part = _write_part(guild_id, table, _iter_batches(conn, table, guild_id, entry['watermark']))
+                entry = dict(entry, version=version)
+                action = 'append'
+                if part is not None:
+                    name, rows, last_id = part
+                    entry.update(parts=entry['parts'] + [name], rows=entry['rows'] + rows, watermark=last_id)
+                if len(entry['parts']) > MAX_PARTS:
+                    merged = _read_parts(guild_id, table, entry['parts']).to_batches(CHUNK_SIZE)
+                    name, _, _ = _write_part(guild_id, table, merged)
+                    entry['parts'] = [name]
+                    action = 'compact'
+                entry['refreshed_at'] = time.time()
+                manifest[table] = entry
+                _write_manifest(guild_id, manifest)
+                _cleanup(guild_id, table, entry['parts'])
+                return dict(entry, action=action)
+
+        # Première construction, ou UPDATE / DELETE depuis le dernier rafraîchissement
+        part = _write_part(guild_id, table, _iter_batches(conn, table, guild_id))
+        name, rows, last_id = part if part is not None else (None, 0, 0)
+        entry = {
+            'watermark': last_id,
+            'version': version,
+            'rows': rows,
+            'parts': [name] if name else [],
+            'refreshed_at': time.time(),
+        }
+        manifest[table] = entry
+        _write_manifest(guild_id, manifest)
+        _cleanup(guild_id, table, entry['parts'])
+        return dict(entry, action='rebuild')
+
+
+def refresh_guild(guild_id: str, rebuild: bool = False) -> dict:
+    """Met à jour les snapshots de toutes les tables d'une guild. Retourne {table: entrée}."""
+    return {table: refresh(guild_id, table, rebuild) for table in SCHEMAS}
+
+
+def load(guild_id: str, table: str, since: int = None, columns: list = None):
+    """
+    Table Arrow des lignes d'une guild : snapshot (memory-map) + lignes récentes lues dans SQLite.
+    since: epoch secondes minimum sur `ts` ; columns: colonnes à garder (défaut: toutes)
+
+    Rafraîchit d'abord si le snapshot n'existe pas, n'est plus un préfixe de la table
+    (UPDATE / DELETE) ou si la queue dépasse TAIL_MAX lignes.
+    """
+    pa, pc = _pyarrow()
+    with _lock, read_snapshot() as conn:
+        entry = read_manifest(guild_id).get(table)
+        version = _version(conn, table, guild_id)
+        tail = None
+        if entry is not None and entry['version'] != version:
+            tail = pa.Table.from_batches(
+                list(_iter_batches(conn, table, guild_id, entry['watermark'])), schema=_schema(table)
+            )
+            if version - entry['version'] != tail.num_rows or tail.num_rows > TAIL_MAX:
+                entry = tail = None
+        if entry is None:
+            entry = refresh(guild_id, table)
+        result = _read_parts(guild_id, table, entry['parts'])
+
+    if tail is not None and tail.num_rows:
+        result = pa.concat_tables([result, tail])
+    if since is not None:
+        result = result.filter(pc.greater_equal(result['ts'], since))
+    if columns is not None:
+        result = result.select(columns)
+    return result
+
+
+def list_guilds() -> list:
+    """Guilds présentes dans la base (table guilds ou données versionnées)."""
+    with DatabaseConnection(readonly=True) as conn:
+        rows = conn.execute("SELECT id FROM guilds UNION SELECT guild_id FROM table_versions").fetchall()
+        return [row[0] for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshots colonnes (Arrow) de l'historique des guilds")
+    parser.add_argument('--guild', default=None, help="Limiter à un serveur")
+    parser.add_argument('--rebuild', action='store_true', help="Reconstruire au lieu de compléter")
+    parser.add_argument('--dir', type=Path, default=None, help="Dossier des snapshots (défaut: database/snapshots)")
+    parser.add_argument('--db', type=Path, default=None, help="Chemin de la base (défaut: database/cardinal.db)")
+    args = parser.parse_args()
+
+    if args.db is not None:
+        from database.python import connection
+        connection.DB_PATH = args.db
+        connection.reset_pools()
+    if args.dir is not None:
+        global SNAPSHOT_DIR
+        SNAPSHOT_DIR = args.dir
+
+    for guild_id in ([args.guild] if args.guild else list_guilds()):
+        for table, entry in refresh_guild(guild_id, args.rebuild).items():
+            print(f"{guild_id} {table:<13} {entry['action']:<9} {entry['rows']} ligne(s), "
+                  f"{len(entry['parts'])} part(s), watermark {entry['watermark']}")
+
+
+if __name__ == "__main__":
+    main()
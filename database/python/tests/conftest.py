@@ -0,0 +1,62 @@
+# Fixtures : bases SQLite jetables (schéma unifié + migrations), jamais database/cardinal.db
+import shutil
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from database.python import cache, connection, migrations
+from database.python.benchmarks import generate
+
+
+def _use(path: Path):
+    connection.DB_PATH = path
+    connection.reset_pools()
+
+
+@pytest.fixture(autouse=True)
+def _restore_db_path():
+    """Chaque test retrouve la base par défaut et le cache actif."""
+    previous = connection.DB_PATH
+    yield
+    cache.set_enabled(True)
+    _use(previous)
+
+
+@pytest.fixture
+def empty_db(tmp_path) -> Path:
+    """Base vide à jour (schéma unifié + migrations), connexion du module pointée dessus."""
+    path = tmp_path / 'empty.db'
+    conn = sqlite3.connect(str(path))
+    conn.executescript(generate.SCHEMA_PATH.read_text(encoding='utf-8'))
+    conn.close()
+    _use(path)
+    migrations.migrate()
+    return path
+
+
+@pytest.fixture(scope='session')
+def generated_db(tmp_path_factory) -> Path:
+    """Petite base synthétique (benchmarks/generate.py), partagée par la session : lecture seule."""
+    path = tmp_path_factory.mktemp('generated') / 'generated.db'
+    generate.generate(path, seed=7, days=120, guilds=2, members=400, warnings=3000,
+                      sanctions=600, automod_logs=4000)
+    return path
+
+
+@pytest.fixture
+def use_generated(generated_db) -> Path:
+    _use(generated_db)
+    return generated_db
+
+
+@pytest.fixture
+def generated_copy(generated_db, tmp_path) -> Path:
+    """Copie modifiable de la base synthétique, connexion du module pointée dessus."""
+    path = tmp_path / 'copy.db'
+    shutil.copyfile(generated_db, path)
+    _use(path)
+    return path
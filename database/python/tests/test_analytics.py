@@ -0,0 +1,73 @@
+# Parité entre panel/analytics.py (NumPy / pandas) et les agrégats SQL équivalents
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('pandas')
+
+from database.python import cache, connection
+from panel import analytics
+
+DAYS = 30
+
+
+@pytest.fixture
+def guild_id(use_generated):
+    cache.set_enabled(False)
+    with connection.DatabaseConnection(readonly=True) as conn:
+        return conn.execute(
+            "SELECT guild_id FROM warnings GROUP BY guild_id ORDER BY COUNT(*) DESC LIMIT 1"
+        ).fetchone()[0]
+
+
+def _sql(query: str, guild_id: str) -> list:
+    with connection.DatabaseConnection(readonly=True) as conn:
+        return conn.execute(query, (guild_id, f'-{DAYS} days')).fetchall()
+
+
+def test_moderator_share(guild_id):
+    events = analytics.load_events(guild_id, DAYS)
+    result = analytics.moderator_share(events, 'warning', limit=10_000)
+    expected = dict(_sql("""
+        SELECT moderator_id, COUNT(*) FROM warnings
+        WHERE guild_id = ? AND created_at >= DATE('now', ?) GROUP BY moderator_id
+    """, guild_id))
+    assert dict(zip(result['moderator_id'], result['count'].tolist())) == expected
+    assert result['share'].sum() == pytest.approx(1.0)
+
+
+def test_repeat_offenders_and_recidivism(guild_id):
+    events = analytics.load_events(guild_id, DAYS)
+    counts = dict(_sql("""
+        SELECT user_id, COUNT(*) FROM warnings
+        WHERE guild_id = ? AND created_at >= DATE('now', ?) GROUP BY user_id
+    """, guild_id))
+    result = analytics.repeat_offenders(events, 'warning', min_events=2, limit=10_000)
+    assert dict(zip(result['user_id'], result['warning_count'].tolist())) == {
+        user: count for user, count in counts.items() if count >= 2
+    }
+    recidivism = analytics.recidivism(events, 'warning')
+    assert recidivism['users'] == len(counts)
+    assert recidivism['repeat_users'] == sum(count >= 2 for count in counts.values())
+
+
+def test_type_counts(guild_id):
+    events = analytics.load_events(guild_id, DAYS)
+    result = analytics.type_counts(events, 'sanction')
+    expected = dict(_sql("""
+        SELECT type, COUNT(*) FROM sanctions
+        WHERE guild_id = ? AND created_at >= DATE('now', ?) GROUP BY type
+    """, guild_id))
+    assert dict(zip(result['type'], result['count'].tolist())) == expected
+
+
+def test_daily_counts(guild_id):
+    events = analytics.load_events(guild_id, DAYS)
+    result = analytics.daily_counts(events, 'warning', window=7)
+    expected = dict(_sql("""
+        SELECT day, count FROM daily_guild_stats
+        WHERE guild_id = ? AND kind = 'warning' AND day >= DATE('now', ?) AND count > 0
+    """, guild_id))
+    days = result['date'].dt.strftime('%Y-%m-%d')
+    assert {day: count for day, count in zip(days, result['count'].tolist()) if count} == expected
+    # Moyenne glissante : dernière valeur = moyenne des 7 derniers jours
+    assert result['rolling'].iloc[-1] == pytest.approx(result['count'].iloc[-7:].mean())
@@ -0,0 +1,15 @@
+from database.python import connection, migrations, rollups
+
+
+def test_rollups_follow_automod_updates(generated_copy):
+    migrations.migrate()
+    with connection.DatabaseConnection() as conn:
+        conn.execute("""
+            UPDATE automod_logs SET created_at = datetime(created_at, '-40 days'),
+                                    trigger_type = CASE trigger_type WHEN 'spam' THEN 'links' ELSE 'spam' END
+            WHERE id IN (SELECT id FROM automod_logs ORDER BY id LIMIT 50)
+        """)
+        conn.commit()
+
+    assert rollups.check_consistency(rollup='daily') == []
+    assert rollups.check_consistency(rollup='hourly') == []
@@ -0,0 +1,44 @@
+from database.python import connection
+from database.python.repositories import search_repo
+
+GUILD = '1'
+
+
+def _insert(table: str, columns: dict, count: int):
+    names = ', '.join(columns)
+    placeholders = ', '.join('?' * len(columns))
+    with connection.DatabaseConnection() as conn:
+        conn.executemany(f"INSERT INTO {table} ({names}) VALUES ({placeholders})",
+                         [tuple(columns.values())] * count)
+        conn.commit()
+
+
+def test_window_per_kind_when_one_table_ids_dominate(empty_db, monkeypatch):
+    monkeypatch.setattr(search_repo, 'RANK_WINDOW', 20)
+    _insert('guilds', {'id': GUILD, 'name': 'test'}, 1)
+    # Ids automod bien au-delà de ceux des warnings : rowid (id * 8 + kind) plus haut pour tout l'automod
+    with connection.DatabaseConnection() as conn:
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('automod_logs', 100000)")
+        conn.commit()
+    _insert('automod_logs', {'guild_id': GUILD, 'user_id': '2', 'trigger_type': 'spam',
+                             'trigger_content': 'spam spam spam'}, 100)
+    _insert('warnings', {'guild_id': GUILD, 'user_id': '3', 'moderator_id': '4',
+                         'reason': 'spam'}, 5)
+
+    results = search_repo.search(GUILD, 'spam', limit=500)
+
+    kinds = [row['kind'] for row in results]
+    assert kinds.count('warning') == 5
+    assert kinds.count('automod') == 20
+
+
+def test_kinds_filter(empty_db):
+    _insert('guilds', {'id': GUILD, 'name': 'test'}, 1)
+    _insert('automod_logs', {'guild_id': GUILD, 'user_id': '2', 'trigger_type': 'spam',
+                             'trigger_content': 'spam'}, 3)
+    _insert('warnings', {'guild_id': GUILD, 'user_id': '3', 'moderator_id': '4', 'reason': 'spam'}, 2)
+
+    results = search_repo.search(GUILD, 'spam', kinds=('warning',))
+
+    assert [row['kind'] for row in results] == ['warning', 'warning']
+    assert search_repo.search(GUILD, '  ') == []
@@ -0,0 +1,74 @@
+# Snapshots Arrow : parité avec SQLite et rafraîchissement incrémental
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from database.python import connection, snapshots
+
+
+@pytest.fixture
+def guild_id(generated_copy, tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshots, 'SNAPSHOT_DIR', tmp_path / 'snapshots')
+    with connection.DatabaseConnection(readonly=True) as conn:
+        return conn.execute("SELECT id FROM guilds ORDER BY id LIMIT 1").fetchone()[0]
+
+
+def _sql_rows(table: str, guild_id: str) -> list:
+    expressions = ', '.join(expr for _, _, expr in snapshots.SCHEMAS[table])
+    with connection.DatabaseConnection(readonly=True) as conn:
+        return [tuple(row) for row in conn.execute(
+            f"SELECT {expressions} FROM {table} WHERE guild_id = ? ORDER BY id", (guild_id,)
+        )]
+
+
+def _snapshot_rows(table: str, guild_id: str, **kwargs) -> list:
+    data = snapshots.load(guild_id, table, **kwargs).to_pylist()
+    names = [name for name, _, _ in snapshots.SCHEMAS[table]]
+    return sorted(tuple(row[name] for name in names) for row in data)
+
+
+def _insert_warnings(guild_id: str, count: int):
+    with connection.DatabaseConnection() as conn:
+        conn.executemany(
+            "INSERT INTO warnings (guild_id, user_id, moderator_id, reason) VALUES (?, '1', '2', 'test')",
+            [(guild_id,)] * count
+        )
+        conn.commit()
+
+
+@pytest.mark.parametrize('table', list(snapshots.SCHEMAS))
+def test_parity_with_sql(guild_id, table):
+    assert snapshots.refresh(guild_id, table)['action'] == 'rebuild'
+    assert _snapshot_rows(table, guild_id) == _sql_rows(table, guild_id)
+    assert snapshots.refresh(guild_id, table)['action'] == 'unchanged'
+
+
+def test_since_filter(guild_id):
+    rows = _sql_rows('warnings', guild_id)
+    since = sorted(row[-1] for row in rows)[len(rows) // 2]
+    assert _snapshot_rows('warnings', guild_id, since=since) == [row for row in rows if row[-1] >= since]
+
+
+def test_append_then_delete(guild_id):
+    first = snapshots.refresh(guild_id, 'warnings')
+
+    _insert_warnings(guild_id, 3)
+    # Lignes ajoutées lues dans SQLite (queue chaude) avant rafraîchissement
+    assert _snapshot_rows('warnings', guild_id) == _sql_rows('warnings', guild_id)
+    entry = snapshots.refresh(guild_id, 'warnings')
+    assert entry['action'] == 'append'
+    assert entry['rows'] == first['rows'] + 3
+    assert len(entry['parts']) == 2
+    assert _snapshot_rows('warnings', guild_id) == _sql_rows('warnings', guild_id)
+
+    with connection.DatabaseConnection() as conn:
+        conn.execute("DELETE FROM warnings WHERE id = (SELECT MIN(id) FROM warnings WHERE guild_id = ?)",
+                     (guild_id,))
+        conn.commit()
+    entry = snapshots.refresh(guild_id, 'warnings')
+    assert entry['action'] == 'rebuild'
+    assert entry['rows'] == first['rows'] + 2
+    assert len(entry['parts']) == 1
+    assert _snapshot_rows('warnings', guild_id) == _sql_rows('warnings', guild_id)
+    # Anciens fichiers part supprimés
+    assert len(list((snapshots.SNAPSHOT_DIR / str(guild_id) / 'warnings').iterdir())) == 1
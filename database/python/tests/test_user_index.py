@@ -0,0 +1,57 @@
+from database.python import connection, user_index
+
+GUILD = '1'
+SECOND = '2020-01-01 00:00:00'
+
+
+def _execute(*statements):
+    with connection.DatabaseConnection() as conn:
+        for sql, params in statements:
+            conn.execute(sql, params)
+        conn.commit()
+
+
+def _setup_users(*users):
+    """Users insérés avec updated_at figé sur SECOND (trigger de timestamp retiré)."""
+    _execute(("DROP TRIGGER update_users_timestamp", ()),
+             ("INSERT INTO guilds (id, name) VALUES (?, 'test')", (GUILD,)),
+             *[("INSERT INTO users (id, discord_id, guild_id, username) VALUES (?, ?, ?, ?)",
+                (user_id, discord_id, GUILD, username)) for user_id, discord_id, username in users],
+             ("UPDATE users SET updated_at = ?", (SECOND,)))
+
+
+def test_update_in_watermark_second_below_watermark_id(empty_db):
+    _setup_users((1, '100', 'alice'), (2, '200', 'bob'))
+    index = user_index.UserPrefixIndex(GUILD)
+    index.refresh(force=True)
+
+    # Renommage du user 1 (id < dernier id lu) dans la seconde du watermark
+    _execute(("UPDATE users SET username = 'zzrenamed' WHERE id = 1", ()))
+    index.refresh(force=True)
+
+    assert [r['user_id'] for r in index.lookup('zzrenamed')] == ['100']
+    assert index.lookup('alice') == []
+
+
+def test_delete_and_insert_in_same_interval(empty_db):
+    _setup_users((1, '100', 'alice'), (2, '200', 'bob'))
+    index = user_index.UserPrefixIndex(GUILD)
+    index.refresh(force=True)
+
+    _execute(("DELETE FROM users WHERE id = 2", ()),
+             ("INSERT INTO users (discord_id, guild_id, username) VALUES ('300', ?, 'carol')", (GUILD,)))
+    index.refresh(force=True)
+
+    assert index.lookup('bob') == []
+    assert [r['user_id'] for r in index.lookup('carol')] == ['300']
+    assert len(index) == 2
+
+
+def test_without_table_versions(empty_db):
+    _setup_users((1, '100', 'alice'))
+    _execute(("DROP TABLE table_versions", ()))
+    index = user_index.UserPrefixIndex(GUILD)
+    index.refresh(force=True)
+    index.refresh(force=True)
+
+    assert [r['user_id'] for r in index.lookup('ali')] == ['100']
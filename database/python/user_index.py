@@ -0,0 +1,181 @@
+# Index de préfixes en mémoire sur les users d'une guild (ID Discord, username, pseudo serveur)
+#
+# Tableaux triés + bisect : une recherche de préfixe est une recherche binaire suivie d'une
+# lecture contiguë, sous la milliseconde même pour 500k membres. L'index est construit depuis
+# la table users puis rafraîchi par delta : lignes dont datetime(updated_at) >= watermark (migration 006).
+# Le delta n'est lu que si la version (users, guild) de table_versions a changé (migration 003).
+# Une suppression ne laisse pas de ligne à relire : les discord_id absents de la table sont retirés.
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from database.python import connection
+from database.python.connection import DatabaseConnection
+
+# Délai min entre deux lectures du delta (secondes) : une saisie = au plus une requête par intervalle
+REFRESH_INTERVAL = float(os.getenv('DB_USER_INDEX_REFRESH', 2))
+
+# Au-delà de cette part de lignes modifiées, reconstruire plutôt qu'insérer une à une
+REBUILD_RATIO = 0.1
+
+
+def _keys(discord_id, username, server_username):
+    """Clés indexées d'un user (minuscules, sans doublon)."""
+    keys = {discord_id}
+    for name in (username, server_username):
+        if name:
+            keys.add(name.lower())
+    return keys
+
+
+class UserPrefixIndex:
+    """Index de préfixes d'une guild. Les entrées sont identifiées par discord_id."""
+
+    def __init__(self, guild_id: str):
+        self.guild_id = guild_id
+        self._keys = []       # clés triées
+        self._owners = []     # discord_id de chaque clé (tableau parallèle)
+        self._records = {}    # discord_id -> (username, server_username)
+        self._watermark = None
+        self._version = None  # version (users, guild) de table_versions au dernier refresh
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._records)
+
+    def _build(self, conn):
+        cursor = conn.execute("""
+            SELECT discord_id, username, server_username, datetime(updated_at) as updated
+            FROM users
+            WHERE guild_id = ?
+        """, (self.guild_id,))
+        records, entries, watermark = {}, [], ''
+        for discord_id, username, server_username, updated in cursor.fetchall():
+            records[discord_id] = (username, server_username)
+            if updated and updated > watermark:
+                watermark = updated
+        for discord_id, (username, server_username) in records.items():
+            entries.extend((key, discord_id) for key in _keys(discord_id, username, server_username))
+        entries.sort()
+        self._keys = [key for key, _ in entries]
+        self._owners = [owner for _, owner in entries]
+        self._records = records
+        self._watermark = watermark
+
+    def _remove(self, discord_id):
+        username, server_username = self._records.pop(discord_id)
+        for key in _keys(discord_id, username, server_username):
+            i = bisect_left(self._keys, key)
+            while self._owners[i] != discord_id:
+                i += 1
+            del self._keys[i]
+            del self._owners[i]
+
+    def _add(self, discord_id, username, server_username):
+        self._records[discord_id] = (username, server_username)
+        for key in _keys(discord_id, username, server_username):
+            i = bisect_right(self._keys, key)
+            self._keys.insert(i, key)
+            self._owners.insert(i, discord_id)
+
+    def refresh(self, force: bool = False):
+        """
+        Construit l'index, ou applique les users modifiés depuis le watermark.
+        force : ignore REFRESH_INTERVAL et lit le delta même si la version n'a pas bougé.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._checked_at < REFRESH_INTERVAL:
+                return
+            self._checked_at = now
+            with DatabaseConnection(readonly=True) as conn:
+                try:
+                    row = conn.execute(
+                        "SELECT version FROM table_versions WHERE table_name = 'users' AND guild_id = ?",
+                        (self.guild_id,)
+                    ).fetchone()
+                except sqlite3.OperationalError:
+                    # Base non migrée (pas de table_versions) : reconstruction complète, comme un miss du cache
+                    self._build(conn)
+                    self._version = None
+                    return
+                version = row['version'] if row else 0
+                if self._watermark is None:
+                    self._build(conn)
+                    self._version = version
+                    return
+                if version == self._version and not force:
+                    return
+                # updated_at est à la seconde et pas monotone en id : la seconde du watermark est
+                # relue en entier (réappliquer une ligne inchangée ne fait rien)
+                rows = conn.execute("""
+                    SELECT discord_id, username, server_username, datetime(updated_at) as updated
+                    FROM users
+                    WHERE guild_id = ? AND datetime(updated_at) >= ?
+                """, (self.guild_id, self._watermark)).fetchall()
+                if len(rows) > max(len(self._records) * REBUILD_RATIO, 1000):
+                    self._build(conn)
+                    self._version = version
+                    return
+                for discord_id, username, server_username, updated in rows:
+                    if self._records.get(discord_id) != (username, server_username):
+                        if discord_id in self._records:
+                            self._remove(discord_id)
+                        self._add(discord_id, username, server_username)
+                    self._watermark = max(self._watermark, updated)
+                # Suppression(s) : retrait des discord_id absents de la table (une suppression
+                # plus une insertion laisseraient COUNT(*) inchangé)
+                present = {r[0] for r in conn.execute(
+                    "SELECT discord_id FROM users WHERE guild_id = ?", (self.guild_id,)
+                ).fetchall()}
+                for discord_id in [d for d in self._records if d not in present]:
+                    self._remove(discord_id)
+                self._version = version
+
+    def lookup(self, prefix: str, limit: int = 10) -> list:
+        """
+        Users dont l'ID, le username ou le pseudo serveur commence par `prefix` (insensible à la casse).
+        Retourne [{'user_id', 'username', 'server_username'}], dans l'ordre des clés.
+        """
+        prefix = (prefix or '').strip().lower()
+        if not prefix:
+            return []
+        results, seen = [], set()
+        with self._lock:
+            i = bisect_left(self._keys, prefix)
+            while i < len(self._keys) and len(results) < limit and self._keys[i].startswith(prefix):
+                owner = self._owners[i]
+                if owner not in seen:
+                    seen.add(owner)
+                    username, server_username = self._records[owner]
+                    results.append({'user_id': owner, 'username': username, 'server_username': server_username})
+                i += 1
+        return results
+
+
+_indexes = {}
+_indexes_path = None
+_registry_lock = threading.Lock()
+
+
+def get_index(guild_id: str) -> UserPrefixIndex:
+    """Index de la guild (créé au premier appel), rafraîchi si REFRESH_INTERVAL est écoulé."""
+    global _indexes_path
+    with _registry_lock:
+        if _indexes_path != connection.DB_PATH:
+            # Base changée (tests, --db) : les index ne sont plus valables
+            _indexes.clear()
+            _indexes_path = connection.DB_PATH
+        index = _indexes.get(guild_id)
+        if index is None:
+            index = _indexes[guild_id] = UserPrefixIndex(guild_id)
+    index.refresh()
+    return index
+
+
+def lookup(guild_id: str, prefix: str, limit: int = 10) -> list:
+    """Suggestions de users pour une saisie partielle (ID, username ou pseudo serveur)."""
+    return get_index(guild_id).lookup(prefix, limit)
@@ -166,6 +166,11 @@ CREATE INDEX IF NOT EXISTS idx_warnings_guild_user ON warnings(guild_id, user_id
 CREATE INDEX IF NOT EXISTS idx_warnings_active ON warnings(active, expires_at);
 CREATE INDEX IF NOT EXISTS idx_sanctions_guild_user ON sanctions(guild_id, user_id);
 CREATE INDEX IF NOT EXISTS idx_sanctions_active ON sanctions(active, expires_at);
+CREATE INDEX IF NOT EXISTS idx_warnings_guild_created ON warnings(guild_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_sanctions_guild_created ON sanctions(guild_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_sanctions_guild_type_created ON sanctions(guild_id, type, created_at);
+CREATE INDEX IF NOT EXISTS idx_sanctions_guild_active_created ON sanctions(guild_id, active, created_at);
+CREATE INDEX IF NOT EXISTS idx_users_guild_active ON users(guild_id, is_active);
 CREATE INDEX IF NOT EXISTS idx_mod_logs_guild ON mod_logs(guild_id, created_at);
 CREATE INDEX IF NOT EXISTS idx_automod_logs_guild ON automod_logs(guild_id, created_at);
 CREATE INDEX IF NOT EXISTS idx_automod_logs_guild_user ON automod_logs(guild_id, user_id);
@@ -173,7 +178,6 @@ CREATE INDEX IF NOT EXISTS idx_automod_logs_trigger_type ON automod_logs(trigger
 CREATE INDEX IF NOT EXISTS idx_automod_logs_user ON automod_logs(user_id, trigger_type);
 CREATE INDEX IF NOT EXISTS idx_ai_logs_guild ON ai_logs(guild_id, created_at);
 CREATE INDEX IF NOT EXISTS idx_automod_guild ON automod(guild_id);
-CREATE INDEX IF NOT EXISTS idx_automod_words_guild_word ON automod_words(guild_id, word);
 
 -- Table automod_words - Mots interdits personnalisés
 CREATE TABLE IF NOT EXISTS automod_words (
@@ -186,6 +190,8 @@ CREATE TABLE IF NOT EXISTS automod_words (
   FOREIGN KEY (guild_id) REFERENCES guilds(id) ON DELETE CASCADE
 );
 
+CREATE INDEX IF NOT EXISTS idx_automod_words_guild_word ON automod_words(guild_id, word);
+
 -- Triggers pour maintenir les timestamps à jour
 CREATE TRIGGER IF NOT EXISTS update_guilds_timestamp 
 AFTER UPDATE ON guilds
@@ -0,0 +1,214 @@
+# Analytics de modération vectorisées (pandas / NumPy)
+#
+# Les événements d'une guild (warnings, sanctions, automod) sont chargés une fois en colonnes
+# (timeline_repo.get_columns) : horodatages datetime64[s], users / modérateurs / types en codes
+# de catégorie. Le chargement est mis en cache (invalidé par table_versions) ; toutes les
+# métriques sont ensuite calculées sur ces tableaux, sans requête supplémentaire.
+# Les longues fenêtres sont lues dans les snapshots Arrow (database/python/snapshots.py) quand
+# pyarrow est installé : SQLite ne sert alors que les lignes récentes.
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from database.python import snapshots
+from database.python.cache import cached
+from database.python.repositories import timeline_repo
+
+KINDS = tuple(timeline_repo.COLUMN_SOURCES)
+
+DAY = np.timedelta64(1, 'D')
+
+# Fenêtre (jours) à partir de laquelle les événements sont lus dans les snapshots Arrow
+SNAPSHOT_MIN_DAYS = 90
+
+# kind -> (table du snapshot, colonne type, colonne active) ; None : valeur constante
+SNAPSHOT_SOURCES = {
+    'warning': ('warnings', None, 'active'),
+    'sanction': ('sanctions', 'type', 'active'),
+    'automod': ('automod_logs', 'trigger_type', None),
+}
+
+
+@dataclass(frozen=True)
+class Events:
+    """Événements d'une guild sur une fenêtre de `days` jours, en colonnes (un index par événement)."""
+    guild_id: str
+    days: int
+    start: np.datetime64       # premier jour de la fenêtre (datetime64[D])
+    kind: np.ndarray           # int8, index dans KINDS
+    ts: np.ndarray             # datetime64[s], UTC
+    user: np.ndarray           # codes dans `users`
+    moderator: np.ndarray      # codes dans `moderators` (-1 : aucun)
+    type: np.ndarray           # codes dans `types` (sanction / déclencheur automod)
+    active: np.ndarray         # bool
+    users: np.ndarray
+    moderators: np.ndarray
+    types: np.ndarray
+
+    def __len__(self):
+        return len(self.ts)
+
+    def mask(self, kind: str = None) -> np.ndarray:
+        """Masque booléen des événements d'un kind (tous si None)."""
+        if kind is None:
+            return np.ones(len(self), dtype=bool)
+        return self.kind == KINDS.index(kind)
+
+
+def _snapshot_columns(guild_id: str, since: int) -> dict:
+    """Mêmes colonnes que timeline_repo.get_columns, lues dans les snapshots Arrow (ts >= since)."""
+    columns = {}
+    for kind, (table, type_col, active_col) in SNAPSHOT_SOURCES.items():
+        data = snapshots.load(guild_id, table, since=since)
+        size = data.num_rows
+        columns[kind] = {
+            'ts': data['ts'].to_numpy(),
+            'user_id': data['user_id'].to_numpy(),
+            'moderator_id': data['moderator_id'].to_numpy(),
+            'type': data[type_col].to_numpy() if type_col else np.full(size, '', dtype=object),
+            'active': data[active_col].to_numpy() if active_col else np.zeros(size, dtype=np.int64),
+        }
+    return columns
+
+
+@cached('warnings', 'sanctions', 'automod_logs')
+def load_events(guild_id: str, days: int = 30) -> Events:
+    """Charge les événements de la guild sur `days` jours (une requête par table, résultat en cache)."""
+    today = np.datetime64(datetime.now(timezone.utc).date(), 'D')
+    start = today - days * DAY
+    if days >= SNAPSHOT_MIN_DAYS and snapshots.available():
+        columns = _snapshot_columns(guild_id, int(start.astype('datetime64[s]').astype(np.int64)))
+    else:
+        columns = timeline_repo.get_columns(guild_id, days)
+    sizes = [len(columns[kind]['ts']) for kind in KINDS]
+
+    def concat(name, dtype=object):
+        return np.concatenate([np.asarray(columns[kind][name], dtype=dtype) for kind in KINDS])
+
+    user, users = pd.factorize(concat('user_id'))
+    moderator, moderators = pd.factorize(concat('moderator_id'))
+    event_type, types = pd.factorize(concat('type'))
+    return Events(
+        guild_id=guild_id,
+        days=days,
+        start=start,
+        kind=np.repeat(np.arange(len(KINDS), dtype=np.int8), sizes),
+        ts=concat('ts', np.int64).astype('datetime64[s]'),
+        user=user,
+        moderator=moderator,
+        type=event_type,
+        active=concat('active') == 1,
+        users=np.asarray(users, dtype=object),
+        moderators=np.asarray(moderators, dtype=object),
+        types=np.asarray(types, dtype=object),
+    )
+
+
+def _day_counts(events: Events, kind: str = None) -> np.ndarray:
+    """Nb d'événements par jour de la fenêtre (jours vides compris)."""
+    day = (events.ts[events.mask(kind)].astype('datetime64[D]') - events.start) // DAY
+    day = day[(day >= 0) & (day <= events.days)]
+    return np.bincount(day.astype(np.int64), minlength=events.days + 1)
+
+
+def daily_counts(events: Events, kind: str = 'warning', window: int = 7) -> pd.DataFrame:
+    """
+    Événements par jour et moyenne glissante sur `window` jours.
+    Retourne un DataFrame [date, count, rolling].
+    """
+    counts = _day_counts(events, kind)
+    cumulative = np.concatenate(([0], np.cumsum(counts)))
+    # Début de fenêtre : moyenne sur les jours disponibles
+    lengths = np.minimum(np.arange(1, len(counts) + 1), window)
+    rolling = (cumulative[1:] - cumulative[np.arange(len(counts)) + 1 - lengths]) / lengths
+    return pd.DataFrame({
+        'date': events.start + np.arange(len(counts)) * DAY,
+        'count': counts,
+        'rolling': rolling,
+    })
+
+
+def trend(events: Events, kind: str = 'warning') -> dict:
+    """
+    Tendance linéaire (moindres carrés) des événements par jour.
+    Retourne {'slope': pente en événements/jour, 'change_pct': variation sur la fenêtre en % de la moyenne}.
+    """
+    counts = _day_counts(events, kind)
+    mean = counts.mean()
+    if len(counts) < 2 or mean == 0:
+        return {'slope': 0.0, 'change_pct': 0.0}
+    slope = np.polyfit(np.arange(len(counts)), counts, 1)[0]
+    return {'slope': float(slope), 'change_pct': float(slope * (len(counts) - 1) / mean * 100)}
+
+
+def type_counts(events: Events, kind: str = 'sanction') -> pd.DataFrame:
+    """Événements par type (ex: ban / mute / kick). DataFrame [type, count] trié."""
+    event_type = events.type[events.mask(kind)]
+    counts = np.bincount(event_type[event_type >= 0], minlength=len(events.types))
+    present = np.flatnonzero(counts)
+    order = present[np.argsort(-counts[present], kind='stable')]
+    return pd.DataFrame({'type': events.types[order], 'count': counts[order]})
+
+
+def moderator_share(events: Events, kind: str = 'warning', limit: int = 10) -> pd.DataFrame:
+    """
+    Charge par modérateur : nb d'actions et part du total (0-1), les plus actifs d'abord.
+    DataFrame [moderator_id, count, share].
+    """
+    moderator = events.moderator[events.mask(kind)]
+    moderator = moderator[moderator >= 0]
+    counts = np.bincount(moderator, minlength=len(events.moderators))
+    total = counts.sum()
+    order = np.argsort(-counts, kind='stable')[:limit]
+    order = order[counts[order] > 0]
+    return pd.DataFrame({
+        'moderator_id': events.moderators[order],
+        'count': counts[order],
+        'share': counts[order] / total if total else np.zeros(len(order)),
+    })
+
+
+def _user_counts(events: Events, kind: str) -> np.ndarray:
+    """Nb d'événements par code user."""
+    return np.bincount(events.user[events.mask(kind)], minlength=len(events.users))
+
+
+def repeat_offenders(events: Events, kind: str = 'warning', min_events: int = 2, limit: int = 10) -> pd.DataFrame:
+    """Users avec au moins `min_events` événements sur la fenêtre. DataFrame [user_id, warning_count]."""
+    counts = _user_counts(events, kind)
+    order = np.argsort(-counts, kind='stable')[:limit]
+    order = order[counts[order] >= min_events]
+    return pd.DataFrame({'user_id': events.users[order], 'warning_count': counts[order]})
+
+
+def user_percentiles(events: Events, kind: str = 'warning', percentiles=(50, 90, 99)) -> dict:
+    """Percentiles du nb d'événements par user concerné ({50: ..., 90: ..., 99: ...})."""
+    counts = _user_counts(events, kind)
+    counts = counts[counts > 0]
+    if not len(counts):
+        return {p: 0.0 for p in percentiles}
+    return dict(zip(percentiles, np.percentile(counts, percentiles).tolist()))
+
+
+def recidivism(events: Events, kind: str = 'warning') -> dict:
+    """
+    Récidive sur la fenêtre : users concernés, users avec 2+ événements, taux (0-1)
+    et délai médian (heures) entre deux événements consécutifs d'un même user.
+    """
+    mask = events.mask(kind)
+    user, ts = events.user[mask], events.ts[mask].astype(np.int64)
+    counts = np.bincount(user, minlength=len(events.users))
+    users = int((counts > 0).sum())
+    repeat = int((counts >= 2).sum())
+    # Tri par (user, date) : les écarts entre voisins d'un même user sont les délais de récidive
+    order = np.lexsort((ts, user))
+    user, ts = user[order], ts[order]
+    gaps = np.diff(ts)[user[1:] == user[:-1]]
+    return {
+        'users': users,
+        'repeat_users': repeat,
+        'rate': repeat / users if users else 0.0,
+        'median_gap_hours': float(np.median(gaps) / 3600) if len(gaps) else None,
+    }
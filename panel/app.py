@@ -5,7 +5,7 @@ from pathlib import Path
 # Ajouter le dossier parent au path pour les imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from database.python.connection import get_connection
+from database.python.repositories import guild_repo
 from panel.utils.auth import check_auth, login_page
 from panel.components.sidebar import render_sidebar
 
@@ -102,33 +102,11 @@ def main():
     col1, col2, col3, col4 = st.columns(4)
     
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Nombre de serveurs
-        cursor.execute("SELECT COUNT(*) as count FROM guilds")
-        guilds_count = cursor.fetchone()['count']
-        
-        # Nombre d'utilisateurs uniques
-        cursor.execute("SELECT COUNT(DISTINCT discord_id) as count FROM users WHERE is_active = 1")
-        users_count = cursor.fetchone()['count']
-        
-        # Warnings aujourd'hui
-        cursor.execute("""
-            SELECT COUNT(*) as count FROM warnings 
-            WHERE DATE(created_at) = DATE('now')
-        """)
-        warnings_today = cursor.fetchone()['count']
-        
-        # Sanctions actives
-        cursor.execute("""
-            SELECT COUNT(*) as count FROM sanctions 
-            WHERE active = 1
-        """)
-        active_sanctions = cursor.fetchone()['count']
-        
-        cursor.close()
-        conn.close()
+        overview = guild_repo.get_overview()
+        guilds_count = overview['guilds_count']
+        users_count = overview['users_count']
+        warnings_today = overview['warnings_today']
+        active_sanctions = overview['active_sanctions']
         
         with col1:
             st.metric(
@@ -0,0 +1,47 @@
+import streamlit as st
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from database.python import user_index
+
+
+def _format_user(user: dict) -> str:
+    name = user['server_username'] or user['username'] or '?'
+    if user['username'] and user['server_username'] and user['username'] != user['server_username']:
+        name += f" ({user['username']})"
+    return f"{name} · {user['user_id']}"
+
+
+def user_autocomplete(guild_id: str, label: str, key: str, limit: int = 10):
+    """
+    Champ de saisie avec suggestions de users (ID, username ou pseudo serveur)
+
+    Les suggestions viennent de l'index de préfixes en mémoire (database/python/user_index.py) :
+    pas de requête SQL par frappe.
+
+    Returns:
+        (texte saisi, discord_id choisi) ; discord_id vaut None si aucune suggestion n'est retenue
+    """
+    text = st.text_input(label, key=key).strip()
+    if not text:
+        return '', None
+
+    suggestions = user_index.lookup(guild_id, text, limit)
+    if not suggestions:
+        st.caption("Aucun utilisateur connu")
+        return text, None
+
+    users = {user['user_id']: user for user in suggestions}
+    options = [None] + list(users)
+    choice = st.selectbox(
+        "Suggestions",
+        options=options,
+        # Saisie exacte d'un ID : sélection directe
+        index=options.index(text) if text in users else 0,
+        format_func=lambda user_id: "— Saisie libre —" if user_id is None else _format_user(users[user_id]),
+        key=f"{key}_pick",
+        label_visibility="collapsed",
+    )
+    return text, choice
@@ -1,29 +1,182 @@
+# Fabriques de figures Plotly
+#
+# Les figures sont mises en cache par (fabrique, hash des données et arguments, thème) : un rerun
+# sans changement de données ne reconstruit pas la figure. Les séries temporelles au-delà de
+# POINT_BUDGET points sont réduites par LTTB (Largest-Triangle-Three-Buckets), et au-delà de
+# WEBGL_POINTS points par figure les traces passent en WebGL (scattergl).
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 from panel.config import COLORS
 
+# Nb max de points envoyés par série temporelle (0 : pas de réduction)
+POINT_BUDGET = int(os.getenv('CHART_POINT_BUDGET', 1000))
+
+# Nb de points par figure à partir duquel les traces sont rendues en WebGL
+WEBGL_POINTS = int(os.getenv('CHART_WEBGL_POINTS', 2000))
+
+# Nb max de figures en cache (éviction LRU)
+MAX_FIGURES = int(os.getenv('CHART_CACHE_SIZE', 64))
+
+# Mise en page commune à toutes les figures
+THEME = {
+    'plot_bgcolor': 'rgba(0,0,0,0)',
+    'paper_bgcolor': 'rgba(0,0,0,0)',
+    'font_color': 'white',
+    'title_font_size': 16,
+}
+
+AXES = {
+    'xaxis': dict(showgrid=False),
+    'yaxis': dict(showgrid=True, gridcolor='rgba(255,255,255,0.1)'),
+}
+
+_figures = OrderedDict()  # clé -> figure
+_lock = threading.Lock()
+stats = {'hits': 0, 'misses': 0}
+
+
+def _digest(value, h):
+    """Ajoute au hash `h` une représentation stable de `value` (DataFrame / Series hachés par contenu)."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        h.update(repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(value.dtype.str.encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value, key=repr):
+            h.update(repr(key).encode())
+            _digest(value[key], h)
+    elif isinstance(value, (list, tuple)):
+        h.update(b'[')
+        for item in value:
+            _digest(item, h)
+        h.update(b']')
+    else:
+        h.update(repr(value).encode())
+    h.update(b'|')
+
+
+def figure_key(name: str, *args, **kwargs) -> str:
+    """Clé de cache d'une figure : fabrique, données et arguments, thème (THEME, AXES, COLORS)."""
+    h = hashlib.blake2b(name.encode(), digest_size=16)
+    _digest((args, kwargs, THEME, AXES, COLORS, POINT_BUDGET, WEBGL_POINTS), h)
+    return h.hexdigest()
+
+
+def cached_figure(func):
+    """
+    Décorateur des fabriques : figure en cache tant que données, arguments et thème sont identiques.
+    Retourne une copie, que l'appelant peut modifier (update_layout, add_trace...).
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key = figure_key(func.__qualname__, *args, **kwargs)
+        with _lock:
+            fig = _figures.get(key)
+            if fig is not None:
+                _figures.move_to_end(key)
+                stats['hits'] += 1
+        if fig is None:
+            fig = func(*args, **kwargs)
+            with _lock:
+                stats['misses'] += 1
+                _figures[key] = fig
+                while len(_figures) > MAX_FIGURES:
+                    _figures.popitem(last=False)
+        return go.Figure(fig)
+    return wrapper
+
+
+def clear_cache():
+    """Vide le cache de figures."""
+    with _lock:
+        _figures.clear()
+
+
+def _numeric(values) -> np.ndarray:
+    """Axe x en float64 (dates en ns) ; None si l'axe n'est ni numérique ni temporel."""
+    values = np.asarray(values)
+    if values.dtype.kind in 'iufb':
+        return values.astype(np.float64)
+    try:
+        values = pd.to_datetime(values).to_numpy()
+    except (TypeError, ValueError):
+        return None
+    return values.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+
+
+def lttb(x, y, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets : indices des `threshold` points qui gardent la forme de la série
+    (premier et dernier points conservés, un point par bucket : celui qui forme le plus grand
+    triangle avec le point retenu précédent et la moyenne du bucket suivant).
+    x doit être trié. Retourne tous les indices si la série tient dans le budget.
+    """
+    size = len(y)
+    if threshold >= size or threshold < 3:
+        return np.arange(size)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+
+    # Bornes des threshold - 2 buckets intérieurs ; la dernière vaut size - 1
+    edges = (np.arange(threshold - 1) * ((size - 2) / (threshold - 2))).astype(np.int64) + 1
+    edges[-1] = size - 1
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, size - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else size
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        indices[i + 1] = a
+    return indices
+
+
+def downsample(data: pd.DataFrame, x: str, y: str, budget: int = None) -> pd.DataFrame:
+    """Réduit `data` à `budget` lignes (POINT_BUDGET par défaut) par LTTB sur (x, y), si x est numérique ou temporel."""
+    budget = POINT_BUDGET if budget is None else budget
+    if not budget or len(data) <= budget:
+        return data
+    x_values = _numeric(data[x])
+    if x_values is None:
+        return data
+    return data.iloc[lttb(x_values, data[y].to_numpy(), budget)]
+
+
+def _webgl(points: int) -> bool:
+    """Traces WebGL au-delà de WEBGL_POINTS points dans la figure."""
+    return points > WEBGL_POINTS
+
+@cached_figure
 def create_line_chart(data: pd.DataFrame, x: str, y: str, title: str, color: str = None):
     """
     Crée un graphique en ligne
     """
+    data = downsample(data, x, y)
     fig = px.line(
         data, x=x, y=y,
         title=title,
-        color_discrete_sequence=[color or COLORS['primary']]
+        color_discrete_sequence=[color or COLORS['primary']],
+        render_mode='webgl' if _webgl(len(data)) else 'svg'
     )
     
-    fig.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font_color='white',
-        title_font_size=16,
-        xaxis=dict(showgrid=False),
-        yaxis=dict(showgrid=True, gridcolor='rgba(255,255,255,0.1)')
-    )
+    fig.update_layout(**THEME, **AXES)
     
     return fig
 
+@cached_figure
 def create_bar_chart(data: pd.DataFrame, x: str, y: str, title: str, 
                      color: str = None, horizontal: bool = False):
     """
@@ -36,17 +189,11 @@ def create_bar_chart(data: pd.DataFrame, x: str, y: str, title: str,
         fig = px.bar(data, x=x, y=y, title=title,
                     color_discrete_sequence=[color or COLORS['primary']])
     
-    fig.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font_color='white',
-        title_font_size=16,
-        xaxis=dict(showgrid=False),
-        yaxis=dict(showgrid=True, gridcolor='rgba(255,255,255,0.1)')
-    )
+    fig.update_layout(**THEME, **AXES)
     
     return fig
 
+@cached_figure
 def create_pie_chart(data: pd.DataFrame, values: str, names: str, title: str,
                     colors: list = None):
     """
@@ -58,17 +205,13 @@ def create_pie_chart(data: pd.DataFrame, values: str, names: str, title: str,
         color_discrete_sequence=colors or px.colors.sequential.RdYlGn_r
     )
     
-    fig.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font_color='white',
-        title_font_size=16
-    )
+    fig.update_layout(**THEME)
     
     fig.update_traces(textposition='inside', textinfo='percent+label')
     
     return fig
 
+@cached_figure
 def create_gauge_chart(value: float, max_value: float, title: str, 
                       thresholds: list = None):
     """
@@ -97,13 +240,14 @@ def create_gauge_chart(value: float, max_value: float, title: str,
     ))
     
     fig.update_layout(
-        paper_bgcolor='rgba(0,0,0,0)',
-        font_color='white',
+        paper_bgcolor=THEME['paper_bgcolor'],
+        font_color=THEME['font_color'],
         height=250
     )
     
     return fig
 
+@cached_figure
 def create_heatmap(data: pd.DataFrame, x: str, y: str, z: str, title: str):
     """
     Crée une heatmap
@@ -117,40 +261,42 @@ def create_heatmap(data: pd.DataFrame, x: str, y: str, z: str, title: str):
         aspect='auto'
     )
     
-    fig.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font_color='white',
-        title_font_size=16
-    )
+    fig.update_layout(**THEME)
     
     return fig
 
+@cached_figure
 def create_area_chart(data: pd.DataFrame, x: str, y: str, title: str,
-                     fill: bool = True, color: str = None):
+                     fill: bool = True, color: str = None, lines: dict = None):
     """
     Crée un graphique en aire
+    
+    Args:
+        lines: courbes superposées {colonne: (libellé, couleur)}, ex: une moyenne glissante
     """
-    fig = px.area(
+    # Mêmes lignes gardées pour l'aire et les courbes superposées
+    data = downsample(data, x, y)
+    webgl = _webgl(len(data) * (1 + len(lines or {})))
+    fig = px.line(
         data, x=x, y=y,
         title=title,
-        color_discrete_sequence=[color or COLORS['primary']]
-    )
-    
-    fig.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font_color='white',
-        title_font_size=16,
-        xaxis=dict(showgrid=False),
-        yaxis=dict(showgrid=True, gridcolor='rgba(255,255,255,0.1)')
+        color_discrete_sequence=[color or COLORS['primary']],
+        render_mode='webgl' if webgl else 'svg'
     )
     
     if fill:
         fig.update_traces(fill='tozeroy', fillcolor=f'rgba(88, 101, 242, 0.3)')
     
+    for column, (name, line_color) in (lines or {}).items():
+        trace = go.Scattergl if webgl else go.Scatter
+        fig.add_trace(trace(x=data[x], y=data[column], mode='lines', name=name,
+                            line=dict(color=line_color)))
+    
+    fig.update_layout(**THEME, **AXES)
+    
     return fig
 
+@cached_figure
 def create_multi_line_chart(data: pd.DataFrame, x: str, y_columns: list, 
                            title: str, colors: list = None):
     """
@@ -162,10 +308,14 @@ def create_multi_line_chart(data: pd.DataFrame, x: str, y_columns: list,
                      COLORS['warning'], COLORS['danger']]
     colors = colors or default_colors
     
-    for i, col in enumerate(y_columns):
-        fig.add_trace(go.Scatter(
-            x=data[x],
-            y=data[col],
+    # Réduction par série : chaque courbe garde ses propres points remarquables
+    series = [downsample(data, x, col) for col in y_columns]
+    trace = go.Scattergl if _webgl(sum(len(d) for d in series)) else go.Scatter
+    
+    for i, (col, points) in enumerate(zip(y_columns, series)):
+        fig.add_trace(trace(
+            x=points[x],
+            y=points[col],
             mode='lines+markers',
             name=col,
             line=dict(color=colors[i % len(colors)])
@@ -173,12 +323,8 @@ def create_multi_line_chart(data: pd.DataFrame, x: str, y_columns: list,
     
     fig.update_layout(
         title=title,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font_color='white',
-        title_font_size=16,
-        xaxis=dict(showgrid=False),
-        yaxis=dict(showgrid=True, gridcolor='rgba(255,255,255,0.1)'),
+        **THEME,
+        **AXES,
         legend=dict(
             bgcolor='rgba(0,0,0,0)',
             bordercolor='rgba(255,255,255,0.1)'
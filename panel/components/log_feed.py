@@ -0,0 +1,92 @@
+import streamlit as st
+from html import escape
+
+from panel.components.tables import format_timestamp
+
+# Icônes par type
+TYPE_ICONS = {
+    'warning': '⚠️',
+    'mute': '🔇',
+    'unmute': '🔊',
+    'kick': '👢',
+    'ban': '🔨',
+    'unban': '🔓'
+}
+
+# Icônes des actions AutoMod / mod_logs
+KIND_ICONS = {
+    'automod': '🤖',
+    'mod_log': '📋'
+}
+
+# Styles partagés par toutes les entrées : une classe par type pour la couleur de bordure,
+# au lieu d'un style inline répété dans chaque carte
+FEED_CSS = """<style>
+.log-feed{overflow-y:auto;padding-right:4px}
+.log-feed .le{background:#2C2F33;padding:.5rem .75rem;border-radius:8px;border-left:4px solid #FFF;margin-bottom:.4rem}
+.log-feed .le header{display:flex;justify-content:space-between}
+.log-feed .le time{color:#72767D;font-size:.9em}
+.log-feed .le .m{color:#B9BBBE;font-size:.9em}
+.log-feed .le p{margin:.25rem 0 0}
+.log-feed .t-warning{border-left-color:#FEE75C}
+.log-feed .t-mute{border-left-color:#5865F2}
+.log-feed .t-unmute,.log-feed .t-unban{border-left-color:#57F287}
+.log-feed .t-kick{border-left-color:#FEA500}
+.log-feed .t-ban{border-left-color:#ED4245}
+</style>"""
+
+
+def _entry_html(log: dict) -> str:
+    """Markup compact d'une entrée de la timeline (classes de FEED_CSS)."""
+    kind = log['type'] or log['kind']
+    icon = TYPE_ICONS.get(log['type']) or KIND_ICONS.get(log['kind'], '📋')
+    meta = f"<b>User:</b> {escape(str(log['user_id']))} | <b>Mod:</b> {escape(str(log['moderator_id']))}"
+    if log.get('duration'):
+        meta += f" | <b>Durée:</b> {escape(str(log['duration']))}"
+    return (
+        f'<div class="le t-{escape(str(kind))}">'
+        f'<header><span>{icon} <b>{escape(str(kind).upper())}</b></span>'
+        f'<time>{escape(format_timestamp(log["created_at"]))}</time></header>'
+        f'<div class="m">{meta}</div>'
+        f'<p>{escape(log["reason"] or "Aucune raison")}</p></div>'
+    )
+
+
+def log_feed(logs: list, key: str, page_size: int = 100, height: int = 600):
+    """
+    Flux d'entrées de la timeline rendu en un seul bloc HTML
+
+    Une page d'entrées = un seul élément Streamlit (styles communs + markup compact par entrée),
+    au lieu d'un st.markdown par entrée. Au-delà de `page_size` entrées, un sélecteur de page
+    limite le bloc envoyé au navigateur ; le bloc défile dans une hauteur fixe (`height` px).
+
+    Args:
+        logs: entrées de timeline_repo (get_page / get_since)
+        key: clé unique dans la page
+    """
+    if not logs:
+        return
+
+    pages = (len(logs) - 1) // page_size + 1
+    page = 1
+    if pages > 1:
+        # Nouvelles entrées chargées (ex: "Charger plus") : on affiche la première page qui les contient
+        previous = st.session_state.get(f"{key}_count", len(logs))
+        if len(logs) > previous:
+            st.session_state[f"{key}_page"] = previous // page_size + 1
+        elif st.session_state.get(f"{key}_page", 1) > pages:
+            st.session_state[f"{key}_page"] = 1
+        page = st.selectbox(
+            "Page", range(1, pages + 1), key=f"{key}_page",
+            format_func=lambda p: f"Page {p}/{pages} · entrées {(p - 1) * page_size + 1}-{min(p * page_size, len(logs))}"
+        )
+    st.session_state[f"{key}_count"] = len(logs)
+
+    entries = logs[(page - 1) * page_size:page * page_size]
+    st.markdown(
+        FEED_CSS
+        + f'<div class="log-feed" style="max-height:{height}px">'
+        + ''.join(_entry_html(log) for log in entries)
+        + '</div>',
+        unsafe_allow_html=True
+    )
@@ -0,0 +1,70 @@
+import streamlit as st
+import sys
+import threading
+from functools import wraps
+from pathlib import Path
+
+from streamlit.errors import StreamlitAPIException
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from database.python.instrumentation import timed_page
+from panel.utils.helpers import fragment
+
+# Sections en cours d'exécution dans le thread du script
+_running = threading.local()
+
+
+def lazy_tabs(labels: list, key: str) -> str:
+    """
+    Onglets à rendu paresseux
+
+    Contrairement à st.tabs, qui exécute le corps de chaque onglet à chaque rerun, seul
+    l'onglet retourné est rendu par la page : les requêtes des autres vues ne tournent pas.
+
+    Returns:
+        Libellé de l'onglet actif
+    """
+    return st.radio("Vue", labels, key=key, horizontal=True, label_visibility="collapsed")
+
+
+def section(name: str):
+    """
+    Décorateur de section de page (ex: un onglet)
+
+    La section est un fragment Streamlit : un widget de la section ne relance qu'elle,
+    pas le script de la page. Son temps de rendu est enregistré sous `name`
+    (page ⏱️ Performance), reruns de fragment compris.
+    Les données viennent des fonctions repository en cache (@cached) : revenir sur un onglet
+    ne relance pas ses requêtes tant que les tables lues n'ont pas changé.
+
+    Ex:
+        @section("Modération · Warnings")
+        def warnings_section(guild_id): ...
+    """
+    def decorator(func):
+        timed = timed_page(name)(func)
+
+        @wraps(func)
+        def run(*args, **kwargs):
+            _running.depth = getattr(_running, 'depth', 0) + 1
+            try:
+                return timed(*args, **kwargs)
+            finally:
+                _running.depth -= 1
+
+        return fragment()(run)
+    return decorator
+
+
+def rerun():
+    """
+    st.rerun limité à la section en cours (scope="fragment", Streamlit >= 1.37),
+    rerun complet hors section ou si le rerun partiel est refusé.
+    """
+    if getattr(_running, 'depth', 0):
+        try:
+            st.rerun(scope="fragment")
+        except (StreamlitAPIException, TypeError):
+            pass
+    st.rerun()
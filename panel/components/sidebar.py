@@ -31,6 +31,16 @@ def render_sidebar():
             </div>
             """, unsafe_allow_html=True)
         
+        # Migrations SQL en attente : appliquées au déploiement, jamais depuis le panel
+        try:
+            from database.python.migrations import pending_migrations
+            pending = pending_migrations()
+            if pending:
+                st.warning(f"Migrations en attente : {', '.join(pending)}. "
+                           "Lancer `python -m database.python.migrations`.")
+        except Exception as e:
+            st.warning(f"Migrations non vérifiées : {e}")
+        
         # Sélecteur de serveur
         guilds = get_guild_list()
         if guilds:
@@ -69,7 +79,9 @@ def render_sidebar():
         col1, col2 = st.columns(2)
         with col1:
             if st.button("🔄 Refresh", use_container_width=True):
-                st.cache_data.clear()
+                # Le cache s'invalide seul quand les tables changent ; on force ici pour le serveur courant
+                from database.python.cache import query_cache
+                query_cache.invalidate(st.session_state.get('selected_guild_id'))
                 st.rerun()
         with col2:
             if st.button("🚪 Logout", use_container_width=True):
@@ -86,7 +98,7 @@ def render_sidebar():
         # Status BDD
         try:
             from database.python.connection import get_connection
-            conn = get_connection()
+            conn = get_connection(readonly=True)
             conn.close()
             st.success("� BDD connectée", icon="✅")
         except:
@@ -95,22 +107,16 @@ def render_sidebar():
 def get_guild_list():
     """Récupère la liste des serveurs depuis la BDD"""
     try:
-        from database.python.connection import get_connection
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id, name FROM guilds ORDER BY name")
-        guilds_raw = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
+        from database.python.repositories import guild_repo
+        # En cache tant que la table guilds n'est pas modifiée
+        guilds_raw = guild_repo.get_all()
         
         if guilds_raw:
             guilds = []
             for row in guilds_raw:
                 guilds.append({
-                    'id': row[0],
-                    'name': row[1]
+                    'id': row['id'],
+                    'name': row['name']
                 })
             return guilds
         else:
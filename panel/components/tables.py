@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 
+from panel.components.sections import rerun
+
 def format_user_id(user_id):
     """Formate un ID utilisateur avec lien copier"""
     return f"`{user_id}`"
@@ -95,9 +97,13 @@ def paginated_table(df: pd.DataFrame, page_size: int = 20, key: str = "table"):
     
     st.caption(f"Affichage {start_idx + 1}-{end_idx} sur {total_rows}")
 
-def selectable_table(df: pd.DataFrame, key: str = "select"):
+def selectable_table(df: pd.DataFrame, key: str = "select", selected: bool = False, column_config: dict = None):
     """
-    Tableau avec sélection multiple
+    Tableau avec sélection multiple (seule la colonne de cases est éditable)
+
+    Args:
+        selected: état initial des cases
+        column_config: config st.column_config par colonne (None masque la colonne)
     """
     if df.empty:
         st.info("Aucune donnée")
@@ -105,19 +111,21 @@ def selectable_table(df: pd.DataFrame, key: str = "select"):
     
     # Ajouter une colonne de sélection
     df_with_select = df.copy()
-    df_with_select.insert(0, '', False)
+    df_with_select.insert(0, '', selected)
     
     edited_df = st.data_editor(
         df_with_select,
         hide_index=True,
         use_container_width=True,
         key=key,
+        disabled=list(df.columns),
         column_config={
             '': st.column_config.CheckboxColumn(
                 '',
                 help='Sélectionner',
                 default=False
-            )
+            ),
+            **(column_config or {})
         }
     )
     
@@ -173,3 +181,155 @@ def sanction_table(sanctions: list):
         'active': {'label': 'Status', 'format': 'status'},
         'created_at': {'label': 'Date', 'format': 'timestamp'}
     })
+
+def _reset_if_changed(key: str, filters):
+    """Réinitialise l'état de pagination quand les filtres changent."""
+    if st.session_state.get(f"{key}_filters") != filters:
+        st.session_state[f"{key}_filters"] = filters
+        for suffix in ('_cursors', '_items', '_next'):
+            st.session_state.pop(f"{key}{suffix}", None)
+
+def cursor_pager(fetch_page, key: str = "pager", filters=None):
+    """
+    Pagination par curseur (Précédent / Suivant)
+
+    Args:
+        fetch_page: fonction cursor -> Page (ex: lambda c: warning_repo.get_page(guild_id, c, 25))
+        key: clé unique dans la page
+        filters: valeur des filtres courants ; un changement ramène à la première page
+
+    Returns:
+        La Page courante (items, next_cursor)
+    """
+    _reset_if_changed(key, filters)
+    # Pile des curseurs : le dernier est celui de la page affichée
+    cursors = st.session_state.setdefault(f"{key}_cursors", [None])
+    page = fetch_page(cursors[-1])
+
+    col1, col2, col3 = st.columns([1, 3, 1])
+    with col1:
+        if st.button("◀ Précédent", key=f"{key}_prev", disabled=len(cursors) == 1):
+            cursors.pop()
+            rerun()
+    with col2:
+        st.caption(f"Page {len(cursors)} · {len(page.items)} ligne(s)")
+    with col3:
+        if st.button("Suivant ▶", key=f"{key}_next_btn", disabled=not page.has_more):
+            cursors.append(page.next_cursor)
+            rerun()
+
+    return page
+
+def load_more(fetch_page, render, key: str = "more", filters=None, label: str = "Charger plus"):
+    """
+    Liste cumulative avec bouton "Charger plus" sous les lignes
+
+    Args:
+        fetch_page: fonction cursor -> Page
+        render: fonction items -> None qui affiche les lignes chargées
+        key: clé unique dans la page
+        filters: valeur des filtres courants ; un changement recharge depuis le début
+
+    Seule la page suivante est lue à chaque clic ; les lignes déjà chargées
+    restent en session.
+
+    Returns:
+        Liste des lignes chargées
+    """
+    _reset_if_changed(key, filters)
+    if f"{key}_items" not in st.session_state:
+        page = fetch_page(None)
+        st.session_state[f"{key}_items"] = list(page.items)
+        st.session_state[f"{key}_next"] = page.next_cursor
+
+    items = st.session_state[f"{key}_items"]
+    next_cursor = st.session_state[f"{key}_next"]
+
+    render(items)
+
+    if next_cursor is not None and st.button(f"⬇️ {label}", key=f"{key}_btn"):
+        page = fetch_page(next_cursor)
+        items.extend(page.items)
+        st.session_state[f"{key}_next"] = page.next_cursor
+        rerun()
+
+    return items
+
+def clear_selection(key: str):
+    """Vide la sélection d'une data_grid (ex: après une action en masse)."""
+    st.session_state[f"{key}_generation"] = st.session_state.get(f"{key}_generation", 0) + 1
+    st.session_state[f"{key}_checked"] = False
+
+def data_grid(fetch_page, columns: dict, key: str, filters=None, sorts: dict = None,
+              page_sizes=(25, 50, 100), id_column: str = 'id'):
+    """
+    Grille paginée et triée côté serveur, avec sélection multiple
+
+    Un seul widget (st.data_editor, rendu virtualisé) pour toute la page : le coût de rendu
+    ne dépend pas du nombre de lignes, contrairement à une case à cocher par ligne.
+
+    Args:
+        fetch_page: fonction (cursor, limit, **tri) -> Page
+        columns: colonnes affichées, dans l'ordre, config au format de styled_dataframe
+            ({'reason': {'label': 'Raison'}, 'created_at': {'label': 'Date', 'format': 'timestamp'}})
+        key: clé unique dans la page
+        filters: filtres courants ; un changement ramène à la première page et vide la sélection
+        sorts: {libellé: kwargs de tri pour fetch_page}, le premier par défaut
+        id_column: colonne dont les valeurs sont retournées pour les lignes cochées
+
+    Returns:
+        (Page courante, IDs cochés)
+    """
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    with col1:
+        sort_label = st.selectbox("📊 Trier par", list(sorts), key=f"{key}_sort") if sorts else None
+    with col2:
+        limit = st.selectbox("📄 Par page", list(page_sizes), key=f"{key}_limit")
+    sort = sorts[sort_label] if sorts else {}
+    
+    page = cursor_pager(
+        lambda cursor: fetch_page(cursor, limit, **sort),
+        key=f"{key}_pager",
+        filters=(filters, sort_label, limit)
+    )
+    
+    # Nouvelle vue (filtres, tri, page) : nouvel éditeur, sélection vide
+    view = (filters, sort_label, limit, st.session_state[f"{key}_pager_cursors"][-1])
+    if st.session_state.get(f"{key}_view") != view:
+        st.session_state[f"{key}_view"] = view
+        clear_selection(key)
+    
+    with col3:
+        st.write("")
+        if st.button("☑️ Tout", key=f"{key}_all", disabled=not page.items, help="Cocher toute la page"):
+            clear_selection(key)
+            st.session_state[f"{key}_checked"] = True
+            rerun()
+    with col4:
+        st.write("")
+        if st.button("✖️ Aucun", key=f"{key}_none", disabled=not page.items, help="Tout décocher"):
+            clear_selection(key)
+            rerun()
+    
+    if not page.items:
+        return page, []
+    
+    df = pd.DataFrame(page.items)
+    shown = [col for col in columns if col in df.columns]
+    display_df = df[list(dict.fromkeys([id_column, *shown]))].copy()
+    # Pas de format 'user_id' : le Markdown n'est pas rendu dans la grille
+    formatters = {'timestamp': format_timestamp, 'duration': format_duration, 'status': format_status}
+    column_config = {} if id_column in columns else {id_column: None}
+    for col in shown:
+        config = columns[col] or {}
+        if config.get('format') in formatters:
+            display_df[col] = display_df[col].apply(formatters[config['format']])
+        column_config[col] = st.column_config.Column(config.get('label', col))
+    
+    selected = selectable_table(
+        display_df,
+        key=f"{key}_editor_{st.session_state[f'{key}_generation']}",
+        selected=st.session_state[f"{key}_checked"],
+        column_config=column_config
+    )
+    return page, [row[id_column] for row in selected]
@@ -1,21 +1,70 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from database.python.connection import get_connection
+from database.python.repositories import guild_repo
+from database.python.repositories.bundle import fetch_bundle
+from database.python.instrumentation import timed_page
+from panel import analytics
 from panel.utils.auth import require_auth
+from panel.components import charts
+from panel.components.sections import section
 from panel.components.sidebar import render_sidebar, get_selected_guild_id
 from panel.config import COLORS
 
 st.set_page_config(page_title="Dashboard", page_icon="📊", layout="wide")
 
+WEEKDAYS = ["Lun", "Mar", "Mer", "Jeu", "Ven", "Sam", "Dim"]
+
+HEATMAP_KINDS = {
+    "Tous": guild_repo.HEATMAP_KINDS,
+    "AutoMod": ('automod',),
+    "Warnings": ('warning',),
+    "Sanctions": ('sanction',),
+}
+
+@section("Dashboard · Heures d'activité")
+def heatmap_section(guild_id, days):
+    """Heatmap jour de semaine × heure, lue dans le cube horaire (hourly_guild_stats)."""
+    filters = guild_repo.get_automod_filters(guild_id)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        kinds = st.selectbox("Événements", list(HEATMAP_KINDS), key="heatmap_kinds")
+    with col2:
+        trigger_type = st.selectbox("🤖 Déclencheur", ["Tous"] + filters['trigger_types'], key="heatmap_trigger")
+    with col3:
+        channel = st.selectbox("💬 Salon", ["Tous"] + filters['channels'], key="heatmap_channel")
+    
+    rows = guild_repo.get_hour_of_week(
+        guild_id, days, kinds=HEATMAP_KINDS[kinds],
+        trigger_type=None if trigger_type == "Tous" else trigger_type,
+        channel_id=None if channel == "Tous" else channel
+    )
+    if not rows:
+        st.info("Aucun événement pour ces filtres")
+        return
+    
+    # Grille 7 × 24 complète (cases vides à 0), lundi en haut
+    counts = {(row['weekday'], row['hour']): row['count'] for row in rows}
+    grid = pd.DataFrame([
+        {'weekday': WEEKDAYS[day], 'hour': hour, 'count': counts.get((day, hour), 0)}
+        for day in range(7) for hour in range(24)
+    ])
+    grid['weekday'] = pd.Categorical(grid['weekday'], categories=WEEKDAYS, ordered=True)
+    
+    fig = charts.create_heatmap(grid, 'hour', 'weekday', 'count', "Événements par jour et heure (UTC)")
+    fig.update_layout(transition_duration=0)
+    st.plotly_chart(fig, use_container_width=True)
+    if trigger_type != "Tous" or channel != "Tous":
+        st.caption("Filtres déclencheur / salon : actions AutoMod uniquement")
+
 @require_auth
+@timed_page("Dashboard")
 def main():
     render_sidebar()
     
@@ -40,61 +89,58 @@ def main():
     days = period_days[period]
     
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        # Toutes les requêtes de la page partent en parallèle ; les graphiques et indicateurs
+        # sont calculés sur les événements chargés une fois en colonnes (panel/analytics.py)
+        data = fetch_bundle({
+            'snapshot': (guild_repo.get_snapshot, guild_id, days),
+            'events': (analytics.load_events, guild_id, days),
+            'recent_activity': (guild_repo.get_recent_activity, guild_id),
+        })
+        snapshot = data['snapshot']
+        events = data['events']
         
         # Métriques principales
         st.markdown("### 📈 Métriques principales")
         
-        # Warnings totaux
-        cursor.execute("""
-            SELECT COUNT(*) as total_warnings,
-                   COUNT(CASE WHEN created_at >= DATE('now', '-{} days') THEN 1 END) as recent_warnings
-            FROM warnings WHERE guild_id = ?
-        """.format(days), (guild_id,))
-        warning_stats = cursor.fetchone()
-        
-        # Sanctions totales
-        cursor.execute("""
-            SELECT COUNT(*) as total_sanctions,
-                   COUNT(CASE WHEN created_at >= DATE('now', '-{} days') THEN 1 END) as recent_sanctions,
-                   COUNT(CASE WHEN active = 1 THEN 1 END) as active_sanctions
-            FROM sanctions WHERE guild_id = ?
-        """.format(days), (guild_id,))
-        sanction_stats = cursor.fetchone()
-        
-        # Utilisateurs uniques
-        cursor.execute("""
-            SELECT COUNT(DISTINCT user_id) as total_users
-            FROM users WHERE guild_id = ? AND is_active = 1
-        """, (guild_id,))
-        user_stats = cursor.fetchone()
-        
-        # Actions AutoMod
-        cursor.execute("""
-            SELECT COUNT(*) as total_automod,
-                   COUNT(CASE WHEN created_at >= DATE('now', '-{} days') THEN 1 END) as recent_automod
-            FROM automod_logs WHERE guild_id = ?
-        """.format(days), (guild_id,))
-        automod_stats = cursor.fetchone()
-        
         # Affichage des métriques
         col1, col2, col3, col4, col5 = st.columns(5)
         
         with col1:
-            delta = warning_stats[1] if warning_stats[1] > 0 else None
-            st.metric("⚠️ Warnings", warning_stats[0], delta=f"+{delta}" if delta else None)
+            delta = snapshot.recent_warnings if snapshot.recent_warnings > 0 else None
+            st.metric("⚠️ Warnings", snapshot.total_warnings, delta=f"+{delta}" if delta else None)
         
         with col2:
-            delta = sanction_stats[1] if sanction_stats[1] > 0 else None
-            st.metric("🔨 Sanctions", sanction_stats[0], delta=f"+{delta}" if delta else None)
+            delta = snapshot.recent_sanctions if snapshot.recent_sanctions > 0 else None
+            st.metric("🔨 Sanctions", snapshot.total_sanctions, delta=f"+{delta}" if delta else None)
         
         with col3:
-            st.metric("👥 Utilisateurs", user_stats[0])
+            st.metric("👥 Utilisateurs", snapshot.active_users)
         
         with col4:
-            st.metric("⛔ Actives", sanction_stats[2])
+            st.metric("⛔ Actives", snapshot.active_sanctions)
+        
+        with col5:
+            delta = snapshot.recent_automod if snapshot.recent_automod > 0 else None
+            st.metric("🤖 AutoMod", snapshot.total_automod, delta=f"+{delta}" if delta else None)
         
+        # Indicateurs dérivés (calculs vectorisés, sans requête)
+        daily = analytics.daily_counts(events, 'warning', window=7)
+        warning_trend = analytics.trend(events, 'warning')
+        recidivism = analytics.recidivism(events, 'warning')
+        mod_share = analytics.moderator_share(events, 'warning', limit=10)
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("📆 Warnings / jour (7j)", f"{daily['rolling'].iloc[-1]:.1f}")
+        with col2:
+            st.metric("📐 Tendance", f"{warning_trend['change_pct']:+.0f} %",
+                      help="Variation sur la période (régression linéaire des warnings par jour)")
+        with col3:
+            st.metric("🔁 Récidive", f"{recidivism['rate']:.0%}",
+                      help=f"{recidivism['repeat_users']} / {recidivism['users']} utilisateurs avertis plus d'une fois")
+        with col4:
+            top_share = mod_share['share'].iloc[0] if not mod_share.empty else 0
+            st.metric("🛡️ Part du 1er modérateur", f"{top_share:.0%}")
         
         st.divider()
         
@@ -103,19 +149,10 @@ def main():
         
         with col1:
             st.markdown("### 📊 Évolution des warnings")
-            cursor.execute("""
-                SELECT DATE(created_at) as date, COUNT(*) as count
-                FROM warnings 
-                WHERE guild_id = ? AND created_at >= DATE('now', '-{} days')
-                GROUP BY DATE(created_at)
-                ORDER BY date
-            """.format(days), (guild_id,))
-            
-            warning_trend = cursor.fetchall()
-            if warning_trend:
-                df = pd.DataFrame(warning_trend, columns=['date', 'count'])
-                fig = px.area(df, x='date', y='count', title="Warnings par jour",
-                            color_discrete_sequence=[COLORS['primary']])
+            if daily['count'].any():
+                # Figure en cache tant que la série ne change pas, réduite par LTTB sur les longues périodes
+                fig = charts.create_area_chart(daily, 'date', 'count', "Warnings par jour",
+                                               lines={'rolling': ("Moyenne 7 jours", COLORS['warning'])})
                 fig.update_layout(showlegend=False, transition_duration=0)
                 fig.update_traces(hovertemplate=None, hoverinfo='none')
                 st.plotly_chart(fig, use_container_width=True)
@@ -124,59 +161,34 @@ def main():
         
         with col2:
             st.markdown("### 🥧 Répartition des sanctions")
-            cursor.execute("""
-                SELECT type, COUNT(*) as count
-                FROM sanctions 
-                WHERE guild_id = ? AND created_at >= DATE('now', '-{} days')
-                GROUP BY type
-            """.format(days), (guild_id,))
-            
-            sanction_types = cursor.fetchall()
-            if sanction_types:
-                df = pd.DataFrame(sanction_types, columns=['type', 'count'])
-                fig = px.pie(df, values='count', names='type', title="Types de sanctions")
+            sanction_types = analytics.type_counts(events, 'sanction')
+            if not sanction_types.empty:
+                fig = px.pie(sanction_types, values='count', names='type', title="Types de sanctions")
                 fig.update_layout(transition_duration=0)
                 fig.update_traces(hovertemplate=None, hoverinfo='none')
                 st.plotly_chart(fig, use_container_width=True)
             else:
                 st.info("Aucune sanction pour cette période")
         
+        # Heures d'activité (fragment : les filtres ne relancent que cette section)
+        st.markdown("### 🕒 Heures d'activité")
+        heatmap_section(guild_id, days)
+        
         # Top modérateurs
         st.markdown("### 🏆 Top modérateurs")
-        cursor.execute("""
-            SELECT moderator_id, COUNT(*) as count
-            FROM warnings 
-            WHERE guild_id = ? AND created_at >= DATE('now', '-{} days')
-            GROUP BY moderator_id
-            ORDER BY count DESC
-            LIMIT 10
-        """.format(days), (guild_id,))
-        
-        top_mods = cursor.fetchall()
-        if top_mods:
-            df = pd.DataFrame(top_mods, columns=['moderator_id', 'count'])
-            fig = px.bar(df, x='count', y='moderator_id', orientation='h',
-                        title="Warnings par modérateur", color_discrete_sequence=[COLORS['warning']])
+        if not mod_share.empty:
+            fig = px.bar(mod_share, x='count', y='moderator_id', orientation='h',
+                        text=mod_share['share'].map('{:.0%}'.format),
+                        title="Warnings par modérateur (part du total)", color_discrete_sequence=[COLORS['warning']])
             fig.update_layout(showlegend=False, transition_duration=0)
             fig.update_traces(hovertemplate=None, hoverinfo='none')
             st.plotly_chart(fig, use_container_width=True)
         
         # Utilisateurs à surveiller
         st.markdown("### ⚠️ Utilisateurs à surveiller")
-        cursor.execute("""
-            SELECT user_id, COUNT(*) as warning_count
-            FROM warnings 
-            WHERE guild_id = ? AND created_at >= DATE('now', '-{} days')
-            GROUP BY user_id
-            HAVING warning_count >= 2
-            ORDER BY warning_count DESC
-            LIMIT 10
-        """.format(days), (guild_id,))
-        
-        watch_list = cursor.fetchall()
-        if watch_list:
-            df = pd.DataFrame(watch_list, columns=['user_id', 'warning_count'])
-            fig = px.bar(df, x='warning_count', y='user_id', orientation='h',
+        watch_list = analytics.repeat_offenders(events, 'warning', min_events=2)
+        if not watch_list.empty:
+            fig = px.bar(watch_list, x='warning_count', y='user_id', orientation='h',
                         title="Utilisateurs avec 2+ warnings", color_discrete_sequence=[COLORS['danger']])
             fig.update_layout(showlegend=False, transition_duration=0)
             fig.update_traces(hovertemplate=None, hoverinfo='none')
@@ -186,26 +198,11 @@ def main():
         
         # Activité récente
         st.markdown("### 📋 Activité récente")
-        cursor.execute("""
-            SELECT 'warning' as type, user_id, moderator_id, reason, created_at
-            FROM warnings 
-            WHERE guild_id = ? 
-            UNION ALL
-            SELECT type, user_id, moderator_id, reason, created_at
-            FROM sanctions 
-            WHERE guild_id = ?
-            ORDER BY created_at DESC
-            LIMIT 10
-        """, (guild_id, guild_id))
-        
-        recent_activity = cursor.fetchall()
+        recent_activity = data['recent_activity']
         if recent_activity:
-            df = pd.DataFrame(recent_activity, columns=['type', 'user_id', 'moderator_id', 'reason', 'created_at'])
+            df = pd.DataFrame(recent_activity)
             st.dataframe(df, use_container_width=True, hide_index=True)
         
-        cursor.close()
-        conn.close()
-        
     except Exception as e:
         st.error(f"Erreur de connexion à la base de données: {e}")
         import traceback
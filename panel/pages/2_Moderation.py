@@ -6,9 +6,13 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from database.python.connection import get_connection
+from database.python.repositories import sanction_repo, search_repo, warning_repo
+from database.python.instrumentation import timed_page
 from panel.utils.auth import require_auth
 from panel.components.sidebar import render_sidebar, get_selected_guild_id
+from panel.components.autocomplete import user_autocomplete
+from panel.components.sections import lazy_tabs, rerun, section
+from panel.components.tables import clear_selection, cursor_pager, data_grid
 
 st.set_page_config(page_title="Modération", page_icon="⚔️", layout="wide")
 
@@ -26,339 +30,311 @@ def format_date(date_str):
     except:
         return str(date_str)
 
-@require_auth
-def main():
-    render_sidebar()
-    
-    st.title("⚔️ Modération")
-    
-    guild_id = get_selected_guild_id()
-    
-    if not guild_id:
-        st.warning("Veuillez sélectionner un serveur dans la sidebar")
-        return
-    
-    # Tabs
-    tab1, tab2, tab3 = st.tabs(["⚠️ Warnings", "🔨 Sanctions", "🔍 Recherche"])
-    
-    # ============ TAB WARNINGS ============
-    with tab1:
-        st.subheader("⚠️ Gestion des Warnings")
-        
-        # Filtres
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            search_user = st.text_input("🔍 Rechercher User ID", key="warn_search")
-        with col2:
-            sort_by = st.selectbox(
-                "📊 Trier par",
-                ["Plus récent", "Plus ancien", "User ID"],
-                key="warn_sort"
-            )
-        with col3:
-            per_page = st.selectbox("📄 Par page", [10, 25, 50, 100], key="warn_per_page")
-        
+def select_all_button(key: str, ids: list):
+    """Coche toutes les lignes affichées (les cases sont des widgets `{key}_sel_{id}`)."""
+    if st.button("☑️ Tout cocher", key=f"{key}_all"):
+        for row_id in ids:
+            st.session_state[f"{key}_sel_{row_id}"] = True
+        rerun()
+
+def action_bar(key: str, selected_ids: list, filters: dict, actions: dict, count, reassign=None):
+    """
+    Barre d'actions en masse sous une liste
+
+    Args:
+        key: préfixe des widgets (cases à cocher `{key}_sel_{id}` ou data_grid de même clé)
+        selected_ids: IDs cochés
+        filters: filtres courants de la liste (portée "tous les résultats")
+        actions: {libellé: fonction(ids=..., **filters) -> nb de lignes}
+        count: fonction(**filters) -> nb de lignes visées par les filtres (aperçu avant confirmation)
+        reassign: fonction(nouveau_moderateur, ids=..., **filters) -> nb, ou None
+
+    Une action = une transaction côté repository, puis un seul rerun.
+    Sur "tous les résultats filtrés", le nb de lignes visées est affiché et l'action doit être
+    confirmée avant d'être appliquée.
+    """
+    st.divider()
+    labels = list(actions) + (["👤 Réassigner le modérateur"] if reassign else [])
+    col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
+    with col1:
+        scope = st.radio(
+            "Portée",
+            ["Lignes cochées", "Tous les résultats filtrés"],
+            key=f"{key}_scope", horizontal=True
+        )
+    with col2:
+        label = st.selectbox("Action", labels, key=f"{key}_action")
+    new_moderator = None
+    with col3:
+        if label not in actions:
+            new_moderator = st.text_input("Nouveau modérateur (ID)", key=f"{key}_moderator")
+    all_results = scope.startswith("Tous")
+
+    # Aperçu et confirmation : la case est propre à l'action et aux filtres, un changement la décoche
+    confirmed = True
+    confirm_key = f"{key}_confirm_{abs(hash((label, tuple(sorted(filters.items())))))}"
+    if all_results:
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            # Construire la requête
-            query = "SELECT * FROM warnings WHERE guild_id = ?"
-            params = [guild_id]
-            
-            if search_user:
-                query += " AND user_id LIKE ?"
-                params.append(f"%{search_user}%")
-            
-            # Tri
-            if sort_by == "Plus récent":
-                query += " ORDER BY created_at DESC"
-            elif sort_by == "Plus ancien":
-                query += " ORDER BY created_at ASC"
-            else:
-                query += " ORDER BY user_id"
-            
-            query += f" LIMIT {per_page}"
-            
-            cursor.execute(query, params)
-            warnings_raw = cursor.fetchall()
-            
-            if warnings_raw:
-                # Convertir en liste de dict pour manipulation
-                warnings = []
-                for row in warnings_raw:
-                    warnings.append({
-                        'id': row[0],
-                        'guild_id': row[1],
-                        'user_id': row[2],
-                        'moderator_id': row[3],
-                        'reason': row[4],
-                        'created_at': row[5]
-                    })
-                
-                # Afficher comme dataframe éditable
-                df = pd.DataFrame(warnings)
-                
-                # Sélection pour suppression
-                st.markdown("**Sélectionner pour supprimer:**")
-                
-                selected_ids = []
-                for idx, row in df.iterrows():
-                    col1, col2, col3, col4, col5 = st.columns([1, 2, 2, 4, 1])
-                    
-                    with col1:
-                        if st.checkbox("", key=f"warn_{row['id']}"):
-                            selected_ids.append(row['id'])
-                    with col2:
-                        st.text(f"User: {row['user_id']}")
-                    with col3:
-                        st.text(f"Mod: {row['moderator_id']}")
-                    with col4:
-                        st.text(f"{str(row['reason'])[:50]}..." if len(str(row['reason'])) > 50 else row['reason'])
-                    with col5:
-                        st.text(format_date(row['created_at']))
-                
-                # Bouton suppression
-                if selected_ids:
-                    st.divider()
-                    col1, col2 = st.columns([3, 1])
-                    with col2:
-                        if st.button(f"🗑️ Supprimer ({len(selected_ids)})", type="primary"):
-                            placeholders = ','.join(['?'] * len(selected_ids))
-                            cursor.execute(f"DELETE FROM warnings WHERE id IN ({placeholders})", selected_ids)
-                            conn.commit()
-                            st.success(f"✅ {len(selected_ids)} warning(s) supprimé(s)")
-                            st.rerun()
-            else:
-                st.info("Aucun warning trouvé")
-            
-            cursor.close()
-            conn.close()
-            
-        except Exception as e:
-            st.error(f"Erreur: {e}")
-    
-    # ============ TAB SANCTIONS ============
-    with tab2:
-        st.subheader("🔨 Gestion des Sanctions")
-        
-        # Filtres
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            search_user_s = st.text_input("🔍 User ID", key="sanc_search")
-        with col2:
-            filter_type = st.selectbox(
-                "📋 Type",
-                ["Tous", "mute", "ban", "kick"],
-                key="sanc_type"
-            )
-        with col3:
-            filter_active = st.selectbox(
-                "📊 Status",
-                ["Tous", "Actives", "Expirées"],
-                key="sanc_active"
-            )
-        with col4:
-            per_page_s = st.selectbox("📄 Par page", [10, 25, 50], key="sanc_per_page")
-        
+            targeted = count(**filters)
+        except ValueError:
+            targeted = 0
+            st.warning("Aucun filtre actif : cochez des lignes ou filtrez la liste")
+        if targeted:
+            st.warning(f"{label} : {targeted} ligne(s) visée(s) par les filtres")
+            confirmed = st.checkbox(f"Je confirme « {label} » sur {targeted} ligne(s)", key=confirm_key)
+        else:
+            confirmed = False
+
+    with col4:
+        st.write("")
+        disabled = ((not all_results and not selected_ids) or (label not in actions and not new_moderator)
+                    or not confirmed)
+        apply = st.button(
+            "Appliquer" if all_results else f"Appliquer ({len(selected_ids)})",
+            type="primary", key=f"{key}_apply", disabled=disabled
+        )
+
+    if apply:
+        ids = None if all_results else [int(i) for i in selected_ids]
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            query = "SELECT * FROM sanctions WHERE guild_id = ?"
-            params = [guild_id]
-            
-            if search_user_s:
-                query += " AND user_id LIKE ?"
-                params.append(f"%{search_user_s}%")
-            
-            if filter_type != "Tous":
-                query += " AND type = ?"
-                params.append(filter_type)
-            
-            if filter_active == "Actives":
-                query += " AND active = 1"
-            elif filter_active == "Expirées":
-                query += " AND active = 0"
-            
-            query += f" ORDER BY created_at DESC LIMIT {per_page_s}"
-            
-            cursor.execute(query, params)
-            sanctions_raw = cursor.fetchall()
-            
-            if sanctions_raw:
-                # Convertir en liste de dict
-                sanctions = []
-                for row in sanctions_raw:
-                    sanctions.append({
-                        'id': row[0],
-                        'guild_id': row[1],
-                        'user_id': row[2],
-                        'moderator_id': row[3],
-                        'type': row[4],
-                        'reason': row[5],
-                        'active': bool(row[6]),
-                        'created_at': row[7],
-                        'expires_at': row[8] if len(row) > 8 else None,
-                        'removed_at': row[9] if len(row) > 9 else None
-                    })
-                
-                for sanction in sanctions:
-                    with st.expander(
-                        f"{'🟢' if sanction['active'] else '⚫'} "
-                        f"**{sanction['type'].upper()}** - "
-                        f"User: {sanction['user_id']} - "
-                        f"{format_date(sanction['created_at'])}"
-                    ):
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.markdown(f"**ID:** `{sanction['id']}`")
-                            st.markdown(f"**User ID:** `{sanction['user_id']}`")
-                            st.markdown(f"**Modérateur:** `{sanction['moderator_id']}`")
-                            st.markdown(f"**Type:** `{sanction['type']}`")
-                        
-                        with col2:
-                            st.markdown(f"**Active:** {'✅ Oui' if sanction['active'] else '❌ Non'}")
-                            st.markdown(f"**Créée:** {sanction['created_at']}")
-                            if sanction.get('expires_at'):
-                                st.markdown(f"**Expire:** {sanction['expires_at']}")
-                            if sanction.get('removed_at'):
-                                st.markdown(f"**Retirée:** {sanction['removed_at']}")
-                        
-                        st.markdown(f"**Raison:** {sanction['reason']}")
-                        
-                        # Actions
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            if sanction['active'] and st.button("⏹️ Désactiver", key=f"deact_{sanction['id']}"):
-                                cursor.execute(
-                                    "UPDATE sanctions SET active = 0, removed_at = CURRENT_TIMESTAMP WHERE id = ?",
-                                    (sanction['id'],)
-                                )
-                                conn.commit()
-                                st.success("Sanction désactivée")
-                                st.rerun()
-                        with col3:
-                            if st.button("🗑️ Supprimer", key=f"del_{sanction['id']}"):
-                                cursor.execute("DELETE FROM sanctions WHERE id = ?", (sanction['id'],))
-                                conn.commit()
-                                st.success("Sanction supprimée")
-                                st.rerun()
+            if label in actions:
+                changed = actions[label](ids=ids, **filters)
             else:
-                st.info("Aucune sanction trouvée")
-            
-            cursor.close()
-            conn.close()
-            
-        except Exception as e:
-            st.error(f"Erreur: {e}")
-    
-    # ============ TAB RECHERCHE ============
-    with tab3:
-        st.subheader("🔍 Recherche utilisateur")
-        
-        user_id_search = st.text_input("Entrez l'ID utilisateur", key="global_search")
-        
-        if user_id_search:
-            try:
-                conn = get_connection()
-                cursor = conn.cursor()
-                
-                # Infos utilisateur
-                cursor.execute("""
-                    SELECT * FROM users WHERE user_id = ? AND guild_id = ?
-                """, (user_id_search, guild_id))
-                user_info_raw = cursor.fetchone()
-                
-                if user_info_raw:
-                    user_info = {
-                        'user_id': user_info_raw[0],
-                        'guild_id': user_info_raw[1],
-                        'username': user_info_raw[2] if len(user_info_raw) > 2 else None,
-                        'created_at': user_info_raw[3] if len(user_info_raw) > 3 else None
-                    }
-                    
-                    st.markdown(f"### 👤 Utilisateur trouvé")
+                changed = reassign(new_moderator, ids=ids, **filters)
+        except ValueError:
+            st.error("Aucun filtre actif : cochez des lignes ou filtrez la liste")
+            return
+        for state_key in [k for k in st.session_state if str(k).startswith(f"{key}_sel_")]:
+            del st.session_state[state_key]
+        st.session_state.pop(confirm_key, None)
+        clear_selection(key)
+        st.session_state['moderation_flash'] = f"{label} : {changed} ligne(s) modifiée(s)"
+        st.rerun()
+
+@section("Modération · Warnings")
+def warnings_section(guild_id):
+    st.subheader("⚠️ Gestion des Warnings")
+
+    search_user, picked_user = user_autocomplete(guild_id, "🔍 Rechercher User ID", key="warn_search")
+
+    try:
+        warn_filters = {
+            'user_id': picked_user,
+            'user_search': None if picked_user else search_user or None,
+        }
+        # Pagination par curseur (created_at, id) et tri côté serveur ; une seule grille pour la page
+        page, selected_ids = data_grid(
+            lambda cursor, limit, **order: warning_repo.get_page(guild_id, cursor, limit, **warn_filters, **order),
+            columns={
+                'user_id': {'label': 'User'},
+                'moderator_id': {'label': 'Modérateur'},
+                'reason': {'label': 'Raison'},
+                'created_at': {'label': 'Date', 'format': 'timestamp'},
+            },
+            key="warn_bulk",
+            filters=(guild_id, search_user, picked_user),
+            sorts={
+                "Plus récent": {'order_by': 'created_at', 'descending': True},
+                "Plus ancien": {'order_by': 'created_at', 'descending': False},
+                "User ID": {'order_by': 'user_id', 'descending': False},
+            },
+            page_sizes=(10, 25, 50, 100)
+        )
+
+        if page.items:
+            action_bar(
+                "warn_bulk", selected_ids, warn_filters,
+                {
+                    "🗑️ Supprimer": lambda **kw: warning_repo.delete_many(guild_id, **kw),
+                    "⏹️ Désactiver": lambda **kw: warning_repo.deactivate_many(guild_id, **kw),
+                    "⌛ Faire expirer": lambda **kw: warning_repo.expire_many(guild_id, **kw),
+                },
+                count=lambda **kw: warning_repo.count_many(guild_id, **kw),
+                reassign=lambda moderator_id, **kw: warning_repo.reassign_moderator(guild_id, moderator_id, **kw)
+            )
+        else:
+            st.info("Aucun warning trouvé")
+
+    except Exception as e:
+        st.error(f"Erreur: {e}")
+
+@section("Modération · Sanctions")
+def sanctions_section(guild_id):
+    st.subheader("🔨 Gestion des Sanctions")
+
+    # Filtres
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        search_user_s, picked_user_s = user_autocomplete(guild_id, "🔍 User ID", key="sanc_search")
+    with col2:
+        filter_type = st.selectbox(
+            "📋 Type",
+            ["Tous", "mute", "ban", "kick"],
+            key="sanc_type"
+        )
+    with col3:
+        filter_active = st.selectbox(
+            "📊 Status",
+            ["Tous", "Actives", "Expirées"],
+            key="sanc_active"
+        )
+    with col4:
+        per_page_s = st.selectbox("📄 Par page", [10, 25, 50], key="sanc_per_page")
+
+    try:
+        sanc_filters = {
+            'sanction_type': None if filter_type == "Tous" else filter_type,
+            'active': {"Tous": None, "Actives": True, "Expirées": False}[filter_active],
+            'user_id': picked_user_s,
+            'user_search': None if picked_user_s else search_user_s or None,
+        }
+        page = cursor_pager(
+            lambda cursor: sanction_repo.get_page(guild_id, cursor, per_page_s, **sanc_filters),
+            key="sanc_pager",
+            filters=(guild_id, search_user_s, picked_user_s, filter_type, filter_active, per_page_s)
+        )
+        sanctions = page.items
+
+        if sanctions:
+            select_all_button("sanc_bulk", [sanction['id'] for sanction in sanctions])
+
+            selected_ids = []
+            for sanction in sanctions:
+                col_select, col_detail = st.columns([1, 20])
+                with col_select:
+                    if st.checkbox("", key=f"sanc_bulk_sel_{sanction['id']}"):
+                        selected_ids.append(sanction['id'])
+                with col_detail, st.expander(
+                    f"{'🟢' if sanction['active'] else '⚫'} "
+                    f"**{sanction['type'].upper()}** - "
+                    f"User: {sanction['user_id']} - "
+                    f"{format_date(sanction['created_at'])}"
+                ):
                     col1, col2 = st.columns(2)
+
                     with col1:
-                        st.metric("User ID", user_info['user_id'])
+                        st.markdown(f"**ID:** `{sanction['id']}`")
+                        st.markdown(f"**User ID:** `{sanction['user_id']}`")
+                        st.markdown(f"**Modérateur:** `{sanction['moderator_id']}`")
+                        st.markdown(f"**Type:** `{sanction['type']}`")
+
                     with col2:
-                        st.metric("Username", user_info.get('username', 'N/A'))
-                else:
-                    st.markdown(f"### 👤 Utilisateur (ID: {user_id_search})")
-                
-                # Warnings de l'utilisateur
-                cursor.execute("""
-                    SELECT * FROM warnings 
-                    WHERE user_id = ? AND guild_id = ?
-                    ORDER BY created_at DESC
-                """, (user_id_search, guild_id))
-                user_warnings_raw = cursor.fetchall()
-                
-                user_warnings = []
-                for row in user_warnings_raw:
-                    user_warnings.append({
-                        'id': row[0],
-                        'reason': row[4],
-                        'moderator_id': row[3],
-                        'created_at': row[5]
-                    })
-                
+                        st.markdown(f"**Active:** {'✅ Oui' if sanction['active'] else '❌ Non'}")
+                        st.markdown(f"**Créée:** {sanction['created_at']}")
+                        if sanction.get('expires_at'):
+                            st.markdown(f"**Expire:** {sanction['expires_at']}")
+                        if sanction.get('removed_at'):
+                            st.markdown(f"**Retirée:** {sanction['removed_at']}")
+
+                    st.markdown(f"**Raison:** {sanction['reason']}")
+
+            action_bar(
+                "sanc_bulk", selected_ids, sanc_filters,
+                {
+                    "⏹️ Désactiver": lambda **kw: sanction_repo.deactivate_many(guild_id, **kw),
+                    "🗑️ Supprimer": lambda **kw: sanction_repo.delete_many(guild_id, **kw),
+                },
+                count=lambda **kw: sanction_repo.count_many(guild_id, **kw),
+                reassign=lambda moderator_id, **kw: sanction_repo.reassign_moderator(guild_id, moderator_id, **kw)
+            )
+        else:
+            st.info("Aucune sanction trouvée")
+
+    except Exception as e:
+        st.error(f"Erreur: {e}")
+
+@section("Modération · Recherche")
+def search_section(guild_id):
+    st.subheader("🔍 Recherche")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        query = st.text_input(
+            "Rechercher (raison, pseudo, ID, contenu automod)",
+            key="global_search"
+        )
+    with col2:
+        kind_labels = {
+            'warning': "⚠️ Warnings",
+            'sanction': "🔨 Sanctions",
+            'automod': "🤖 AutoMod",
+            'user': "👤 Utilisateurs",
+        }
+        kinds = st.multiselect(
+            "Sources",
+            list(search_repo.KINDS),
+            format_func=lambda k: kind_labels[k],
+            key="global_search_kinds"
+        )
+
+    if query:
+        try:
+            # Index plein texte FTS5 : classement bm25, extraits avec termes en gras
+            results = search_repo.search(guild_id, query, kinds=tuple(kinds) or None, limit=50)
+
+            st.markdown(f"### {len(results)} résultat(s)")
+            for r in results:
+                icon = kind_labels[r['kind']].split()[0]
+                date = format_date(r['created_at']) if r['created_at'] else ''
+                st.markdown(
+                    f"{icon} **#{r['id']}** · `{r['user_id']}` · {date}  \n"
+                    f"{r['snippet'] or '*(sans texte)*'}"
+                )
+
+            # ID Discord exact : historique complet de l'utilisateur
+            if query.strip().isdigit():
+                user_id_search = query.strip()
+                st.divider()
+                st.markdown(f"### 👤 Utilisateur (ID: {user_id_search})")
+
+                user_warnings = warning_repo.get_by_user(user_id_search, guild_id)
                 st.markdown(f"### ⚠️ Warnings ({len(user_warnings)})")
                 if user_warnings:
-                    # Fonction pour formatter les dates (format court)
-                    def format_date_short(date_str):
-                        if not date_str or date_str == '':
-                            return '-'
-                        try:
-                            from datetime import datetime
-                            if isinstance(date_str, str):
-                                dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                                return dt.strftime('%d/%m/%y')
-                            else:
-                                return date_str.strftime('%d/%m/%y')
-                        except:
-                            return str(date_str)
-                    
-                    # Formatter les dates dans le DataFrame
                     df = pd.DataFrame(user_warnings)
-                    df['created_at'] = df['created_at'].apply(format_date_short)
+                    df['created_at'] = df['created_at'].apply(format_date)
                     st.dataframe(df[['id', 'reason', 'moderator_id', 'created_at']], use_container_width=True, hide_index=True)
                 else:
                     st.success("Aucun warning")
-                
-                # Sanctions de l'utilisateur
-                cursor.execute("""
-                    SELECT * FROM sanctions 
-                    WHERE user_id = ? AND guild_id = ?
-                    ORDER BY created_at DESC
-                """, (user_id_search, guild_id))
-                user_sanctions_raw = cursor.fetchall()
-                
-                user_sanctions = []
-                for row in user_sanctions_raw:
-                    user_sanctions.append({
-                        'id': row[0],
-                        'type': row[4],
-                        'reason': row[5],
-                        'active': bool(row[6]),
-                        'created_at': row[7]
-                    })
-                
+
+                user_sanctions = sanction_repo.get_by_user(user_id_search, guild_id)
                 st.markdown(f"### 🔨 Sanctions ({len(user_sanctions)})")
                 if user_sanctions:
                     df = pd.DataFrame(user_sanctions)
+                    df['active'] = df['active'].astype(bool)
                     st.dataframe(df[['id', 'type', 'reason', 'active', 'created_at']], 
                                 use_container_width=True, hide_index=True)
                 else:
                     st.success("Aucune sanction")
-                
-                cursor.close()
-                conn.close()
-                
-            except Exception as e:
-                st.error(f"Erreur: {e}")
+
+        except Exception as e:
+            st.error(f"Erreur: {e}")
+
+SECTIONS = {
+    "⚠️ Warnings": warnings_section,
+    "🔨 Sanctions": sanctions_section,
+    "🔍 Recherche": search_section,
+}
+
+@require_auth
+@timed_page("Modération")
+def main():
+    render_sidebar()
+    
+    st.title("⚔️ Modération")
+    
+    guild_id = get_selected_guild_id()
+    
+    if not guild_id:
+        st.warning("Veuillez sélectionner un serveur dans la sidebar")
+        return
+    
+    flash = st.session_state.pop('moderation_flash', None)
+    if flash:
+        st.success(f"✅ {flash}")
+    
+    # Seule la vue active est rendue (et interrogée)
+    view = lazy_tabs(list(SECTIONS), key="moderation_view")
+    SECTIONS[view](guild_id)
 
 if __name__ == "__main__":
     main()
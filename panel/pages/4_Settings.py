@@ -6,12 +6,14 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from database.python.connection import get_connection
+from database.python.instrumentation import timed_page
 from panel.utils.auth import require_auth
 from panel.components.sidebar import render_sidebar, get_selected_guild_id
 
 st.set_page_config(page_title="Settings", page_icon="⚙️", layout="wide")
 
 @require_auth
+@timed_page("Settings")
 def main():
     render_sidebar()
     
@@ -1,18 +1,74 @@
 import streamlit as st
-import pandas as pd
-from datetime import datetime, timedelta
+from streamlit.errors import StreamlitAPIException
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from database.python.connection import get_connection
+from database.python import export
+from database.python.repositories import timeline_repo
+from database.python.instrumentation import timed_page
 from panel.utils.auth import require_auth
 from panel.components.sidebar import render_sidebar, get_selected_guild_id
+from panel.components.autocomplete import user_autocomplete
+from panel.components.tables import load_more
+from panel.components.log_feed import log_feed
+from panel.utils.helpers import fragment
 
 st.set_page_config(page_title="Logs", page_icon="📜", layout="wide")
 
+# Entrées lues à chaque "Charger plus"
+PAGE_SIZE = 100
+
+# Mode live : intervalle de polling (secondes) et nb max d'entrées gardées
+LIVE_INTERVAL = 1
+LIVE_MAX_ITEMS = 200
+
+@fragment(run_every=LIVE_INTERVAL)
+def live_tail(guild_id, filters, filters_key):
+    """
+    Mode live : relit les watermarks (MAX(id) par table) toutes les LIVE_INTERVAL secondes
+    et ne charge que les lignes plus récentes que le dernier id vu.
+    Seul ce fragment est relancé, pas la page.
+    """
+    state = st.session_state
+    if state.get('live_filters') != filters_key:
+        state.live_filters = filters_key
+        state.live_watermarks = timeline_repo.get_watermarks()
+        state.live_items = []
+    
+    watermarks = timeline_repo.get_watermarks()
+    if watermarks != state.live_watermarks:
+        new_logs = timeline_repo.get_since(guild_id, state.live_watermarks, LIVE_MAX_ITEMS, **filters)
+        state.live_items = (new_logs + state.live_items)[:LIVE_MAX_ITEMS]
+        state.live_watermarks = watermarks
+    
+    st.caption(f"🔴 Live · {len(state.live_items)} nouvelle(s) entrée(s) depuis l'activation")
+    log_feed(state.live_items, key="live_feed", page_size=LIVE_MAX_ITEMS, height=400)
+
+def download_export(path: str, export_format: str):
+    """
+    Bouton de téléchargement d'un export : le fichier n'est lu qu'au clic, puis supprimé.
+    Streamlit sans données différées (pas de fonction acceptée) : lu à l'affichage, supprimé au clic.
+    """
+    def downloaded(remove=False):
+        if remove:
+            Path(path).unlink(missing_ok=True)
+        st.session_state.pop('logs_export', None)
+
+    options = dict(
+        label=f"Télécharger {export_format.upper()}",
+        file_name=Path(path).name,
+        mime=export.FORMATS[export_format][0],
+    )
+    try:
+        st.download_button(data=lambda: export.take_export(path), on_click=downloaded, **options)
+    except StreamlitAPIException:
+        with open(path, 'rb') as f:
+            st.download_button(data=f, on_click=downloaded, args=(True,), **options)
+
 @require_auth
+@timed_page("Logs")
 def main():
     render_sidebar()
     
@@ -30,7 +86,7 @@ def main():
     with col1:
         log_type = st.selectbox(
             "📁 Type de log",
-            options=["Tous", "warning", "mute", "kick", "ban", "unban", "unmute"]
+            options=["Tous", "warning", "mute", "kick", "ban", "unban", "unmute", "automod", "mod_log"]
         )
     
     with col2:
@@ -40,213 +96,72 @@ def main():
         )
     
     with col3:
-        moderator_filter = st.text_input("🛡️ Modérateur (ID)")
+        moderator_text, moderator_pick = user_autocomplete(guild_id, "🛡️ Modérateur (ID)", key="logs_moderator")
+        moderator_filter = moderator_pick or moderator_text
     
     with col4:
-        user_filter = st.text_input("👤 Utilisateur (ID)")
+        user_text, user_pick = user_autocomplete(guild_id, "👤 Utilisateur (ID)", key="logs_user")
+        user_filter = user_pick or user_text
     
-    # Auto-refresh
+    # Live
     col1, col2 = st.columns([3, 1])
     with col2:
-        auto_refresh = st.toggle("🔄 Auto-refresh (30s)", value=False)
+        live = st.toggle("🔴 Live", value=False, help=f"Nouvelles entrées toutes les {LIVE_INTERVAL}s")
+    
+    days = {"Aujourd'hui": 0, "7 jours": 7, "30 jours": 30, "Tout": None}[date_range]
+    kinds = {"automod": ['automod'], "mod_log": ['mod_log']}.get(log_type)
+    filters = {
+        'kinds': kinds,
+        'log_type': None if log_type == "Tous" or kinds else log_type,
+        'moderator_id': moderator_filter or None,
+        'user_id': user_filter or None,
+        'days': days,
+    }
     
-    if auto_refresh:
-        st.empty()
-        import time
-        time.sleep(30)
-        st.rerun()
+    def fetch_logs(cursor):
+        """Page suivante de la timeline fusionnée (warnings, sanctions, automod, mod_logs)."""
+        return timeline_repo.get_page(guild_id, cursor, PAGE_SIZE, **filters)
+    
+    def render_logs(all_logs):
+        st.markdown(f"**{len(all_logs)} entrées affichées**")
+
+        log_feed(all_logs, key="logs_feed", page_size=PAGE_SIZE)
+    
+    if live:
+        live_tail(guild_id, filters, (guild_id, log_type, date_range, moderator_filter, user_filter))
+        st.divider()
+    else:
+        st.session_state.pop('live_filters', None)
     
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Construire la requête pour les sanctions (logs)
-        query = """
-            SELECT 
-                s.id,
-                s.type,
-                s.user_id,
-                s.moderator_id,
-                s.reason,
-                s.duration,
-                s.created_at,
-                s.active
-            FROM sanctions s
-            WHERE s.guild_id = ?
-        """
-        params = [guild_id]
-        
-        # Filtre type
-        if log_type != "Tous":
-            query += " AND s.type = ?"
-            params.append(log_type)
-        
-        # Filtre date
-        if date_range == "Aujourd'hui":
-            query += " AND DATE(s.created_at) = DATE('now')"
-        elif date_range == "7 jours":
-            query += " AND s.created_at >= DATE('now', '-7 days')"
-        elif date_range == "30 jours":
-            query += " AND s.created_at >= DATE('now', '-30 days')"
-        
-        # Filtre modérateur
-        if moderator_filter:
-            query += " AND s.moderator_id = ?"
-            params.append(moderator_filter)
-        
-        # Filtre utilisateur
-        if user_filter:
-            query += " AND s.user_id = ?"
-            params.append(user_filter)
-        
-        query += " ORDER BY s.created_at DESC LIMIT 100"
-        
-        cursor.execute(query, params)
-        sanctions_raw = cursor.fetchall()
-        
-        # Convertir en liste de dict
-        logs = []
-        for row in sanctions_raw:
-            logs.append({
-                'id': row[0],
-                'type': row[1],
-                'user_id': row[2],
-                'moderator_id': row[3],
-                'reason': row[4],
-                'duration': row[5],
-                'created_at': row[6],
-                'active': bool(row[7]) if row[7] is not None else True
-            })
-        
-        # Ajouter aussi les warnings
-        warning_query = """
-            SELECT 
-                w.id,
-                'warning' as type,
-                w.user_id,
-                w.moderator_id,
-                w.reason,
-                NULL as duration,
-                w.created_at,
-                TRUE as active
-            FROM warnings w
-            WHERE w.guild_id = ?
-        """
-        warning_params = [guild_id]
-        
-        if log_type == "Tous" or log_type == "warning":
-            if date_range == "Aujourd'hui":
-                warning_query += " AND DATE(w.created_at) = DATE('now')"
-            elif date_range == "7 jours":
-                warning_query += " AND w.created_at >= DATE('now', '-7 days')"
-            elif date_range == "30 jours":
-                warning_query += " AND w.created_at >= DATE('now', '-30 days')"
-            
-            if moderator_filter:
-                warning_query += " AND w.moderator_id = ?"
-                warning_params.append(moderator_filter)
-            
-            if user_filter:
-                warning_query += " AND w.user_id = ?"
-                warning_params.append(user_filter)
-            
-            warning_query += " ORDER BY w.created_at DESC LIMIT 100"
-            
-            cursor.execute(warning_query, warning_params)
-            warnings_raw = cursor.fetchall()
-            
-            # Convertir en liste de dict
-            warnings = []
-            for row in warnings_raw:
-                warnings.append({
-                    'id': row[0],
-                    'type': row[1],
-                    'user_id': row[2],
-                    'moderator_id': row[3],
-                    'reason': row[4],
-                    'duration': row[5],
-                    'created_at': row[6],
-                    'active': bool(row[7]) if row[7] is not None else True
-                })
-            
-            # Combiner et trier
-            all_logs = logs + warnings
-            all_logs.sort(key=lambda x: x['created_at'] or datetime.min, reverse=True)
-            all_logs = all_logs[:100]
-        else:
-            all_logs = logs
-        
-        cursor.close()
-        conn.close()
-        
-        # Affichage
-        st.markdown(f"**{len(all_logs)} entrées trouvées**")
+        all_logs = load_more(
+            fetch_logs, render_logs, key="logs",
+            filters=(guild_id, log_type, date_range, moderator_filter, user_filter)
+        )
         
         if all_logs:
-            # Icônes par type
-            type_icons = {
-                'warning': '⚠️',
-                'mute': '🔇',
-                'unmute': '🔊',
-                'kick': '👢',
-                'ban': '🔨',
-                'unban': '🔓'
-            }
-            
-            # Couleurs par type
-            type_colors = {
-                'warning': '#FEE75C',
-                'mute': '#5865F2',
-                'unmute': '#57F287',
-                'kick': '#FEA500',
-                'ban': '#ED4245',
-                'unban': '#57F287'
-            }
+            # Export de tout l'historique filtré (pas seulement les lignes affichées)
+            st.divider()
             
-            for log in all_logs:
-                icon = type_icons.get(log['type'], '📋')
-                color = type_colors.get(log['type'], '#FFFFFF')
-                timestamp = log['created_at']
-                
-                st.markdown(f"""
-                <div style="
-                    background: #2C2F33;
-                    padding: 1rem;
-                    border-radius: 8px;
-                    border-left: 4px solid {color};
-                    margin-bottom: 0.5rem;
-                ">
-                    <div style="display: flex; justify-content: space-between; align-items: center;">
-                        <span style="font-size: 1.1em;">
-                            {icon} <strong>{log['type'].upper()}</strong>
-                        </span>
-                        <span style="color: #72767D; font-size: 0.9em;">
-                            {timestamp}
-                        </span>
-                    </div>
-                    <div style="margin-top: 0.5rem; color: #B9BBBE;">
-                        <strong>User:</strong> {log['user_id']} | 
-                        <strong>Mod:</strong> {log['moderator_id']}
-                        {f" | <strong>Durée:</strong> {log['duration']}" if log.get('duration') else ""}
-                    </div>
-                    <div style="margin-top: 0.5rem;">
-                        {log['reason'] or 'Aucune raison'}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                export_format = st.selectbox("Format", list(export.FORMATS), key="export_format")
+            with col2:
+                st.caption("Export en flux de tout l'historique correspondant aux filtres ; le fichier "
+                           f"temporaire (`{export.EXPORT_DIR}`) est supprimé une fois téléchargé")
             
-            # Export CSV
-            st.divider()
+            if st.button("📥 Exporter"):
+                with st.spinner("Export en cours..."):
+                    path, count = export.export_logs(guild_id, export_format, **filters)
+                st.session_state.logs_export = (str(path), count, export_format)
             
-            if st.button("📥 Exporter en CSV"):
-                df = pd.DataFrame(all_logs)
-                csv = df.to_csv(index=False)
-                st.download_button(
-                    label="Télécharger CSV",
-                    data=csv,
-                    file_name=f"logs_{guild_id}_{datetime.now().strftime('%Y%m%d')}.csv",
-                    mime="text/csv"
-                )
+            if st.session_state.get('logs_export'):
+                path, count, export_format = st.session_state.logs_export
+                if Path(path).exists():
+                    st.success(f"✅ {count} entrée(s) exportée(s)")
+                    download_export(path, export_format)
+                else:
+                    st.session_state.pop('logs_export')
         else:
             st.info("Aucun log trouvé pour ces critères")
     
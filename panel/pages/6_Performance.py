@@ -0,0 +1,103 @@
+import streamlit as st
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from database.python import cache, instrumentation
+from database.python.connection import get_pool_stats
+from panel.utils.auth import require_auth
+from panel.components.sidebar import render_sidebar
+
+st.set_page_config(page_title="Performance", page_icon="⏱️", layout="wide")
+
+@require_auth
+def main():
+    render_sidebar()
+
+    st.title("⏱️ Performance")
+    st.caption("Temps des requêtes SQL et du rendu des pages (depuis le démarrage du panel)")
+
+    # Contrôles
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        enabled = st.toggle("📡 Instrumentation active", value=instrumentation.enabled)
+        if enabled != instrumentation.enabled:
+            instrumentation.set_enabled(enabled)
+        cache_enabled = st.toggle("🗄️ Cache de requêtes actif", value=cache.enabled)
+        if cache_enabled != cache.enabled:
+            cache.set_enabled(cache_enabled)
+    with col2:
+        if st.button("🔄 Rafraîchir", use_container_width=True):
+            st.rerun()
+    with col3:
+        if st.button("🗑️ Réinitialiser", use_container_width=True):
+            instrumentation.reset_stats()
+            cache.query_cache.reset_stats()
+            st.rerun()
+
+    query_stats = instrumentation.get_query_stats()
+    page_stats = instrumentation.get_page_stats()
+    pool_stats = get_pool_stats()
+
+    # Métriques globales
+    executed = [s for s in query_stats if s['count']]
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("🧾 Requêtes distinctes", len(executed))
+    with col2:
+        st.metric("🔁 Exécutions", sum(s['count'] for s in executed))
+    with col3:
+        st.metric("⏱️ Temps SQL total", f"{sum(s['total_ms'] for s in executed):.1f} ms")
+    with col4:
+        opened = pool_stats['read']['opened'] + pool_stats['write']['opened']
+        reused = pool_stats['read']['reused'] + pool_stats['write']['reused']
+        st.metric("🔌 Connexions ouvertes / réutilisées", f"{opened} / {reused}")
+
+    # Cache de requêtes
+    cache_stats = cache.get_cache_stats()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("🎯 Cache hits / misses", f"{cache_stats['hits']} / {cache_stats['misses']}")
+    with col2:
+        st.metric("📈 Taux de succès", f"{cache_stats['hit_rate']:.0%}")
+    with col3:
+        st.metric("🗄️ Entrées", f"{cache_stats['entries']} / {cache_stats['max_entries']}")
+    with col4:
+        st.metric("♻️ Invalidations / évictions", f"{cache_stats['invalidations']} / {cache_stats['evictions']}")
+
+    st.divider()
+
+    # Rendu des pages
+    st.markdown("### 📄 Rendu des pages")
+    if page_stats:
+        df = pd.DataFrame(page_stats)[['key', 'count', 'avg_ms', 'p50_ms', 'p95_ms', 'p99_ms']]
+        df.columns = ['Page', 'Rendus', 'Moyenne (ms)', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)']
+        st.dataframe(df.round(2), use_container_width=True, hide_index=True)
+    else:
+        st.info("Aucune page rendue depuis le démarrage")
+
+    # Requêtes SQL
+    st.markdown("### 🐢 Requêtes SQL")
+    if executed:
+        sort_by = st.selectbox(
+            "📊 Trier par",
+            ["Temps total", "p95", "Exécutions", "Lignes"],
+            key="perf_sort"
+        )
+        sort_keys = {"Temps total": 'total_ms', "p95": 'p95_ms', "Exécutions": 'count', "Lignes": 'rows'}
+
+        df = pd.DataFrame(executed).sort_values(sort_keys[sort_by], ascending=False)
+        df = df[['key', 'count', 'total_ms', 'avg_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'rows', 'traced']]
+        df.columns = ['Requête', 'Exécutions', 'Total (ms)', 'Moyenne (ms)',
+                      'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'Lignes', 'Statements SQLite']
+        st.dataframe(
+            df.round(3), use_container_width=True, hide_index=True,
+            column_config={'Requête': st.column_config.TextColumn(width='large')}
+        )
+    else:
+        st.info("Aucune requête enregistrée")
+
+if __name__ == "__main__":
+    main()
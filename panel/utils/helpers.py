@@ -121,3 +121,13 @@ def calculate_percentage(part: int, total: int) -> float:
     if total == 0:
         return 0
     return round((part / total) * 100, 1)
+
+def fragment(run_every=None):
+    """
+    Décorateur st.fragment (rerun partiel, éventuellement périodique)
+    Repli sur st.experimental_fragment pour streamlit < 1.37
+    """
+    import streamlit as st
+    
+    decorator = getattr(st, 'fragment', None) or st.experimental_fragment
+    return decorator(run_every=run_every)